@@ -0,0 +1,188 @@
+# audio_cache.py - Pre-synthesized speech for the utterances the CLI knows in advance
+#
+#     python audio_cache.py        # in the CLI folder, after editing healthcare_kb.csv or the translations
+#
+# Advice, first aid, labels and menus all come from TRANSLATIONS, LABELS and
+# the knowledge base, so they are rendered to audio files once instead of
+# being synthesized every time they are spoken. Each file is named by a hash
+# of (text, language, voice, rate): edited text gets a new name, so a stale
+# recording is never played, and the next build deletes the recordings
+# nothing refers to any more.
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import wave
+
+from speech_queue import run_speech_command
+
+AUDIO_CACHE_DIR = 'audio_cache'
+MANIFEST_NAME = 'manifest.json'
+# Bump when the way recordings are rendered changes, so old ones are rebuilt
+AUDIO_FORMAT_VERSION = 1
+# Voice name used when espeak renders (and speaks) instead of pyttsx3
+ESPEAK_VOICE = 'espeak'
+
+
+def utterance_key(text, language, voice, rate):
+    """Content address of one recording"""
+    payload = json.dumps([AUDIO_FORMAT_VERSION, text, language, voice, rate], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def sources_digest(csv_path, *tables):
+    """Hash of the KB file and the translation tables the utterances come from"""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps(tables, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class AudioCache:
+    """Directory of recordings named by utterance_key(), plus a manifest of what they were built from"""
+
+    def __init__(self, directory=AUDIO_CACHE_DIR):
+        self.directory = directory
+
+    def path_for(self, text, language, voice, rate):
+        return os.path.join(self.directory, utterance_key(text, language, voice, rate) + '.wav')
+
+    def lookup(self, text, language, voice, rate):
+        """Path of the recording of text, or None if it was never rendered"""
+        if voice is None:
+            return None
+        path = self.path_for(text, language, voice, rate)
+        return path if os.path.isfile(path) else None
+
+    def manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def exists(self):
+        return os.path.isdir(self.directory)
+
+    def is_current(self, digest):
+        """True if the cache was last built from sources with this digest"""
+        return self.manifest().get('sources') == digest
+
+    def build(self, utterances, render, voice, rate, digest):
+        """
+        Render the (text, language) pairs that have no recording yet and delete
+        recordings no utterance refers to. render(items) must write each
+        (text, path) of items to a WAV file at path.
+        Returns (rendered, already cached, removed) counts.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        wanted = {}
+        for text, language in utterances:
+            wanted[os.path.basename(self.path_for(text, language, voice, rate))] = text
+        existing = {name for name in os.listdir(self.directory) if name.endswith('.wav')}
+
+        # Render to temporary names first so an interrupted build leaves no truncated recordings
+        missing = [(text, os.path.join(self.directory, name + '.tmp'))
+                   for name, text in wanted.items() if name not in existing]
+        render(missing)
+        rendered = 0
+        for _, temporary_path in missing:
+            if os.path.isfile(temporary_path) and os.path.getsize(temporary_path):
+                os.replace(temporary_path, temporary_path[:-len('.tmp')])
+                rendered += 1
+            elif os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        stale = existing - wanted.keys()
+        for name in stale:
+            os.remove(os.path.join(self.directory, name))
+
+        manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'sources': digest, 'voice': voice, 'rate': rate, 'utterances': len(wanted),
+                       'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')}, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+        return rendered, len(wanted) - len(missing), len(stale)
+
+
+def render_with_pyttsx3(engine, items, batch_size=50):
+    for start in range(0, len(items), batch_size):
+        for text, path in items[start:start + batch_size]:
+            engine.save_to_file(text, path)
+        engine.runAndWait()
+
+
+def render_with_espeak(items):
+    for text, path in items:
+        subprocess.run(['espeak', '-w', path, text], capture_output=True, timeout=60)
+
+
+def wav_duration(path):
+    with wave.open(path, 'rb') as recording:
+        return recording.getnframes() / float(recording.getframerate())
+
+
+def play_audio_file(path, interrupted):
+    """
+    Play a recording, stopping early when interrupted is set.
+    Returns False if this system has no way to play it (speak it live instead).
+    """
+    system = platform.system()
+    try:
+        if system == "Windows":
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            if interrupted.wait(wav_duration(path)):
+                winsound.PlaySound(None, 0)  # stops the sound playing asynchronously
+            return True
+        if system == "Darwin":
+            run_speech_command(['afplay', path], interrupted, timeout=120)
+            return True
+        for player in (['aplay', '-q'], ['paplay']):
+            try:
+                run_speech_command(player + [path], interrupted, timeout=120)
+                return True
+            except FileNotFoundError:
+                continue
+    except (subprocess.TimeoutExpired, OSError, RuntimeError, wave.Error):
+        pass
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-synthesize every utterance the CLI speaks from its '
+                                                 'translations and knowledge base')
+    parser.add_argument('--kb', default='healthcare_kb.csv', help='knowledge base CSV (default healthcare_kb.csv)')
+    parser.add_argument('--dir', default=AUDIO_CACHE_DIR, help=f'cache directory (default {AUDIO_CACHE_DIR})')
+    args = parser.parse_args()
+
+    from healthcare_agent import configure_tts_engine, known_utterances, read_knowledge_base, speech_sources_digest
+
+    utterances = known_utterances(read_knowledge_base(args.kb))
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+        voice, rate = configure_tts_engine(engine)
+
+        def render(items):
+            render_with_pyttsx3(engine, items)
+    except Exception as e:
+        if platform.system() != "Linux" or shutil.which('espeak') is None:
+            sys.exit(f"No TTS engine to render with (pyttsx3: {e})")
+        voice, rate, render = ESPEAK_VOICE, None, render_with_espeak
+
+    start = time.perf_counter()
+    rendered, cached, removed = AudioCache(args.dir).build(utterances, render, voice, rate,
+                                                           speech_sources_digest(args.kb))
+    print(f"{len(utterances)} utterances for voice {voice}: {rendered} rendered, {cached} already cached, "
+          f"{removed} stale recordings removed ({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# batch.py - Diagnose symptom descriptions from a file or stdin, one JSON result per line
+#
+#     python batch.py kiosk_log.txt --language hindi > results.jsonl
+#     cat survey.txt | python batch.py - --workers 8 --output results.jsonl
+#
+# Every non-empty input line goes through the same matching as menu option 1
+# (HealthcareAssistant.diagnose), without TTS, microphone or menus. Lines are
+# sent to a pool of worker processes in blocks; results are written in input
+# order, and only a few blocks are in flight at a time, so memory stays flat
+# however long the input is.
+import argparse
+import contextlib
+import functools
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+from healthcare_agent import LABELS, HealthcareAssistant, symptom_fields
+
+BLOCK_LINES = 2000
+# Descriptions remembered per worker: kiosk logs repeat the same few phrases
+DIAGNOSIS_CACHE_SIZE = 65536
+# Blocks queued per worker: enough to keep workers busy, few enough to bound memory
+BLOCKS_PER_WORKER = 4
+
+_assistant = None
+
+
+def init_worker(language):
+    """
+    Load the knowledge base once per process (forked workers inherit the one
+    main() loaded); its messages go to stderr, never into the results. Raises
+    when healthcare_kb.csv is missing or unreadable.
+    """
+    global _assistant
+    if _assistant is None:
+        with contextlib.redirect_stdout(sys.stderr):
+            _assistant = HealthcareAssistant(interactive=False)
+    _assistant.current_language = language
+
+
+def symptom_result(row, conf, language):
+    name, advice, first_aid = symptom_fields(row, language)
+    return {'symptom': name, 'symptom_english': row['symptom_english'], 'confidence': int(conf),
+            'severity': row['severity'], 'advice': advice, 'first_aid': first_aid}
+
+
+@functools.lru_cache(maxsize=DIAGNOSIS_CACHE_SIZE)
+def diagnose_text(text):
+    language = _assistant.current_language
+    return [symptom_result(row, conf, language) for row, conf in _assistant.diagnose(text)]
+
+
+def diagnose_line(number, text):
+    """One result object; the top-level fields describe the most severe (or only) symptom"""
+    matches = diagnose_text(text.lower())
+    result = {'line': number, 'input': text, 'matched': bool(matches)}
+    if matches:
+        result.update(matches[0])
+    else:
+        result.update({'symptom': None, 'symptom_english': None, 'confidence': 0,
+                       'severity': None, 'advice': None, 'first_aid': None})
+    result['symptoms'] = matches
+    return result
+
+
+def diagnose_block(lines):
+    """JSON lines for a block of (line number, text)"""
+    return ''.join(json.dumps(diagnose_line(number, text), ensure_ascii=False) + '\n' for number, text in lines)
+
+
+def read_blocks(stream, block_lines=BLOCK_LINES):
+    """Blocks of (line number, stripped text), skipping blank lines; numbers count every input line"""
+    block = []
+    for number, line in enumerate(stream, 1):
+        text = line.strip()
+        if text:
+            block.append((number, text))
+            if len(block) == block_lines:
+                yield block
+                block = []
+    if block:
+        yield block
+
+
+def run_batch(stream, output, language, workers, block_lines=BLOCK_LINES):
+    """Write one JSON line per non-empty input line, in input order; returns the number of results"""
+    results = 0
+    blocks = read_blocks(stream, block_lines)
+    if workers <= 1:
+        init_worker(language)
+        for block in blocks:
+            output.write(diagnose_block(block))
+            results += len(block)
+        return results
+
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(language,)) as pool:
+        pending = deque()
+        for block in blocks:
+            pending.append((len(block), pool.apply_async(diagnose_block, (block,))))
+            if len(pending) >= workers * BLOCKS_PER_WORKER:
+                count, result = pending.popleft()
+                output.write(result.get())
+                results += count
+        while pending:
+            count, result = pending.popleft()
+            output.write(result.get())
+            results += count
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diagnose symptom descriptions, one per line, without '
+                                                 'speech or menus; writes one JSON object per line')
+    parser.add_argument('input', nargs='?', default='-', help="text file of symptom descriptions ('-' or omitted: stdin)")
+    parser.add_argument('--language', choices=sorted(LABELS), default='english',
+                        help='language the descriptions are written in, and of names and advice in the results (default english)')
+    parser.add_argument('--output', help='JSONL file to write (default stdout)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: one per CPU; 1 runs in this process)')
+    parser.add_argument('--block-lines', type=int, default=BLOCK_LINES,
+                        help=f'lines sent to a worker at a time (default {BLOCK_LINES})')
+    args = parser.parse_args()
+
+    # Load the knowledge base before any worker starts: without it there is nothing to diagnose with
+    try:
+        init_worker(args.language)
+    except Exception as e:
+        print(f"Error: cannot load the knowledge base: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Read and write UTF-8 bytes directly: sys.stdout is wrapped by colorama
+    if args.input == '-':
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+    else:
+        stream = open(args.input, encoding='utf-8', errors='replace')
+    if args.output:
+        output = open(args.output, 'w', encoding='utf-8')
+    else:
+        output = open(sys.__stdout__.fileno(), 'w', encoding='utf-8', closefd=False)
+
+    start = time.perf_counter()
+    with stream, output:
+        results = run_batch(stream, output, args.language, max(1, args.workers), max(1, args.block_lines))
+    elapsed = time.perf_counter() - start
+    print(f"{results} lines diagnosed in {elapsed:.1f} s ({results / max(elapsed, 1e-9):.0f} lines/s)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
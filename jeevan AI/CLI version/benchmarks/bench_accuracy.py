@@ -0,0 +1,266 @@
+"""
+Accuracy and latency of both symptom matchers on a labeled query corpus.
+
+The corpus (backend/benchmarks/labeled_queries.json) holds English,
+Devanagari, Tamil and romanized queries, misspellings, paraphrases,
+multi-symptom sentences and queries that name no symptom, each labeled with
+the symptoms it should give. Three matchers answer every query:
+
+    backend        SymptomMatcher.best_match, what /diagnose answers (score >= MATCH_THRESHOLD)
+    backend-multi  SymptomMatcher.find_mentions, what /diagnose?mode=multi answers
+    cli            HealthcareAssistant.diagnose, what menu option 1 and batch.py answer,
+                   in the query's language mode
+
+For each knowledge base size (the real rows mixed into synthetic ones, as in
+bench_matching.py) it reports precision, recall and F1 of the predicted
+symptoms, in total and per category, and the per-query latency distribution.
+Queries labeled with a symptom missing from a matcher's knowledge base (the
+CLI has no Leg Pain) are skipped for that matcher. Run from the CLI folder:
+    python benchmarks/bench_accuracy.py
+    python benchmarks/bench_accuracy.py --rows 25,1000,100000,1000000 --json accuracy.json
+Save --json results of two versions and compare them key by key.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+CLI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(os.path.dirname(CLI_DIR), 'backend')
+sys.path.insert(0, CLI_DIR)
+sys.path.insert(0, os.path.join(CLI_DIR, 'benchmarks'))
+
+import pandas as pd  # noqa: E402
+
+from bench_matching import make_assistant, synthetic_kb  # noqa: E402
+from healthcare_agent import MATCH_THRESHOLD  # noqa: E402
+from matcher import SymptomMatcher, normalize_text  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(BACKEND_DIR, 'benchmarks', 'labeled_queries.json')
+MATCHERS = ('backend', 'backend-multi', 'cli')
+
+
+class BackendMatcher:
+    """The backend's SymptomMatcher over the backend knowledge base"""
+
+    def __init__(self, df, multi=False):
+        self.matcher = SymptomMatcher.from_dataframe(df)
+        if not multi:  # find_mentions never needs the similarity vectors
+            self.matcher.build_semantic_index()
+        self.multi = multi
+        self.symptoms = {entry['name']['english'] for entry in self.matcher.symptoms}
+
+    def predict(self, query, language):
+        text = normalize_text(query)
+        if self.multi:
+            mentions, _ = self.matcher.find_mentions(text)
+            return {self.matcher.symptoms[symptom_id]['name']['english'] for symptom_id, _, _ in mentions}
+        entry, score = self.matcher.best_match(text)
+        return {entry['name']['english']} if entry is not None and score >= MATCH_THRESHOLD else set()
+
+
+class CLIMatcher:
+    """HealthcareAssistant.diagnose over the CLI knowledge base"""
+
+    def __init__(self, df):
+        self.assistant = make_assistant(df)
+        self.symptoms = set(df['symptom_english'])
+        self.assistant.get_symptom_matcher().build_semantic_index()
+        for language in ('english', 'hindi', 'tamil'):
+            self.assistant.get_match_candidates(f'symptom_{language}')
+
+    def predict(self, query, language):
+        self.assistant.current_language = language
+        return {row['symptom_english'] for row, _ in self.assistant.diagnose(query.lower())}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def scores(counts):
+    """Precision, recall and F1 of {'tp', 'fp', 'fn'} counts"""
+    precision = counts['tp'] / (counts['tp'] + counts['fp']) if counts['tp'] + counts['fp'] else 1.0
+    recall = counts['tp'] / (counts['tp'] + counts['fn']) if counts['tp'] + counts['fn'] else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': round(precision, 4), 'recall': round(recall, 4), 'f1': round(f1, 4)}
+
+
+def evaluate(matcher, corpus, repeat):
+    """Accuracy counts per category and latency of every call, plus the queries answered wrongly"""
+    categories = {}
+    latencies = []
+    errors = []
+    skipped = 0
+    for item in corpus:  # warm up: indexes built on first use are not part of a query's latency
+        matcher.predict(item['query'], item['language'])
+    for item in corpus:
+        expected = set(item['expect'])
+        if not expected <= matcher.symptoms:
+            skipped += 1
+            continue
+        for _ in range(repeat):
+            start = time.perf_counter()
+            predicted = matcher.predict(item['query'], item['language'])
+            latencies.append(time.perf_counter() - start)
+        counts = categories.setdefault(item['category'], {'queries': 0, 'exact': 0, 'tp': 0, 'fp': 0, 'fn': 0})
+        counts['queries'] += 1
+        counts['exact'] += predicted == expected
+        counts['tp'] += len(predicted & expected)
+        counts['fp'] += len(predicted - expected)
+        counts['fn'] += len(expected - predicted)
+        if predicted != expected:
+            errors.append({'query': item['query'], 'category': item['category'],
+                           'expected': sorted(expected), 'predicted': sorted(predicted)})
+
+    total = {key: sum(counts[key] for counts in categories.values()) for key in ('queries', 'exact', 'tp', 'fp', 'fn')}
+    latencies.sort()
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        'queries': total['queries'],
+        'skipped': skipped,
+        'exact_match_rate': round(total['exact'] / total['queries'], 4) if total['queries'] else None,
+        **scores(total),
+        'categories': {category: {'queries': counts['queries'],
+                                  'exact_match_rate': round(counts['exact'] / counts['queries'], 4), **scores(counts)}
+                       for category, counts in categories.items()},
+        'latency_ms': {'p50': ms(percentile(latencies, 50)), 'p90': ms(percentile(latencies, 90)),
+                       'p99': ms(percentile(latencies, 99)), 'max': ms(latencies[-1] if latencies else None)},
+        'errors': errors,
+    }
+
+
+def build_matcher(name, rows, seed):
+    """The named matcher over a KB of `rows` rows"""
+    if name == 'cli':
+        return CLIMatcher(synthetic_kb(pd.read_csv(os.path.join(CLI_DIR, 'healthcare_kb.csv')), rows, seed))
+    df = synthetic_kb(pd.read_csv(os.path.join(BACKEND_DIR, 'healthcare_kb.csv')), rows, seed)
+    return BackendMatcher(df, multi=name == 'backend-multi')
+
+
+def measure(name, rows, corpus, repeat, seed, connection):
+    """Worker process: build one matcher, evaluate it and send the result with the process' peak memory"""
+    warnings.simplefilter('ignore')  # fuzzywuzzy warns about the pure-Python SequenceMatcher
+    start = time.perf_counter()
+    matcher = build_matcher(name, rows, seed)
+    build = time.perf_counter() - start
+    result = {'rows': rows, 'matcher': name, 'build_s': round(build, 3), **evaluate(matcher, corpus, repeat)}
+    try:
+        import resource
+        result['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except ImportError:  # not on Windows
+        result['peak_rss_mb'] = None
+    connection.send(result)
+    connection.close()
+
+
+def run_isolated(name, rows, corpus, repeat, seed):
+    """
+    Measure one matcher in a fresh process: memory left over from a larger KB
+    never skews the next one, and a KB too large for this machine becomes an
+    error entry instead of ending the whole run.
+    """
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=measure, args=(name, rows, corpus, repeat, seed, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = None
+    process.join()
+    if result is None:
+        error = f'worker exited with code {process.exitcode}'
+        if process.exitcode == -9:  # SIGKILL, usually the out-of-memory killer
+            error += ' (killed: out of memory?)'
+        result = {'rows': rows, 'matcher': name, 'error': error}
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=CLI_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='25,1000,100000,1000000', help='comma-separated KB sizes')
+    parser.add_argument('--matchers', default=','.join(MATCHERS), help=f"comma-separated, of {', '.join(MATCHERS)}")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='labeled queries (JSON list)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed calls per query up to 100k rows (1 above)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--errors', action='store_true', help='list the queries each matcher got wrong')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    results = []
+    for rows in (int(value) for value in args.rows.split(',')):
+        for name in args.matchers.split(','):
+            result = run_isolated(name, rows, corpus, args.repeat if rows <= 100000 else 1, args.seed)
+            results.append(result)
+            if 'error' in result:
+                print(f"  {rows:>9} rows, {name}: {result['error']}", file=sys.stderr)
+            else:
+                print(f"  {rows:>9} rows, {name}: F1 {result['f1']}, p50 {result['latency_ms']['p50']} ms",
+                      file=sys.stderr)
+    measured = [result for result in results if 'error' not in result]
+
+    print(f"\n{'rows':>9} {'matcher':<14} {'build s':>8} {'peak MB':>8} {'precision':>9} {'recall':>7} {'F1':>6} "
+          f"{'exact':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for result in results:
+        if 'error' in result:
+            print(f"{result['rows']:>9} {result['matcher']:<14} {result['error']}")
+            continue
+        latency = result['latency_ms']
+        print(f"{result['rows']:>9} {result['matcher']:<14} {result['build_s']:>8} {result['peak_rss_mb'] or '-':>8} "
+              f"{result['precision']:>9} {result['recall']:>7} {result['f1']:>6} {result['exact_match_rate']:>6} "
+              f"{latency['p50']:>8} {latency['p90']:>8} {latency['p99']:>8} {latency['max']:>8}")
+
+    categories = list(dict.fromkeys(item['category'] for item in corpus))
+    if not measured:
+        sys.exit(1)
+    print(f"\nRecall per category ('none': share of queries answered with no symptom), {measured[0]['rows']} rows:")
+    print(f"{'matcher':<14} " + ' '.join(f"{category:>11}" for category in categories))
+    for result in (result for result in measured if result['rows'] == measured[0]['rows']):
+        cells = []
+        for category in categories:
+            counts = result['categories'].get(category)
+            key = 'exact_match_rate' if category == 'none' else 'recall'
+            cells.append(f"{counts[key] if counts else '-':>11}")
+        print(f"{result['matcher']:<14} " + ' '.join(cells))
+
+    if args.errors:
+        for result in (result for result in measured if result['rows'] == measured[0]['rows']):
+            print(f"\n{result['matcher']} errors:")
+            for error in result['errors']:
+                print(f"  [{error['category']}] {error['query']!r}: expected {error['expected']}, got {error['predicted']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'revision': git_revision(),
+                       'python': platform.python_version(), 'threshold': MATCH_THRESHOLD,
+                       'config': {key: value for key, value in vars(args).items() if key != 'json'},
+                       'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\nSaved {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Microbenchmark for the fuzzy stage of HealthcareAssistant.find_matching_symptom
+at growing KB sizes.
+
+Compares the original matcher (lower-case the column, process.extractOne with
+fuzz.partial_ratio, then a DataFrame filter to find the row again, on every
+call) with the precomputed candidates and vectorized score bounds
+(find_top_matches). The real knowledge base rows are mixed into synthetic
+symptom names so the queries still hit. Both must return the same row and
+score. The spelling and semantic fallbacks that find_matching_symptom tries
+afterwards did not exist in the original and are not part of the comparison.
+Run from the CLI folder:
+    python benchmarks/bench_matching.py
+    python benchmarks/bench_matching.py --rows 25,10000,1000000 --baseline-max-rows 10000 --json matching.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import warnings
+
+CLI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CLI_DIR)
+
+import pandas as pd  # noqa: E402
+from fuzzywuzzy import fuzz, process  # noqa: E402
+
+from healthcare_agent import MATCH_THRESHOLD, HealthcareAssistant  # noqa: E402
+
+QUERIES = [
+    'fever',
+    'i have a bad headache since morning',
+    'pain in chest',
+    'stomach ache after food',
+    'coughing all night',
+    'xyzzy qwerty',
+]
+
+SYLLABLES = ['ka', 'ra', 'ma', 'ti', 'lo', 'pen', 'dur', 'sis', 'ache', 'itis', 'gia', 'rash', 'ful',
+             'ness', 'ing', 'ver', 'kle', 'ton', 'ble', 'ph', 'str', 'ough', 'ain']
+
+
+def synthetic_kb(kb, rows, seed):
+    """rows KB rows: the real ones at random positions, the rest made-up two-word symptom names"""
+    if rows <= len(kb):
+        return kb.head(rows).reset_index(drop=True)
+    rng = random.Random(seed)
+
+    def word():
+        return ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+
+    names = [f'{word()} {word()}'.title() for _ in range(rows - len(kb))]
+    fake = pd.DataFrame({'symptom_english': names, 'severity': 'H', 'advice_english': '', 'first_aid_english': ''})
+    df = pd.concat([fake, kb], ignore_index=True)
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def original_find_matching_symptom(df, user_input, col='symptom_english'):
+    """find_matching_symptom as first written, kept here as the baseline"""
+    if not user_input or len(user_input.strip()) < 3:
+        return None, 0
+    symptoms = df[col].str.lower().fillna('').tolist()
+    best_match = process.extractOne(user_input, symptoms, scorer=fuzz.partial_ratio)
+    if best_match and best_match[1] >= MATCH_THRESHOLD:
+        row = df[df[col].str.lower().fillna('') == best_match[0]]
+        if not row.empty:
+            return row.iloc[0], best_match[1]
+    return None, 0
+
+
+def make_assistant(df):
+    """A HealthcareAssistant over df without TTS, microphone or the KB file"""
+    assistant = HealthcareAssistant.__new__(HealthcareAssistant)
+    assistant.df = df
+    assistant.current_language = 'english'
+    assistant.match_candidates = {}
+    assistant.match_candidates_df = None
+    assistant.symptom_matcher = None
+    assistant.symptom_matcher_df = None
+    return assistant
+
+
+def fuzzy_match(assistant, query):
+    """(row, score) of the fuzzy stage alone, as the original matcher would answer"""
+    top = assistant.find_top_matches(query, 1, MATCH_THRESHOLD)
+    return top[0] if top else (None, 0)
+
+
+def time_calls(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def row_name(match):
+    row, score = match
+    return (None if row is None else row['symptom_english'], score)
+
+
+def bench(df, repeat, baseline):
+    assistant = make_assistant(df)
+    start = time.perf_counter()
+    assistant.get_match_candidates('symptom_english')
+    build = time.perf_counter() - start
+
+    result = {'rows': len(df), 'candidates_build_ms': round(build * 1000, 2), 'queries': {}}
+    for query in QUERIES:
+        seconds, match = time_calls(lambda: fuzzy_match(assistant, query), repeat)
+        entry = {'match': row_name(match), 'ms': round(seconds * 1000, 3)}
+        if baseline:
+            seconds, expected = time_calls(lambda: original_find_matching_symptom(df, query), max(1, repeat // 10))
+            entry['original_ms'] = round(seconds * 1000, 3)
+            entry['same_answer'] = row_name(expected) == entry['match']
+        result['queries'][query] = entry
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='25,10000,1000000', help='comma-separated KB sizes')
+    parser.add_argument('--repeat', type=int, default=20, help='timed calls per query (median reported)')
+    parser.add_argument('--baseline-max-rows', type=int, default=1000000,
+                        help='skip the original matcher above this many rows (it takes seconds per query at 1M)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')  # fuzzywuzzy warns about the pure-Python SequenceMatcher
+    kb = pd.read_csv(os.path.join(CLI_DIR, 'healthcare_kb.csv'))
+    results = []
+    for rows in (int(value) for value in args.rows.split(',')):
+        df = synthetic_kb(kb, rows, args.seed)
+        repeat = args.repeat if rows <= 100000 else max(3, args.repeat // 5)
+        results.append(bench(df, repeat, rows <= args.baseline_max_rows))
+
+    print(f"\n{'rows':>9} {'build ms':>9} {'query':<38} {'ms':>9} {'original ms':>12} {'speedup':>8}  match")
+    for result in results:
+        for query, entry in result['queries'].items():
+            original = entry.get('original_ms')
+            speedup = f"{original / entry['ms']:.0f}x" if original else '-'
+            same = '' if entry.get('same_answer', True) else '  DIFFERENT FROM ORIGINAL'
+            print(f"{result['rows']:>9} {result['candidates_build_ms']:>9} {query:<38} {entry['ms']:>9} "
+                  f"{original if original else '-':>12} {speedup:>8}  {entry['match']}{same}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+    if any(not entry.get('same_answer', True) for result in results for entry in result['queries'].values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
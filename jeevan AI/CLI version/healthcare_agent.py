@@ -3,21 +3,121 @@ Rural Healthcare AI Assistant
 Multilingual offline CLI tool simulating SMS/USSD/IVR experience
 """
 
-import pandas as pd
-import pyttsx3
-import speech_recognition as sr
+# pandas, pyttsx3, speech_recognition and fuzzywuzzy are imported lazily,
+# only when the feature that needs them is used, to keep kiosk startup fast.
 from colorama import Fore, Style, init
 import os
 import sys
 import platform
+import shutil
 import subprocess
-from fuzzywuzzy import fuzz, process
 import time
 import random
+import heapq
+import threading
+from collections import Counter
+from audio_cache import ESPEAK_VOICE, AudioCache, play_audio_file, sources_digest
+from recognizers import MicrophoneSession, NothingHeard, RecognizerUnavailable, create_recognizer
+from speech_queue import SpeechQueue, run_speech_command
 
 # Initialize colorama
 init(autoreset=True)
 
+# Optional: memory-mapped KB snapshots compiled by backend/kb_snapshot.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+try:
+    from kb_snapshot import load_snapshot, read_kb_csv, snapshot_path
+    from matcher import SEVERITY_RANK, SymptomMatcher, normalize_text
+except ImportError:
+    load_snapshot = read_kb_csv = SymptomMatcher = None
+
+def is_missing(value):
+    """True for empty KB cells (None from the lightweight loaders, NaN from pandas)"""
+    return value is None or value != value
+
+# Minimum fuzz.partial_ratio score for a confident match
+MATCH_THRESHOLD = 90
+
+class MatchCandidates:
+    """
+    Symptom names of one KB column, processed the way fuzzywuzzy's extract
+    functions process choices, with the count of every character in every
+    name so a query can be bounded against every name in one call.
+    """
+
+    def __init__(self, names):
+        import numpy as np
+        from fuzzywuzzy import utils
+        self.names = [utils.full_process(name) for name in names]
+        self.lengths = np.fromiter(map(len, self.names), dtype=np.int32, count=len(self.names))
+        # Every character of every name as an alphabet index, grouped by character
+        joined = ''.join(self.names)
+        self.alphabet = {char: char_id for char_id, char in enumerate(sorted(set(joined)))}
+        codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+        # 16-bit ids make the stable argsort below a linear radix sort
+        char_of_code = np.zeros(int(codes.max()) + 1 if len(codes) else 1,
+                                dtype=np.uint16 if len(self.alphabet) <= 1 << 16 else np.int32)
+        char_of_code[[ord(char) for char in self.alphabet]] = list(self.alphabet.values())
+        char_ids = char_of_code[codes]
+        order = np.argsort(char_ids, kind='stable')
+        char_ids = char_ids[order]
+        name_ids = np.repeat(np.arange(len(self.names)), self.lengths)[order]
+        # One run per (character, name) pair: its start, character, name and count
+        run_starts = np.flatnonzero(np.concatenate(([True], (char_ids[1:] != char_ids[:-1])
+                                                    | (name_ids[1:] != name_ids[:-1])))) if len(codes) else order
+        run_chars = char_ids[run_starts]
+        run_names = name_ids[run_starts]
+        run_counts = np.diff(np.append(run_starts, len(codes)))
+        # Counts in the smallest type that holds any of them
+        longest = int(self.lengths.max()) if len(self.names) else 0
+        self.count_dtype = next(t for t in (np.uint8, np.uint16, np.uint32) if longest <= np.iinfo(t).max)
+        self.max_count = int(np.iinfo(self.count_dtype).max)
+        self.nonzero = len(run_starts)
+
+        # A dense (character x name) table, or only the non-zero counts of each character
+        # (CSR) when that is smaller: names use few characters of a large alphabet
+        name_dtype = np.uint16 if len(self.names) <= 1 << 16 else np.uint32
+        count_size = np.dtype(self.count_dtype).itemsize
+        dense_nbytes = len(self.alphabet) * len(self.names) * count_size
+        sparse_nbytes = self.nonzero * (np.dtype(name_dtype).itemsize + count_size) + (len(self.alphabet) + 1) * 8
+        if sparse_nbytes < dense_nbytes:
+            self.char_counts = None
+            self.char_starts = np.searchsorted(run_chars, np.arange(len(self.alphabet) + 1))
+            self.count_names = run_names.astype(name_dtype)
+            self.counts = run_counts.astype(self.count_dtype)
+            self.counts_nbytes = sparse_nbytes
+        else:
+            self.char_counts = np.zeros((len(self.alphabet), len(self.names)), dtype=self.count_dtype)
+            self.char_counts[run_chars, run_names] = run_counts
+            self.counts_nbytes = dense_nbytes
+
+    def __len__(self):
+        return len(self.names)
+
+    def upper_bounds(self, query):
+        """
+        Upper bound of fuzz.partial_ratio(query, name) for every name, as an array.
+        partial_ratio compares the shorter string (length m) with windows of the
+        longer one; matched characters can never exceed the characters the two
+        strings share (ov), so the ratio is at most 2*ov / (m + ov).
+        """
+        import numpy as np
+        shared = np.zeros(len(self.names), dtype=np.int32)
+        for char, count in Counter(query).items():
+            char_id = self.alphabet.get(char)
+            if char_id is None:
+                continue
+            cap = min(count, self.max_count)
+            if self.char_counts is not None:
+                shared += np.minimum(self.char_counts[char_id], cap)
+            else:
+                start, end = self.char_starts[char_id], self.char_starts[char_id + 1]
+                # A name appears once per character, so the fancy-indexed add is exact
+                shared[self.count_names[start:end]] += np.minimum(self.counts[start:end], cap)
+        denominator = np.minimum(self.lengths, len(query)) + shared
+        # Exact integer ceil(200*ov / (m + ov)); 0 when either string is empty
+        return -(-200 * shared // np.maximum(denominator, 1))
+
 # Translation dictionary for UI
 TRANSLATIONS = {
     'welcome_title': {
@@ -45,6 +145,11 @@ TRANSLATIONS = {
         'hindi': "🩺 अपने लक्षण का वर्णन करें:",
         'tamil': "🩺 உங்கள் அறிகுறியை விவரிக்கவும்:"
     },
+    'multiple_found': {
+        'english': "You mentioned {count} symptoms. The most serious comes first:",
+        'hindi': "आपने {count} लक्षण बताए। सबसे गंभीर पहले है:",
+        'tamil': "நீங்கள் {count} அறிகுறிகளைக் குறிப்பிட்டீர்கள். மிகவும் தீவிரமானது முதலில்:"
+    },
     'no_match': {
         'english': "No specific match found for your symptom. Please try a different description or consult a doctor.",
         'hindi': "आपके लक्षण के लिए कोई विशिष्ट मेल नहीं मिला। कृपया कोई अन्य विवरण आज़माएं या डॉक्टर से सलाह लें।",
@@ -149,56 +254,292 @@ LABELS = {
     }
 }
 
+SEVERITY_TRANSLATIONS = {
+    'H': {'english': '🏠 HOME CARE', 'hindi': '🏠 घरेलू देखभाल', 'tamil': '🏠 வீட்டில் பராமரிப்பு'},
+    'D': {'english': '👨‍⚕️ DOCTOR VISIT', 'hindi': '👨‍⚕️ डॉक्टर को दिखाएँ', 'tamil': '👨‍⚕️ மருத்துவரை அணுகவும்'},
+    'E': {'english': '🚨 EMERGENCY', 'hindi': '🚨 आपातकाल', 'tamil': '🚨 அவசரம்'}
+}
+
+# Confidence values display_symptom_info can announce (matches score at least MATCH_THRESHOLD)
+SPOKEN_CONFIDENCES = range(MATCH_THRESHOLD, 101)
+# Largest symptom count "multiple_found" is pre-synthesized for: one description
+# rarely names more. Larger counts are synthesized when they are spoken.
+MAX_PRERENDERED_MENTIONS = 5
+
+def read_knowledge_base(csv_path='healthcare_kb.csv'):
+    """
+    Memory-map the compiled snapshot (healthcare_kb.kbsnap) when one exists
+    and matches the CSV; otherwise parse healthcare_kb.csv with the
+    lightweight stdlib loader, or pandas if the backend modules are absent.
+    """
+    if load_snapshot is not None:
+        table, _ = load_snapshot(csv_path)
+        if table is not None:
+            return table
+        table, _ = read_kb_csv(csv_path)
+        return table
+    import pandas as pd
+    return pd.read_csv(csv_path)
+
+def configure_tts_engine(engine):
+    """Voice and rate settings for a pyttsx3 engine; returns the (voice, rate) recordings are keyed on"""
+    voices = engine.getProperty('voices')
+    if voices:
+        # Set first available voice as default
+        engine.setProperty('voice', voices[0].id)
+        # Adjust rate for better clarity
+        rate = engine.getProperty('rate')
+        engine.setProperty('rate', max(150, rate - 50))
+    return f"pyttsx3:{engine.getProperty('voice')}", engine.getProperty('rate')
+
+def speech_sources_digest(csv_path='healthcare_kb.csv'):
+    """Digest of everything pre-synthesized utterances are built from"""
+    return sources_digest(csv_path, TRANSLATIONS, LABELS, SEVERITY_TRANSLATIONS)
+
+def clean_speech_text(text):
+    """Remove emojis and special characters for cleaner speech"""
+    return ''.join(c for c in text if c.isalnum() or c.isspace() or c in '.,!?')
+
+def symptom_fields(row, language):
+    """(name, advice, first aid) of a KB row in language, falling back to English where a translation is missing"""
+    values = []
+    for field in ('symptom', 'advice', 'first_aid'):
+        col = f"{field}_{language}"
+        values.append(row[col] if col in row and not is_missing(row[col]) else row[f"{field}_english"])
+    return tuple(values)
+
+def confidence_utterance(language, conf):
+    """The confidence line display_symptom_info says, the same for every KB row"""
+    return f"{LABELS[language]['confidence']}: {conf} percent"
+
+def symptom_utterances(row, language, conf):
+    """What display_symptom_info says about a KB row: symptom, confidence, severity, advice and first aid"""
+    name, advice, first_aid = symptom_fields(row, language)
+    severity_text = SEVERITY_TRANSLATIONS.get(row['severity'], {}).get(language, 'UNKNOWN')
+
+    labels = LABELS[language]
+    return [
+        f"{labels['symptom']}: {name}",
+        confidence_utterance(language, conf),
+        f"{labels['severity']}: {severity_text}",
+        f"{labels['advice']}: {advice}",
+        f"{labels['first_aid']}: {first_aid}",
+    ]
+
+def known_utterances(df):
+    """
+    Every (cleaned text, language) the assistant speaks from TRANSLATIONS,
+    LABELS and the knowledge base, for pre-synthesizing (see audio_cache.py)
+    """
+    utterances = {}
+    for language in LABELS:
+        texts = []
+        for key, translations in TRANSLATIONS.items():
+            value = translations.get(language)
+            if key == 'main_menu':
+                texts.append(" ".join(value))  # show_menu reads the whole menu at once
+            elif key == 'minutes_remaining':
+                texts.extend(f"{i} {value}" for i in range(5, 0, -1))
+            elif key == 'multiple_found':
+                texts.extend(value.format(count=count) for count in range(2, MAX_PRERENDERED_MENTIONS + 1))
+            elif isinstance(value, list):
+                texts.extend(value)
+            elif value:
+                texts.append(value)
+        texts.extend(confidence_utterance(language, conf) for conf in SPOKEN_CONFIDENCES)
+        for _, row in df.iterrows():
+            # Its confidence line is one of those above
+            texts.extend(symptom_utterances(row, language, MATCH_THRESHOLD))
+        for text in texts:
+            clean_text = clean_speech_text(text)
+            if clean_text.strip():
+                utterances[(clean_text, language)] = None
+    return list(utterances)
+
 class HealthcareAssistant:
-    def __init__(self):
+    def __init__(self, interactive=True):
+        """
+        The knowledge base, TTS engine and microphone start up concurrently in
+        the background, so the language prompt appears at once; wait_for_component()
+        blocks on one when it is needed. interactive=False skips TTS and microphone
+        setup and loads the knowledge base before returning, for batch processing
+        (see batch.py); it raises instead of falling back to the demo knowledge base.
+        """
         self.df = None
+        self.speech = None
+        self.startup_started = time.perf_counter()
+        self.startup_times = {}  # component -> (seconds after startup_started it began, seconds it took)
+        self.components = {}  # component -> threading.Event, set once it is usable (or has failed)
         self.tts_engine = None
+        self.tts_voice = None  # (voice, rate) of the live engine, which pre-synthesized audio must match
+        self.tts_rate = None
+        self.audio_cache = AudioCache()
         self.recognizer = None
         self.microphone = None
+        self.microphone_session = None  # opened at the first voice query, kept open until exit
         self.current_language = 'english'
         self.language_codes = {'english': 'en','hindi':'hi','tamil':'ta'}
-        self.setup_components()
-        self.load_knowledge_base()
+        self.kb_signature = None
+        self.match_candidates = {}  # column -> MatchCandidates for self.df
+        self.match_candidates_df = None
+        self.symptom_matcher = None  # backend SymptomMatcher over self.df, for multi-symptom input
+        self.symptom_matcher_df = None
+        self.recognizers = {}  # language -> recognizer for self.df (the grammar comes from the KB)
+        self.recognizers_df = None
+        if interactive:
+            self.setup_components()
+        else:
+            self.load_knowledge_base(create_demo=False)
 
     def get_text(self, key):
         return TRANSLATIONS.get(key, {}).get(self.current_language, key)
 
     def setup_components(self):
+        """Start the knowledge base, TTS and microphone initialization side by side"""
+        # Speech runs on its own thread so printed text never waits for the voice. Until the
+        # engine is ready, utterances wait in the queue and skip() drops them with the screen.
+        self.speech = SpeechQueue(self.speak_now, on_start=self.timed_component('tts', self.init_tts_engine))
+        self.components['tts'] = self.speech.ready
+        self.speech.start()
+        for name, init in (('knowledge base', self.load_knowledge_base), ('microphone', self.init_microphone)):
+            self.components[name] = threading.Event()
+            threading.Thread(target=self.timed_component(name, init), name=f'init-{name}', daemon=True).start()
+
+    def timed_component(self, name, init):
+        """Wrap init to record its timing in startup_times and mark the component ready when it returns"""
+        def run():
+            started = time.perf_counter()
+            try:
+                init()
+            except Exception as e:
+                print(f"{Fore.YELLOW}⚠️ {name} setup failed: {e}")
+            finally:
+                self.startup_times[name] = (started - self.startup_started, time.perf_counter() - started)
+                if name in self.components:
+                    self.components[name].set()
+        return run
+
+    def component_ready(self, name):
+        return name not in self.components or self.components[name].is_set()
+
+    def wait_for_component(self, name, timeout=None):
+        return name not in self.components or self.components[name].wait(timeout)
+
+    def init_microphone(self):
         try:
-            import pyttsx3
-            self.tts_engine = pyttsx3.init()
-            voices = self.tts_engine.getProperty('voices')
-            if voices:
-                # Set first available voice as default
-                self.tts_engine.setProperty('voice', voices[0].id)
-                # Adjust rate for better clarity
-                rate = self.tts_engine.getProperty('rate')
-                self.tts_engine.setProperty('rate', max(150, rate - 50))
-            print(f"{Fore.GREEN}✅ Offline TTS initialized successfully")
-            
             import speech_recognition as sr
-            self.recognizer = sr.Recognizer()
+            recognizer = sr.Recognizer()
             self.microphone = sr.Microphone()
+            self.recognizer = recognizer
             print(f"{Fore.GREEN}✅ Speech recognition available")
         except Exception as e:
+            print(f"{Fore.YELLOW}⚠️ Speech recognition setup warning: {e}")
+            print(f"{Fore.YELLOW}   Fallback: Text input available")
+
+    def print_startup_profile(self, prompt_shown_at):
+        """Per-component start and init times, for --profile-startup"""
+        for name in self.components:
+            self.wait_for_component(name, timeout=30)
+        print(f"\n{Fore.CYAN}⏱️ Startup profile (ms after the assistant was created)")
+        print(f"   language prompt shown at {prompt_shown_at * 1000:7.1f}")
+        for name, (began, took) in sorted(self.startup_times.items(), key=lambda item: item[1]):
+            print(f"   {name:<16} started {began * 1000:7.1f}   took {took * 1000:7.1f}   "
+                  f"ready at {(began + took) * 1000:7.1f}")
+
+    def init_tts_engine(self):
+        """Create the pyttsx3 engine; runs on the speech thread, which is the only one that uses it"""
+        try:
+            import pyttsx3
+            self.tts_engine = pyttsx3.init()
+            self.tts_voice, self.tts_rate = configure_tts_engine(self.tts_engine)
+            # Lets skip() and urgent speech cut an utterance off between words
+            self.tts_engine.connect('started-word', self.stop_interrupted_speech)
+            print(f"{Fore.GREEN}✅ Offline TTS initialized successfully")
+        except Exception as e:
+            self.tts_engine = None
+            if platform.system() == "Linux" and shutil.which('espeak'):
+                self.tts_voice = ESPEAK_VOICE  # speak_now falls back to espeak
             print(f"{Fore.YELLOW}⚠️ TTS setup warning: {e}")
             print(f"{Fore.YELLOW}   Fallback: Text-only mode available")
 
-    def load_knowledge_base(self):
+    def stop_interrupted_speech(self, name, location, length):
+        if self.speech.interrupted.is_set():
+            self.tts_engine.stop()
+
+    def load_knowledge_base(self, create_demo=True):
+        """
+        Load healthcare_kb.csv. When it is missing or cannot be read, a demo
+        knowledge base is written and used instead, or, with create_demo=False,
+        the error is raised (batch results must never come from the demo rows).
+        """
         try:
             if not os.path.exists('healthcare_kb.csv'):
                 print(f"{Fore.RED}Error: healthcare_kb.csv not found!")
+                if not create_demo:
+                    raise FileNotFoundError("healthcare_kb.csv not found")
                 # Create a minimal demo knowledge base
                 self.create_demo_knowledge_base()
                 print(f"{Fore.GREEN}✅ Created demo knowledge base")
             else:
-                self.df = pd.read_csv('healthcare_kb.csv')
+                self.kb_signature = self.knowledge_base_signature()
+                df = self.read_knowledge_base()
+                if df.empty or 'severity' not in df.columns:
+                    raise ValueError("knowledge base is empty or missing columns")
+                self.df = df
                 print(f"{Fore.GREEN}✅ Knowledge base loaded: {len(self.df)} symptoms available")
+                self.check_audio_cache()
         except Exception as e:
+            if not create_demo:
+                raise
             print(f"{Fore.RED}Error loading knowledge base: {e}")
             self.create_demo_knowledge_base()
             print(f"{Fore.GREEN}✅ Created demo knowledge base as fallback")
 
+    def read_knowledge_base(self):
+        return read_knowledge_base('healthcare_kb.csv')
+
+    def knowledge_base_signature(self):
+        """Return (mtime, inode, size) of healthcare_kb.csv and its snapshot, or None if the CSV is missing"""
+        signature = []
+        paths = ['healthcare_kb.csv'] + ([snapshot_path('healthcare_kb.csv')] if load_snapshot else [])
+        for path in paths:
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_ino, st.st_size))
+            except OSError:
+                if path == 'healthcare_kb.csv':
+                    return None
+                signature.append(None)
+        return tuple(signature)
+
+    def reload_knowledge_base_if_changed(self):
+        """
+        Reload healthcare_kb.csv if it changed on disk since it was loaded.
+        The new table is fully parsed before it replaces self.df, so a bad
+        edit keeps the previous knowledge base in use.
+        """
+        signature = self.knowledge_base_signature()
+        if signature is None or signature == self.kb_signature:
+            return False
+        self.kb_signature = signature
+        try:
+            df = self.read_knowledge_base()
+            if df.empty or 'severity' not in df.columns:
+                raise ValueError("knowledge base is empty or missing columns")
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️ Knowledge base reload failed, keeping previous version: {e}")
+            return False
+        self.df = df
+        print(f"{Fore.GREEN}✅ Knowledge base reloaded: {len(self.df)} symptoms available")
+        self.check_audio_cache()
+        return True
+
+    def check_audio_cache(self):
+        """Warn when pre-synthesized audio predates the current KB or translations"""
+        if self.audio_cache.exists() and not self.audio_cache.is_current(speech_sources_digest()):
+            print(f"{Fore.YELLOW}⚠️ Audio cache is out of date: run 'python audio_cache.py' "
+                  f"(changed texts are synthesized live until then)")
+
     def create_demo_knowledge_base(self):
         """Create a simple demo knowledge base if the main one is not available"""
         data = {
@@ -249,18 +590,32 @@ class HealthcareAssistant:
                 'இருமல் மாத்திரைகள் பயன்படுத்தி நீரேற்றம் செய்யவும்'
             ]
         }
+        import pandas as pd
         self.df = pd.DataFrame(data)
         self.df.to_csv('healthcare_kb.csv', index=False)
+        self.kb_signature = self.knowledge_base_signature()
 
-    def speak_text(self, text):
+    def speak_text(self, text, urgent=False):
         """
-        Enhanced offline text-to-speech with multiple fallback options
+        Queue text to be spoken and return at once. Urgent text (emergencies)
+        interrupts other speech and is spoken before anything else queued.
         """
-        # Remove emojis and special characters for cleaner speech
-        clean_text = ''.join(c for c in text if c.isalnum() or c.isspace() or c in '.,!?')
+        self.speech.say(text, urgent)
+
+    def speak_now(self, text, interrupted):
+        """
+        Enhanced offline text-to-speech with multiple fallback options.
+        Runs on the speech thread and stops early when interrupted is set.
+        """
+        clean_text = clean_speech_text(text)
         
         if not clean_text.strip():
             return
+        
+        # Method 0: Play a recording pre-synthesized by audio_cache.py
+        recording = self.audio_cache.lookup(clean_text, self.current_language, self.tts_voice, self.tts_rate)
+        if recording and play_audio_file(recording, interrupted):
+            return
             
         # Method 1: Try pyttsx3 (cross-platform offline TTS)
         if self.tts_engine:
@@ -277,20 +632,20 @@ class HealthcareAssistant:
             if system == "Windows":
                 # Windows SAPI via PowerShell
                 cmd = f'powershell -Command "Add-Type -AssemblyName System.Speech; (New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak(\'{clean_text}\')"'
-                subprocess.run(cmd, shell=True, capture_output=True, timeout=10)
+                run_speech_command(cmd, interrupted, shell=True)
                 return
                 
             elif system == "Darwin":  # macOS
-                subprocess.run(['say', clean_text], timeout=10)
+                run_speech_command(['say', clean_text], interrupted)
                 return
                 
             elif system == "Linux":
                 # Try espeak first, then festival
                 try:
-                    subprocess.run(['espeak', clean_text], timeout=10, capture_output=True)
+                    run_speech_command(['espeak', clean_text], interrupted)
                     return
                 except FileNotFoundError:
-                    subprocess.run(['festival', '--tts'], input=clean_text, text=True, timeout=10)
+                    run_speech_command(['festival', '--tts'], interrupted, input_text=clean_text)
                     return
                     
         except (subprocess.TimeoutExpired, FileNotFoundError, Exception) as e:
@@ -305,6 +660,7 @@ class HealthcareAssistant:
         self.speak_text(prompt)
         while True:
             choice = input("Enter choice (1-3): ").strip()
+            self.speech.skip()
             if choice=='1': 
                 self.current_language='english'
                 break
@@ -354,24 +710,44 @@ class HealthcareAssistant:
             return self.get_text_input(prompt)
 
     def get_voice_input(self, prompt):
-        """Get input via voice recognition"""
+        """Get input via voice recognition (offline Vosk when a model is installed, else Google)"""
+        if not self.component_ready('microphone'):
+            wait_msg = "⏳ Voice input is still starting up. Using text input this time..."
+            print(wait_msg)
+            self.speak_text(wait_msg)
+            return self.get_text_input(prompt)
+        recognizer = self.get_recognizer()
+        if recognizer is None:
+            error_msg = "❌ Speech recognition unavailable. Falling back to text input..."
+            print(error_msg)
+            self.speak_text(error_msg)
+            return self.get_text_input(prompt)
+
+        def on_ready():
+            listen_msg = "🎤 Listening for 10 seconds... speak now"
+            print(listen_msg)
+            self.speak_text(listen_msg)
+            self.speech.wait()
+
+        def on_partial(text):
+            # Rewrite one line while the user is still speaking
+            print(f"\r… {text}\033[K", end='', flush=True)
+
         try:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                listen_msg = "🎤 Listening for 10 seconds... speak now"
-                print(listen_msg)
-                self.speak_text(listen_msg)
-                audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=10)
-                text = self.recognizer.recognize_google(audio, language=self.language_codes[self.current_language])
-                print(f"📝 You said: {text}")
-                self.speak_text(f"You said: {text}")
-                return text.lower().strip()
-        except (sr.UnknownValueError, sr.WaitTimeoutError):
+            # The microphone must not pick up our own voice
+            self.speech.skip()
+            self.speech.wait()
+            text = recognizer.listen(on_ready=on_ready, on_partial=on_partial)
+            print(f"\r\033[K📝 You said: {text}")
+            self.speak_text(f"You said: {text}")
+            return text.lower().strip()
+        except NothingHeard:
+            print("\r\033[K", end='')
             fallback_msg = self.get_text('voice_fallback')
             print(fallback_msg)
             self.speak_text(fallback_msg)
             return self.get_text_input(prompt)
-        except sr.RequestError:
+        except RecognizerUnavailable:
             error_msg = "❌ Speech recognition service unavailable. Falling back to text input..."
             print(error_msg)
             self.speak_text(error_msg)
@@ -382,6 +758,40 @@ class HealthcareAssistant:
             self.speak_text(error_msg)
             return self.get_text_input(prompt)
 
+    def get_recognizer(self):
+        """Speech recognizer for the current language, built once per loaded knowledge base and language"""
+        if self.recognizers_df is not self.df:
+            self.recognizers = {}
+            self.recognizers_df = self.df
+        if self.current_language not in self.recognizers:
+            self.recognizers[self.current_language] = create_recognizer(
+                self.current_language, self.language_codes[self.current_language],
+                self.get_microphone_session(), self.recognizer, self.speech_grammar())
+        return self.recognizers[self.current_language]
+
+    def get_microphone_session(self):
+        """The open microphone stream shared by all voice queries; None without a usable microphone"""
+        if self.microphone_session is None and self.microphone is not None:
+            try:
+                # Noise is only measured while our own voice is silent
+                self.microphone_session = MicrophoneSession(self.microphone, may_calibrate=self.speech.idle).start()
+            except Exception as e:
+                print(f"{Fore.YELLOW}⚠️ Microphone unavailable: {e}")
+                self.microphone = None
+        return self.microphone_session
+
+    def speech_grammar(self):
+        """Symptom names of the current language and their words, the phrases Vosk may recognize"""
+        col = f"symptom_{self.current_language}"
+        if self.df is None or col not in self.df.columns:
+            return None
+        phrases = set()
+        for name in self.get_column_values(col):
+            if name:
+                phrases.add(name)
+                phrases.update(name.split())
+        return sorted(phrases)
+
     def get_text_input(self, prompt):
         """Get input via text"""
         print(f"\n{prompt}")
@@ -389,66 +799,173 @@ class HealthcareAssistant:
         return user_input
 
     def find_matching_symptom(self, user_input):
+        # Same result as process.extractOne(user_input, names, scorer=fuzz.partial_ratio)
+        # with a score of at least MATCH_THRESHOLD (higher threshold for better accuracy)
+        top = self.find_top_matches(user_input, 1, MATCH_THRESHOLD)
+        if top:
+            return top[0]
+        # Romanized Hindi/Tamil and typos ("talai vali", "bukhaar"): the backend's spelling index
+        if SymptomMatcher is not None and user_input:
+            matcher = self.get_symptom_matcher()
+            text = normalize_text(user_input)
+            symptom_id, score = matcher.spelling_match(text)
+            if score >= MATCH_THRESHOLD:
+                return self.get_row(symptom_id), min(score, 100)
+        return None, 0
+
+    def get_match_candidates(self, col):
+        """MatchCandidates of one column, built once per loaded knowledge base and language"""
+        if self.match_candidates_df is not self.df:
+            self.match_candidates = {}
+            self.match_candidates_df = self.df
+        if col not in self.match_candidates:
+            self.match_candidates[col] = MatchCandidates(self.get_column_values(col))
+        return self.match_candidates[col]
+
+    def find_top_matches(self, user_input, n=5, min_score=0):
+        """
+        Return up to n (row, score) pairs with a score of at least min_score,
+        best first, scored with fuzz.partial_ratio against the symptom names of
+        the current language. Ties go to the row listed first, so the top entry
+        is exactly what process.extractOne would pick. One vectorized call
+        bounds the score of every name; partial_ratio then only runs on names
+        that can still make the top n, highest bounds first, so a query costs
+        about the same on 25 rows as on thousands.
+        """
         # First check if input is empty or too short
-        if not user_input or len(user_input.strip()) < 3:
-            return None, 0
+        if not user_input or len(user_input.strip()) < 3 or n < 1:
+            return []
             
         col = f"symptom_{self.current_language}"
         if col not in self.df.columns: 
             col = "symptom_english"
             
-        symptoms = self.df[col].str.lower().fillna('').tolist()
+        candidates = self.get_match_candidates(col)
+        import numpy as np
+        from fuzzywuzzy import fuzz, utils
+        
+        query = utils.full_process(user_input)
+        if not query:
+            return []
         
-        # Use partial ratio for better matching of partial words
-        best_match = process.extractOne(user_input, symptoms, scorer=fuzz.partial_ratio)
+        bounds = candidates.upper_bounds(query)
+        indexes = np.flatnonzero(bounds >= min_score) if min_score > 0 else np.arange(len(bounds))
+        # Highest bound first; the stable sort keeps equal bounds in row order
+        order = indexes[np.argsort(-bounds[indexes].astype(np.int16), kind='stable')]
         
-        if best_match and best_match[1] >= 90:  # Higher threshold for better accuracy
-            row = self.df[self.df[col].str.lower().fillna('') == best_match[0]]
-            if not row.empty: 
-                return row.iloc[0], best_match[1]
+        # Min-heap of (score, -row index): heap[0] is the weakest of the n kept
+        heap = []
+        for index, bound in zip(order.tolist(), bounds[order].tolist()):
+            if len(heap) == n and (bound, -index) <= heap[0]:
+                if bound < heap[0][0]:
+                    break  # no remaining name can beat the n-th best
+                continue
+            # Use partial ratio for better matching of partial words
+            score = fuzz.partial_ratio(query, candidates.names[index])
+            if score < min_score:
+                continue
+            item = (score, -index)
+            if len(heap) < n:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
                 
-        return None, 0
+        return [(self.get_row(-negative_index), score) for score, negative_index in sorted(heap, reverse=True)]
+
+    def get_symptom_matcher(self):
+        """The backend's SymptomMatcher over the current knowledge base, built once per load"""
+        if self.symptom_matcher_df is not self.df:
+            if hasattr(self.df, 'build_matcher'):
+                self.symptom_matcher = self.df.build_matcher()
+            else:
+                self.symptom_matcher = SymptomMatcher.from_dataframe(self.df)
+            self.symptom_matcher_df = self.df
+        return self.symptom_matcher
+
+    def find_all_symptoms(self, user_input):
+        """
+        Return (row, matched text) for every KB symptom mentioned in the input,
+        most severe first, e.g. "fever and cough and leg pain" gives three rows.
+        Names and patterns of all languages are found in one pass over the
+        input. Empty when the backend modules are not available.
+        """
+        if SymptomMatcher is None or not user_input:
+            return []
+        matcher = self.get_symptom_matcher()
+        mentions, text = matcher.find_mentions(user_input)
+        matched_text = {}
+        for symptom_id, start, end in mentions:
+            matched_text.setdefault(symptom_id, text[start:end])
+        def severity_rank(symptom_id):
+            return SEVERITY_RANK.get(matcher.symptoms[symptom_id]['severity'], -1)
+        
+        ranked = sorted(matched_text, key=severity_rank, reverse=True)
+        return [(self.get_row(symptom_id), matched_text[symptom_id]) for symptom_id in ranked]
+
+    def diagnose(self, user_input):
+        """
+        (row, confidence) pairs for a symptom description: every symptom it
+        names, most severe first, when it names more than one; otherwise the
+        best fuzzy match if it scores at least MATCH_THRESHOLD; else empty.
+        """
+        mentioned = self.find_all_symptoms(user_input)
+        if len(mentioned) > 1:
+            # Each symptom was named verbatim in the description
+            return [(row, 100) for row, _ in mentioned]
+        row, conf = self.find_matching_symptom(user_input)
+        return [(row, conf)] if row is not None else []
+
+    def get_column_values(self, col):
+        """Lower-cased values of one KB column (lightweight table, snapshot or DataFrame)"""
+        if hasattr(self.df, 'column'):
+            return [(value or '').lower() for value in self.df.column(col)]
+        return self.df[col].str.lower().fillna('').tolist()
+
+    def get_row(self, index):
+        """One KB row by position (lightweight table, snapshot or DataFrame)"""
+        if hasattr(self.df, 'row'):
+            return self.df.row(index)
+        return self.df.iloc[index]
 
     def display_symptom_info(self, row, conf):
-        col = f"symptom_{self.current_language}"
-        name = row[col] if col in row and not pd.isna(row[col]) else row['symptom_english']
+        symptom_line, confidence_line, severity_line, advice_line, first_aid_line = \
+            symptom_utterances(row, self.current_language, conf)
 
-        SEVERITY_TRANSLATIONS = {
-            'H': {'english': '🏠 HOME CARE', 'hindi': '🏠 घरेलू देखभाल', 'tamil': '🏠 வீட்டில் பராமரிப்பு'},
-            'D': {'english': '👨‍⚕️ DOCTOR VISIT', 'hindi': '👨‍⚕️ डॉक्टर को दिखाएँ', 'tamil': '👨‍⚕️ மருத்துவரை அணுகவும்'},
-            'E': {'english': '🚨 EMERGENCY', 'hindi': '🚨 आपातकाल', 'tamil': '🚨 அவசரம்'}
-        }
+        # Emergencies are spoken before anything else
+        urgent = row['severity'] == 'E'
 
         color_map = {'H': Fore.GREEN, 'D': Fore.YELLOW, 'E': Fore.RED}
         color = color_map.get(row['severity'], Fore.WHITE)
         severity_text = SEVERITY_TRANSLATIONS.get(row['severity'], {}).get(self.current_language, 'UNKNOWN')
 
-        advice_col = f"advice_{self.current_language}"
-        advice = row[advice_col] if advice_col in row and not pd.isna(row[advice_col]) else row['advice_english']
-        
-        first_aid_col = f"first_aid_{self.current_language}"
-        first_aid = row[first_aid_col] if first_aid_col in row and not pd.isna(row[first_aid_col]) else row['first_aid_english']
-
         print(f"\n{Fore.CYAN}{'='*50}")
         labels = LABELS[self.current_language]
 
-        print(f"{labels['symptom']}: {name}")
-        self.speak_text(f"{labels['symptom']}: {name}")
+        print(symptom_line)
+        self.speak_text(symptom_line, urgent)
 
         print(f"{labels['confidence']}: {conf}%")
-        self.speak_text(f"{labels['confidence']}: {conf} percent")
+        self.speak_text(confidence_line, urgent)
 
         print(f"{labels['severity']}: {color}{severity_text}")
-        self.speak_text(f"{labels['severity']}: {severity_text}")
+        self.speak_text(severity_line, urgent)
 
-        print(f"{labels['advice']}: {advice}")
-        self.speak_text(f"{labels['advice']}: {advice}")
+        print(advice_line)
+        self.speak_text(advice_line, urgent)
 
-        print(f"{labels['first_aid']}: {first_aid}")
-        self.speak_text(f"{labels['first_aid']}: {first_aid}")
+        print(first_aid_line)
+        self.speak_text(first_aid_line, urgent)
 
         print(f"{Fore.CYAN}{'='*50}")
 
+    def display_multiple_symptoms(self, matches):
+        """Show every symptom found in one description, most severe first"""
+        message = self.get_text('multiple_found').format(count=len(matches))
+        print(f"\n{Fore.CYAN}{message}")
+        self.speak_text(message)
+        for row, conf in matches:
+            self.display_symptom_info(row, conf)
+
     def display_general_advice(self):
         """Display general health advice when no specific symptom is matched"""
         print(f"\n{Fore.YELLOW}{'='*50}")
@@ -475,7 +992,7 @@ class HealthcareAssistant:
         for _, r in self.df.iterrows():
             sev = r['severity']
             color = {'H': Fore.GREEN, 'D': Fore.YELLOW, 'E': Fore.RED}.get(sev, Fore.WHITE)
-            name = r[col] if not pd.isna(r[col]) else r['symptom_english']
+            name = r[col] if not is_missing(r[col]) else r['symptom_english']
             print(f"{color}• {name} ({sev})")
         self.speak_text("Displayed all symptoms")
 
@@ -492,34 +1009,41 @@ class HealthcareAssistant:
         print(f"{Fore.YELLOW}{first_aid_msg}")
         print(f"{Fore.RED}{Style.BRIGHT}" + "!" * 60)
         
-        # Speak the emergency messages
-        self.speak_text(emergency_msg)
-        time.sleep(2)
-        self.speak_text(first_aid_msg)
+        # Speak the emergency messages ahead of anything else
+        self.speak_text(emergency_msg, urgent=True)
+        self.speak_text(first_aid_msg, urgent=True)
         
         # Countdown to simulate waiting for ambulance
         arrival_time_msg = self.get_text('ambulance_arrival_time')
         print(f"\n{Fore.CYAN}{arrival_time_msg}")
-        self.speak_text(arrival_time_msg)
+        self.speak_text(arrival_time_msg, urgent=True)
         
         minutes_remaining_text = self.get_text('minutes_remaining')
         for i in range(5, 0, -1):
             countdown_msg = f"{i} {minutes_remaining_text}"
             print(f"{Fore.CYAN}{countdown_msg}")
-            self.speak_text(countdown_msg)
+            self.speak_text(countdown_msg, urgent=True)
             time.sleep(1)
             
         ambulance_arrived_msg = self.get_text('ambulance_arrived')
         print(f"{Fore.GREEN}{ambulance_arrived_msg}")
-        self.speak_text(ambulance_arrived_msg)
+        self.speak_text(ambulance_arrived_msg, urgent=True)
 
-    def run(self):
+    def run(self, profile_startup=False):
+        prompt_shown_at = time.perf_counter() - self.startup_started
         self.select_language()
         self.show_welcome_screen()
+        # Everything from here on needs the knowledge base
+        self.wait_for_component('knowledge base')
+        if profile_startup:
+            self.print_startup_profile(prompt_shown_at)
         
         while True:
+            self.reload_knowledge_base_if_changed()
             self.show_menu()
             choice = input("Enter choice (1-5): ").strip()
+            # A new screen: whatever was still being read out is stale now
+            self.speech.skip()
             
             if choice == '1':
                 user_input = self.get_multilingual_input(self.get_text('describe_symptom'))
@@ -527,10 +1051,12 @@ class HealthcareAssistant:
                     print("Please provide a more detailed description of your symptom.")
                     self.speak_text("Please provide a more detailed description of your symptom.")
                     continue
-                    
-                row, conf = self.find_matching_symptom(user_input)
-                if row is not None: 
-                    self.display_symptom_info(row, conf)
+                
+                matches = self.diagnose(user_input)
+                if len(matches) > 1:
+                    self.display_multiple_symptoms(matches)
+                elif matches:
+                    self.display_symptom_info(*matches[0])
                 else: 
                     self.display_general_advice()
                     
@@ -547,6 +1073,9 @@ class HealthcareAssistant:
                 msg = self.get_text('thank_you')
                 print(msg)
                 self.speak_text(msg)
+                self.speech.close(timeout=10)
+                if self.microphone_session is not None:
+                    self.microphone_session.close()
                 break
                 
             else: 
@@ -554,9 +1083,14 @@ class HealthcareAssistant:
                 self.speak_text("Invalid. Enter 1 to 5.")
 
 def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Rural Healthcare AI Assistant')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print how long the knowledge base, TTS and microphone took to initialize')
+    args = parser.parse_args()
     try:
         assistant = HealthcareAssistant()
-        assistant.run()
+        assistant.run(profile_startup=args.profile_startup)
     except KeyboardInterrupt:
         print("\n👋 Exiting... Stay safe!")
     except Exception as e:
@@ -0,0 +1,342 @@
+# recognizers.py - Pluggable speech-to-text backends for get_voice_input
+#
+# VoskRecognizer decodes offline and streams: audio chunks are decoded as
+# they arrive and partial hypotheses are reported while the user speaks.
+# GoogleRecognizer is the original online path through speech_recognition.
+# Both read from an audio source, a live microphone or a WAV file, so the
+# offline path can be checked without a microphone:
+#
+#     python recognizers.py --wav fever.wav --model models/english
+#     python recognizers.py --wav fever.wav --model models/hindi --grammar "बुखार,खांसी"
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import wave
+
+# Vosk models, one folder per language: models/english, models/hindi, models/tamil
+# (unpacked from https://alphacephei.com/vosk/models)
+VOSK_MODEL_DIR = os.environ.get('VOSK_MODEL_DIR', 'models')
+# 'kb' limits Vosk to the knowledge base's symptom words, 'off' allows any word
+VOSK_GRAMMAR = os.environ.get('VOSK_GRAMMAR', 'kb')
+
+# Seconds of audio one attempt listens to (the same window recognize_google got)
+LISTEN_SECONDS = 10
+UNKNOWN_WORD = '[unk]'
+
+
+class NothingHeard(Exception):
+    """No speech, or nothing that could be recognized"""
+
+
+class RecognizerUnavailable(Exception):
+    """The recognizer cannot run (no network for the online backend, broken model, ...)"""
+
+
+class WavFileSource:
+    """16-bit mono PCM chunks read from a WAV file, optionally paced like a live microphone"""
+
+    def __init__(self, path, chunk_frames=4000, realtime=False):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.realtime = realtime
+        self.sample_rate = None
+        self.wav = None
+
+    def __enter__(self):
+        self.wav = wave.open(self.path, 'rb')
+        if self.wav.getnchannels() != 1 or self.wav.getsampwidth() != 2:
+            self.wav.close()
+            raise RecognizerUnavailable(f"{self.path}: expected 16-bit mono WAV")
+        self.sample_rate = self.wav.getframerate()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wav.close()
+
+    def chunks(self):
+        while True:
+            data = self.wav.readframes(self.chunk_frames)
+            if not data:
+                return
+            if self.realtime:
+                time.sleep(len(data) / 2 / self.sample_rate)
+            yield data
+
+
+class MicrophoneSession:
+    """
+    One microphone stream, opened at the first voice query and kept open
+    until close(), so no query pays for opening the device or for a fixed
+    second of adjust_for_ambient_noise.
+
+    A reader thread consumes the stream continuously. While nobody is
+    listening (and may_calibrate() allows it, i.e. our own voice is not
+    playing) it tracks the background noise the way speech_recognition's
+    dynamic energy threshold does. chunks() hands out the audio of one
+    utterance and ends by energy-based voice activity detection: PAUSE_SECONDS
+    of quiet after speech, WAIT_SECONDS without any speech, or LISTEN_SECONDS
+    of speech, whichever comes first.
+    """
+
+    CALIBRATION_SECONDS = 0.5   # noise measured before the first capture
+    PAUSE_SECONDS = 0.8         # quiet after speech that ends a capture (speech_recognition's pause_threshold)
+    WAIT_SECONDS = LISTEN_SECONDS
+    ENERGY_RATIO = 1.5          # speech is this much louder than the noise floor
+    DAMPING = 0.15              # fraction of the old threshold left after one second
+    MIN_ENERGY_THRESHOLD = 50
+
+    def __init__(self, microphone, may_calibrate=None):
+        self.microphone = microphone
+        self.may_calibrate = may_calibrate
+        self.energy_threshold = None
+        self.heard_speech = False
+        self.sample_rate = None
+        self.sample_width = None
+        self.calibrated = threading.Event()
+        self._chunks = queue.Queue()
+        self._capturing = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._error = None
+
+    def start(self):
+        source = self.microphone.__enter__()
+        if source.stream is None:
+            self.microphone.__exit__(None, None, None)
+            raise RecognizerUnavailable("could not open the microphone")
+        self.sample_rate = source.SAMPLE_RATE
+        self.sample_width = source.SAMPLE_WIDTH
+        self._thread = threading.Thread(target=self._read, args=(source,), name='microphone', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._closed = True
+        if self._thread is not None:
+            self._thread.join(2)
+            self._thread = None
+            self.microphone.__exit__(None, None, None)
+
+    def _read(self, source):
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        calibrated_seconds = 0.0
+        try:
+            while not self._closed:
+                chunk = source.stream.read(source.CHUNK)
+                with self._lock:
+                    if self._capturing:
+                        self._chunks.put(chunk)
+                        continue
+                if self.may_calibrate is not None and not self.may_calibrate():
+                    continue
+                self._adjust_threshold(chunk_energy(chunk), seconds_per_chunk)
+                calibrated_seconds += seconds_per_chunk
+                if calibrated_seconds >= self.CALIBRATION_SECONDS:
+                    self.calibrated.set()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.calibrated.set()
+            self._chunks.put(None)
+
+    def _adjust_threshold(self, energy, seconds):
+        target = max(energy * self.ENERGY_RATIO, self.MIN_ENERGY_THRESHOLD)
+        if self.energy_threshold is None:
+            self.energy_threshold = target
+        else:
+            damping = self.DAMPING ** seconds
+            self.energy_threshold = self.energy_threshold * damping + target * (1 - damping)
+
+    def __enter__(self):
+        self.heard_speech = False
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._capturing = False
+
+    def chunks(self):
+        self.calibrated.wait()
+        if self._error is not None:
+            raise RecognizerUnavailable(f"microphone stopped: {self._error}")
+        # Audio recorded before now (our own prompt, say) is not part of the answer
+        with self._lock:
+            self._chunks = queue.Queue()
+            self._capturing = True
+        seconds_per_chunk = None
+        waited = spoken = quiet = 0.0
+        while True:
+            try:
+                chunk = self._chunks.get(timeout=1)
+            except queue.Empty:
+                raise RecognizerUnavailable("microphone delivers no audio")
+            if chunk is None:
+                return
+            yield chunk
+            if seconds_per_chunk is None:
+                seconds_per_chunk = len(chunk) / self.sample_width / self.sample_rate
+            loud = chunk_energy(chunk) > self.energy_threshold
+            if not self.heard_speech:
+                if loud:
+                    self.heard_speech = True
+                else:
+                    # Silence before speech also refines the noise floor
+                    self._adjust_threshold(chunk_energy(chunk), seconds_per_chunk)
+                    waited += seconds_per_chunk
+                    if waited >= self.WAIT_SECONDS:
+                        return
+                continue
+            spoken += seconds_per_chunk
+            quiet = 0.0 if loud else quiet + seconds_per_chunk
+            if quiet >= self.PAUSE_SECONDS or spoken >= LISTEN_SECONDS:
+                return
+
+
+def chunk_energy(chunk):
+    """RMS of 16-bit little-endian PCM (what audioop.rms(chunk, 2) returns)"""
+    import numpy as np
+    samples = np.frombuffer(chunk, dtype='<i2').astype(np.float64)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+
+_vosk_models = {}
+
+
+def load_vosk_model(model_path):
+    """Load a Vosk model once per process (large models take seconds)"""
+    if model_path not in _vosk_models:
+        import vosk
+        vosk.SetLogLevel(-1)
+        _vosk_models[model_path] = vosk.Model(model_path)
+    return _vosk_models[model_path]
+
+
+def vosk_model_path(language, model_dir=VOSK_MODEL_DIR):
+    path = os.path.join(model_dir, language)
+    return path if os.path.isdir(path) else None
+
+
+def drop_unknown(text):
+    return ' '.join(word for word in text.split() if word != UNKNOWN_WORD)
+
+
+class VoskRecognizer:
+    """
+    Offline streaming recognition. Each chunk is decoded as it arrives;
+    recognition ends at the first pause after speech (Vosk's endpointing)
+    or when the source runs out (the microphone session's own pause detection). With a grammar only those phrases (and
+    '[unk]', which is dropped) can be recognized: faster, and far more
+    accurate when the answer is a symptom name.
+    """
+
+    name = 'Vosk (offline)'
+
+    def __init__(self, model_path, open_source, grammar=None):
+        self.model = load_vosk_model(model_path)
+        self.open_source = open_source
+        self.grammar = sorted(set(grammar)) if grammar else None
+
+    def listen(self, on_ready=None, on_partial=None):
+        """Return the recognized text; on_partial(text) gets each new partial hypothesis"""
+        from vosk import KaldiRecognizer
+        with self.open_source() as source:
+            if self.grammar:
+                recognizer = KaldiRecognizer(self.model, source.sample_rate,
+                                             json.dumps(self.grammar + [UNKNOWN_WORD], ensure_ascii=False))
+            else:
+                recognizer = KaldiRecognizer(self.model, source.sample_rate)
+            if on_ready is not None:
+                on_ready()
+            text = ''
+            last_partial = ''
+            for chunk in source.chunks():
+                if recognizer.AcceptWaveform(chunk):
+                    text = drop_unknown(json.loads(recognizer.Result()).get('text', ''))
+                    if text:
+                        break
+                elif on_partial is not None:
+                    partial = drop_unknown(json.loads(recognizer.PartialResult()).get('partial', ''))
+                    if partial and partial != last_partial:
+                        on_partial(partial)
+                        last_partial = partial
+            else:
+                text = drop_unknown(json.loads(recognizer.FinalResult()).get('text', ''))
+        if not text:
+            raise NothingHeard()
+        return text
+
+
+class GoogleRecognizer:
+    """Online recognition with recognize_google: records the whole phrase, then sends it"""
+
+    name = 'Google (online)'
+
+    def __init__(self, recognizer, session, language_code):
+        self.recognizer = recognizer
+        self.session = session
+        self.language_code = language_code
+
+    def listen(self, on_ready=None, on_partial=None):
+        import speech_recognition as sr
+        with self.session as source:
+            if on_ready is not None:
+                on_ready()
+            frames = b''.join(source.chunks())
+        if not source.heard_speech:
+            raise NothingHeard()
+        try:
+            audio = sr.AudioData(frames, source.sample_rate, source.sample_width)
+            return self.recognizer.recognize_google(audio, language=self.language_code)
+        except sr.UnknownValueError:
+            raise NothingHeard()
+        except sr.RequestError as e:
+            raise RecognizerUnavailable(f"Speech recognition service unavailable: {e}")
+
+
+def create_recognizer(language, language_code, session, sr_recognizer, grammar=None):
+    """
+    Vosk when a model for the language is installed (models/<language>) and
+    the vosk package is available, otherwise Google; None without a microphone.
+    Both listen through the same MicrophoneSession.
+    """
+    if session is None:
+        return None
+    model_path = vosk_model_path(language)
+    if model_path is not None:
+        try:
+            return VoskRecognizer(model_path, lambda: session, grammar if VOSK_GRAMMAR == 'kb' else None)
+        except Exception as e:
+            print(f"[Speech] Vosk model {model_path} unavailable ({e}); using online recognition")
+    if sr_recognizer is None:
+        return None
+    return GoogleRecognizer(sr_recognizer, session, language_code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recognize a 16-bit mono WAV file with the offline Vosk backend')
+    parser.add_argument('--wav', required=True, help='16-bit mono WAV file')
+    parser.add_argument('--model', required=True, help='unpacked Vosk model folder, e.g. models/english')
+    parser.add_argument('--grammar', help='comma-separated phrases to limit recognition to')
+    parser.add_argument('--realtime', action='store_true', help='feed the audio at its real speed, like a microphone')
+    args = parser.parse_args()
+
+    grammar = [phrase.strip().lower() for phrase in args.grammar.split(',')] if args.grammar else None
+    recognizer = VoskRecognizer(args.model, lambda: WavFileSource(args.wav, realtime=args.realtime), grammar)
+    start = time.perf_counter()
+
+    def show_partial(text):
+        print(f"  partial {time.perf_counter() - start:6.2f}s: {text}")
+
+    try:
+        text = recognizer.listen(on_partial=show_partial)
+        print(f"  final   {time.perf_counter() - start:6.2f}s: {text}")
+    except NothingHeard:
+        print("  nothing recognized")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# speech_queue.py - Background text-to-speech so the screen never waits for the voice
+import collections
+import subprocess
+import threading
+import time
+
+
+class SpeechQueue:
+    """
+    Speaks queued utterances one after another on a dedicated thread.
+
+    say() returns at once, so text is on screen immediately while speech
+    catches up. skip() drops stale speech when the user moves to another
+    screen. Urgent utterances (emergencies) cut off whatever ordinary speech
+    is playing and go ahead of everything queued; skip() never drops them.
+
+    speak(text, interrupted) does the blocking synthesis and should return
+    early once interrupted (a threading.Event) is set. on_start runs on the
+    speech thread before anything is spoken: engines such as pyttsx3 must be
+    driven from the thread that created them.
+    """
+
+    def __init__(self, speak, on_start=None):
+        self.speak = speak
+        self.on_start = on_start
+        self.interrupted = threading.Event()
+        self.ready = threading.Event()
+        self._urgent = collections.deque()
+        self._normal = collections.deque()
+        self._condition = threading.Condition()
+        self._speaking_urgent = None  # None while idle, else whether the current utterance is urgent
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='speech', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def say(self, text, urgent=False):
+        with self._condition:
+            if self._closed:
+                return
+            if urgent:
+                self._urgent.append(text)
+                if self._speaking_urgent is False:
+                    self.interrupted.set()
+            else:
+                self._normal.append(text)
+            self._condition.notify_all()
+
+    def skip(self):
+        """Drop queued ordinary speech and cut off the ordinary utterance being spoken"""
+        with self._condition:
+            self._normal.clear()
+            if self._speaking_urgent is False:
+                self.interrupted.set()
+
+    def idle(self):
+        return self._speaking_urgent is None and not self._urgent and not self._normal
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been spoken; False if timeout expired first"""
+        with self._condition:
+            return self._condition.wait_for(self.idle, timeout)
+
+    def close(self, timeout=None):
+        """Let queued speech finish (for at most timeout seconds), then stop the thread"""
+        self.wait(timeout)
+        with self._condition:
+            self._closed = True
+            self._urgent.clear()
+            self._normal.clear()
+            if self._speaking_urgent is not None:
+                self.interrupted.set()
+            self._condition.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            if self.on_start is not None:
+                self.on_start()
+        finally:
+            self.ready.set()
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or self._urgent or self._normal)
+                if self._closed:
+                    return
+                urgent = bool(self._urgent)
+                text = (self._urgent if urgent else self._normal).popleft()
+                self._speaking_urgent = urgent
+                self.interrupted.clear()
+            try:
+                self.speak(text, self.interrupted)
+            except Exception as e:
+                print(f"[TTS Warning]: {e}")
+            finally:
+                with self._condition:
+                    self._speaking_urgent = None
+                    self._condition.notify_all()
+
+
+def run_speech_command(command, interrupted, timeout=10, input_text=None, shell=False):
+    """
+    Run a system TTS command like subprocess.run(..., timeout=timeout), but
+    kill it as soon as interrupted is set. Raises FileNotFoundError when the
+    command is missing and subprocess.TimeoutExpired when it runs too long.
+    """
+    process = subprocess.Popen(command, shell=shell, text=True,
+                               stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if input_text is not None:
+        process.stdin.write(input_text)
+        process.stdin.close()
+    deadline = time.monotonic() + timeout
+    while process.poll() is None:
+        if interrupted.is_set():
+            process.kill()
+            process.wait()
+            return
+        if time.monotonic() > deadline:
+            process.kill()
+            process.wait()
+            raise subprocess.TimeoutExpired(command, timeout)
+        interrupted.wait(0.05)
@@ -0,0 +1,20 @@
+# conftest.py - Shared fixtures: the CLI modules import each other by plain name
+import os
+import sys
+
+import pytest
+
+CLI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CLI_DIR)
+
+
+@pytest.fixture(scope='session')
+def assistant():
+    """HealthcareAssistant over the real knowledge base, without speech or microphone"""
+    from healthcare_agent import HealthcareAssistant
+    cwd = os.getcwd()
+    os.chdir(CLI_DIR)  # the assistant opens healthcare_kb.csv by relative path
+    try:
+        return HealthcareAssistant(interactive=False)
+    finally:
+        os.chdir(cwd)
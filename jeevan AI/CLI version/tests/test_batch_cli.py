@@ -0,0 +1,49 @@
+# test_batch_cli.py - batch.py end to end: stdin or a file in, ordered JSONL out, exit status
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+CLI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINES = ['fever', '', 'I have fever and chest pain', 'xyzzy', 'बुखार'] * 3
+
+
+def run_batch(*args, cwd=CLI_DIR, text='\n'.join(LINES) + '\n'):
+    return subprocess.run([sys.executable, os.path.join(CLI_DIR, 'batch.py'), *args], cwd=cwd,
+                          input=text.encode('utf-8'), capture_output=True)
+
+
+def results(stdout):
+    return [json.loads(line) for line in stdout.decode('utf-8').splitlines()]
+
+
+@pytest.mark.parametrize('workers', ['1', '3'])
+def test_results_follow_the_input_order(workers):
+    completed = run_batch('-', '--workers', workers, '--block-lines', '2')
+    assert completed.returncode == 0, completed.stderr.decode()
+    lines = results(completed.stdout)
+    assert [line['line'] for line in lines] == [number for number, text in enumerate(LINES, 1) if text]
+    assert [line['input'] for line in lines] == [text for text in LINES if text]
+    first, multi, miss, hindi = lines[:4]
+    assert first['matched'] and first['symptom_english'] == 'Fever'
+    assert multi['severity'] == 'E' and [match['symptom_english'] for match in multi['symptoms']] == ['Chest Pain', 'Fever']
+    assert not miss['matched'] and miss['symptom'] is None and miss['symptoms'] == []
+    assert hindi['symptom_english'] == 'Fever'
+
+
+def test_language_picks_the_names_and_advice(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    completed = run_batch('-', '--workers', '1', '--language', 'tamil', '--output', str(output), text='fever\n')
+    assert completed.returncode == 0 and completed.stdout == b''
+    [line] = results(output.read_bytes())
+    assert line['symptom'] == 'காய்ச்சல்' and line['symptom_english'] == 'Fever'
+
+
+def test_missing_knowledge_base_exits_before_reading_input(tmp_path):
+    completed = run_batch('-', '--workers', '1', cwd=str(tmp_path))
+    assert completed.returncode == 1 and completed.stdout == b''
+    assert b'cannot load the knowledge base' in completed.stderr
+    assert not (tmp_path / 'healthcare_kb.csv').exists()  # no demo knowledge base written
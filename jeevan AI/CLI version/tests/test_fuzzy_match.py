@@ -0,0 +1,48 @@
+# test_fuzzy_match.py - find_top_matches() against fuzzywuzzy, and the MatchCandidates bounds
+import pytest
+from fuzzywuzzy import fuzz, process, utils
+
+from healthcare_agent import MATCH_THRESHOLD, MatchCandidates
+
+QUERIES = ['fever', 'i have a headache', 'chest pain since morning', 'stomach', 'bukhaar', 'xyz', 'coughing',
+           'बुखार है', 'தலைவலி', 'sore throat and cold']
+
+
+@pytest.mark.parametrize('language', ['english', 'hindi', 'tamil'])
+def test_top_match_is_what_extract_one_picks(assistant, language, monkeypatch):
+    monkeypatch.setattr(assistant, 'current_language', language)
+    names = assistant.get_column_values(f'symptom_{language}')
+    for query in QUERIES:
+        expected = process.extractOne(query, names, scorer=fuzz.partial_ratio)
+        top = assistant.find_top_matches(query, 1)
+        if not expected or not utils.full_process(query):
+            continue
+        row, score = top[0]
+        assert score == expected[1], query
+        assert row[f'symptom_{language}'].lower() == expected[0], query
+
+
+def test_confident_match_respects_the_threshold(assistant):
+    row, conf = assistant.find_matching_symptom('fever')
+    assert row['symptom_english'] == 'Fever' and conf >= MATCH_THRESHOLD
+    assert assistant.find_matching_symptom('xyzzy') == (None, 0)
+
+
+def test_upper_bounds_never_undercut_partial_ratio(assistant):
+    candidates = MatchCandidates(assistant.get_column_values('symptom_english'))
+    for query in QUERIES:
+        query = utils.full_process(query)
+        bounds = candidates.upper_bounds(query)
+        for name, bound in zip(candidates.names, bounds.tolist()):
+            assert fuzz.partial_ratio(query, name) <= bound, (query, name)
+
+
+def test_sparse_and_dense_counts_give_the_same_bounds():
+    # Names over a large alphabet, each using a few of its characters, are stored sparse
+    names = [''.join(chr(0x4e00 + (i * 7 + j) % 3000) for j in range(5)) for i in range(400)]
+    sparse = MatchCandidates(names)
+    assert sparse.char_counts is None
+    dense = MatchCandidates(names[:3])
+    assert dense.char_counts is not None
+    for query in [names[0], names[1][:3] + names[2][2:], names[399]]:
+        assert sparse.upper_bounds(query)[:3].tolist() == dense.upper_bounds(query).tolist()
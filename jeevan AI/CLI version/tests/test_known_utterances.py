@@ -0,0 +1,44 @@
+# test_known_utterances.py - What audio_cache.py pre-synthesizes stays bounded as the KB grows
+from healthcare_agent import (LABELS, MAX_PRERENDERED_MENTIONS, MATCH_THRESHOLD, TRANSLATIONS, clean_speech_text,
+                              known_utterances, symptom_utterances)
+
+
+class Rows:
+    """The iterrows() of a knowledge base of count copies of one row"""
+
+    def __init__(self, row, count):
+        self.row = row
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def iterrows(self):
+        for index in range(self.count):
+            yield index, dict(self.row, symptom_english=f"{self.row['symptom_english']} {index}")
+
+
+def test_every_spoken_line_is_known(assistant):
+    utterances = set(known_utterances(assistant.df))
+    for _, row in assistant.df.iterrows():
+        for language in LABELS:
+            for conf in (MATCH_THRESHOLD, 100):
+                for text in symptom_utterances(row, language, conf):
+                    assert (clean_speech_text(text), language) in utterances, text
+
+
+def test_symptom_counts_are_capped():
+    utterances = set(known_utterances(Rows({'symptom_english': 'Fever', 'advice_english': 'Rest',
+                                            'first_aid_english': 'Cool cloth', 'severity': 'H'}, 0)))
+    template = TRANSLATIONS['multiple_found']['english']
+    counts = [count for count in range(2, 50)
+              if (clean_speech_text(template.format(count=count)), 'english') in utterances]
+    assert counts == list(range(2, MAX_PRERENDERED_MENTIONS + 1))
+
+
+def test_utterances_grow_by_row_lines_only():
+    row = {'symptom_english': 'Fever', 'advice_english': 'Rest', 'first_aid_english': 'Cool cloth', 'severity': 'H'}
+    small = len(known_utterances(Rows(row, 10)))
+    large = len(known_utterances(Rows(row, 1000)))
+    # Only the symptom line differs between the copies; confidence lines are shared
+    assert large - small == 990 * len(LABELS)
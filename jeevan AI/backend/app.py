@@ -1,11 +1,17 @@
-
 # app.py - Fixed Healthcare Backend with Stricter Matching
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, g
 from flask_cors import CORS
-import pandas as pd
-import numpy as np
 import os
+import functools
+import hashlib
+import time
 import traceback
+from matcher import SymptomMatcher, MATCH_THRESHOLD, SEVERITY_RANK, normalize_text
+from diagnose_cache import DiagnosisCache
+from kb_reload import KBWatcher
+from kb_snapshot import REQUIRED_COLUMNS, load_snapshot, read_kb_csv, snapshot_path
+from metrics import MetricsRegistry, StageTimer, server_timing
+from response_encoding import IDENTITY, choose_encoding, compress_variants
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -16,7 +22,7 @@ CSV_FILE_PATH = 'healthcare_kb.csv'
 def load_symptom_data():
     """
     Load symptom data from CSV file
-    Returns a pandas DataFrame with the symptom data
+    Returns a lightweight table (stdlib csv, no pandas) with the symptom data
     """
     try:
         # Check if file exists
@@ -24,21 +30,14 @@ def load_symptom_data():
             return None, f"CSV file not found at path: {CSV_FILE_PATH}"
         
         # Read CSV file
-        df = pd.read_csv(CSV_FILE_PATH)
+        df, _ = read_kb_csv(CSV_FILE_PATH)
         
         # Check if dataframe is empty
         if df.empty:
             return None, "CSV file is empty"
             
-        # Validate required columns based on your CSV structure
-        required_columns = [
-            'symptom_english', 'symptom_hindi', 'symptom_tamil',
-            'severity', 'advice_english', 'advice_hindi', 'advice_tamil',
-            'first_aid_english', 'first_aid_hindi', 'first_aid_tamil'
-        ]
-        
-        # Check if all required columns exist
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        # Check if all required columns exist (same list the snapshot compiler validates)
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
         if missing_columns:
             return None, f"Missing required columns: {missing_columns}"
             
@@ -50,39 +49,472 @@ def load_symptom_data():
         traceback.print_exc()  # Print detailed error for debugging
         return None, error_msg
 
-# Load symptom data once when the app starts
-symptom_df, error = load_symptom_data()
-if error:
-    print(f"Warning: {error}")
+# Sample symptoms served by /symptoms when the CSV could not be loaded
+SAMPLE_SYMPTOMS = [
+    {
+        'name': {'english': 'Fever', 'hindi': 'बुखार', 'tamil': 'காய்ச்சல்'},
+        'severity': 'H',
+        'advice': {
+            'english': 'Take rest and drink plenty of fluids.',
+            'hindi': 'आराम करें और खूब पानी पिएं।',
+            'tamil': 'ஓய்வு எடுத்து நிறைய நீர் குடிக்கவும்।'
+        }
+    },
+    {
+        'name': {'english': 'Cough', 'hindi': 'खांसी', 'tamil': 'இருமல்'},
+        'severity': 'H',
+        'advice': {
+            'english': 'Drink warm water with honey.',
+            'hindi': 'शहद के साथ गर्म पानी पिएं।',
+            'tamil': 'தேனுடன் வெதுவெதुப்பான நீர் குடிக்கவும்।'
+        }
+    },
+    {
+        'name': {'english': 'Leg Pain', 'hindi': 'पैर दर्द', 'tamil': 'கால் வலி'},
+        'severity': 'H',
+        'advice': {
+            'english': 'Rest the leg and apply appropriate treatment.',
+            'hindi': 'पैर को आराम दें और उचित उपचार करें।',
+            'tamil': 'காலுக்கு ஓய்வு கொடுத்து பொருத்தமான சிகிச்சை செய்யவும்।'
+        }
+    }
+]
+
+SUPPORTED_LANGUAGES = ['english', 'hindi', 'tamil']
+
+NO_MATCH_MESSAGES = {
+    'english': 'No matching symptom found. Try using different words or describe more specifically.',
+    'hindi': 'कोई मैच नहीं मिला। अलग शब्दों का उपयोग करें या अधिक स्पष्ट रूप से बताएं।',
+    'tamil': 'பொருத்தமான அறிகுறி கிடைக்கவில்லை। வேறு சொற்களை முயற்சிக்கவும்।'
+}
+
+# /diagnose?view=... : the full multilingual entry, or only the requested language's fields
+FULL_VIEW = 'full'
+LANGUAGE_VIEW = 'language'
+
+# /diagnose?mode=...: one best symptom, or every symptom mentioned in the text
+SINGLE_MODE = 'single'
+MULTI_MODE = 'multi'
+
+def kb_content_hash(path=CSV_FILE_PATH):
+    """SHA-256 of the knowledge base file, used to version derived caches"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return 'sample'
+
+def json_body(payload):
+    """Encode a payload exactly like jsonify() does (shared with the ASGI entry point)"""
+    return app.json.response(payload).get_data()
+
+def build_symptom_responses(df, kb_hash):
+    """
+    Pre-encode the /symptoms response body for every supported language.
+    Returns {language: ({encoding: bytes}, etag)}; the ETag changes with the KB content hash.
+    """
+    if df is None:
+        payload = {
+            'success': True,
+            'symptoms': SAMPLE_SYMPTOMS,
+            'message': 'Using sample data - CSV not loaded properly'
+        }
+    else:
+        symptoms_list = []
+        for _, row in df.iterrows():
+            symptom_data = {
+                'name': {
+                    'english': row.get('symptom_english', 'Unknown Symptom'),
+                    'hindi': row.get('symptom_hindi', 'अज्ञात लक्षण'),
+                    'tamil': row.get('symptom_tamil', 'தெரியாத அறிகுறி')
+                },
+                'severity': row.get('severity', 'H'),
+                'advice': {
+                    'english': row.get('advice_english', 'No advice available'),
+                    'hindi': row.get('advice_hindi', 'कोई सलाह उपलब्ध नहीं'),
+                    'tamil': row.get('advice_tamil', 'ஆலோசனை கிடைக்கவில்லை')
+                }
+            }
+            symptoms_list.append(symptom_data)
+        payload = {
+            'success': True,
+            'symptoms': symptoms_list
+        }
+    
+    responses = {}
+    for language in SUPPORTED_LANGUAGES:
+        body = json_body(dict(payload, language=language))
+        responses[language] = (compress_variants(body), f'{kb_hash[:16]}-{language}')
+    return responses
+
+def project_entry(entry, language):
+    """The fields of a matched symptom entry in one language (no patterns, no other languages)"""
+    return {
+        'name': entry['name'][language],
+        'severity': entry['severity'],
+        'confidence': entry['confidence'],
+        'advice': entry['advice'][language],
+        'first_aid': entry['first_aid'][language]
+    }
+
+# Encoded language-projected /diagnose answers kept per KB version (the no-match ones are always kept)
+DIAGNOSIS_RESPONSE_CACHE_SIZE = int(os.environ.get('DIAGNOSIS_RESPONSE_CACHE_SIZE', '4096'))
+
+class DiagnosisResponses:
+    """
+    Language-projected /diagnose bodies of one KB version, with compressed variants.
+    The no-match body of every language is encoded up front. A symptom's body is
+    encoded and compressed the first time it is answered, and only the
+    DIAGNOSIS_RESPONSE_CACHE_SIZE most recently used are kept, so a load never
+    touches every row. responses[(symptom id or None, language)] -> {encoding: bytes}
+    """
+
+    def __init__(self, matcher, cache_size=DIAGNOSIS_RESPONSE_CACHE_SIZE):
+        self.matcher = matcher
+        self._no_match = {language: compress_variants(json_body({
+            'success': False,
+            'message': NO_MATCH_MESSAGES[language]
+        })) for language in SUPPORTED_LANGUAGES}
+        self._encoded = functools.lru_cache(maxsize=cache_size)(self._encode)
+
+    def _encode(self, symptom_id, language):
+        return compress_variants(json_body({
+            'success': True,
+            'language': language,
+            'result': project_entry(self.matcher.symptoms[symptom_id], language)
+        }))
+
+    def __getitem__(self, key):
+        symptom_id, language = key
+        if symptom_id is None:
+            return self._no_match[language]
+        return self._encoded(symptom_id, language)
+
+class KBSnapshot:
+    """Everything derived from one version of the knowledge base file"""
+
+    def __init__(self, df, error, kb_hash, source='csv', matcher=None):
+        self.df = df
+        self.error = error
+        self.kb_hash = kb_hash
+        self.source = source
+        # Build the symptom matching index once from the knowledge base
+        # (or reuse the one prebuilt in a memory-mapped snapshot)
+        self.matcher = matcher if matcher is not None else SymptomMatcher.from_dataframe(df)
+        # The spelling, mention and similarity indexes are built on first use (a preloading
+        # server builds them once for every worker, see gunicorn.conf.py), so loading a
+        # memory-mapped snapshot reads no row
+        # Language-projected /diagnose answers, encoded on first use
+        self.diagnosis_responses = DiagnosisResponses(self.matcher)
+
+    @functools.cached_property
+    def symptom_responses(self):
+        """/symptoms responses, encoded on first use and versioned by the KB content hash"""
+        return build_symptom_responses(self.df, self.kb_hash)
+
+def build_kb_snapshot():
+    """
+    Load the knowledge base and build a fresh snapshot (runs at startup and on every reload).
+    A compiled snapshot (python kb_snapshot.py) is memory-mapped when present and up to date;
+    otherwise the CSV is parsed.
+    """
+    table, _ = load_snapshot(CSV_FILE_PATH)
+    if table is not None:
+        return KBSnapshot(table, None, table.source_sha256, source='snapshot', matcher=table.build_matcher())
+    
+    kb_hash = kb_content_hash()
+    df, error = load_symptom_data()
+    return KBSnapshot(df, error, kb_hash)
+
+# Seconds between checks of the KB file for changes (0 disables hot reload)
+KB_RELOAD_INTERVAL = float(os.environ.get('KB_RELOAD_INTERVAL', '2'))
+
+# Load symptom data once when the app starts, then watch the file for edits
+kb_watcher = KBWatcher([CSV_FILE_PATH, snapshot_path(CSV_FILE_PATH)], build_kb_snapshot,
+                       interval=KB_RELOAD_INTERVAL,
+                       fallback_snapshot=lambda error: KBSnapshot(None, error, 'sample'))
+if kb_watcher.snapshot.error:
+    print(f"Warning: {kb_watcher.snapshot.error}")
     print("Using sample data instead")
+kb_watcher.start()
 
-@app.route('/')
-def home():
-    """Root endpoint that provides information about the API"""
-    return jsonify({
+# Cache of /diagnose responses keyed on the normalized input and language
+# (DIAGNOSE_CACHE_TTL=0 disables it); entries are dropped when the KB content changes
+diagnose_cache = DiagnosisCache(max_entries=int(os.environ.get('DIAGNOSE_CACHE_SIZE', '4096')),
+                                ttl=float(os.environ.get('DIAGNOSE_CACHE_TTL', '300')))
+
+# Metrics (per-thread counters merged when /metrics is scraped)
+metrics = MetricsRegistry()
+metrics.counter('healthcare_http_requests_total', 'HTTP requests by endpoint, method and status')
+metrics.counter('healthcare_diagnose_results_total', 'Diagnoses by language and result (hit/miss)')
+metrics.histogram('healthcare_http_request_duration_seconds', 'End-to-end request latency by endpoint')
+metrics.histogram('healthcare_diagnose_stage_seconds', 'Latency of each diagnose stage (parse, normalize, score, serialize)')
+
+def metric_language(language):
+    """Bound label cardinality: unknown languages are reported as 'other'"""
+    return language if language in SUPPORTED_LANGUAGES else 'other'
+
+def record_request(endpoint, method, status, elapsed):
+    metrics.inc('healthcare_http_requests_total',
+                (('endpoint', endpoint), ('method', method), ('status', str(status))))
+    metrics.observe('healthcare_http_request_duration_seconds', elapsed, (('endpoint', endpoint),))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.stage_timer = None
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    record_request(request.endpoint or 'unknown', request.method, response.status_code, elapsed)
+    
+    stage_timer = g.get('stage_timer')
+    stages = stage_timer.stages if stage_timer else ()
+    response.headers['Server-Timing'] = server_timing(stages, elapsed)
+    return response
+
+def api_info():
+    """Body of the root endpoint"""
+    symptom_df = kb_watcher.snapshot.df
+    return {
         'message': 'Healthcare AI Assistant API',
         'version': '1.0',
         'endpoints': {
             '/health': 'GET - Health check',
+            '/ready': 'GET - Readiness (503 while sample data is served instead of the knowledge base)',
             '/symptoms': 'GET - Get all symptoms (add ?language=english|hindi|tamil)',
-            '/diagnose': 'POST - Diagnose symptoms (send JSON with symptom and language)'
+            '/diagnose': 'POST - Diagnose symptoms (send JSON with symptom and language; add ?view=language for the requested language only, ?top_k=N for the N best candidates, ?mode=multi for every symptom mentioned)',
+            '/diagnose/batch': 'POST - Diagnose many symptoms (send JSON array of {symptom, language})',
+            '/metrics': 'GET - Prometheus metrics'
         },
         'csv_status': 'loaded' if symptom_df is not None else 'failed',
         'csv_rows': len(symptom_df) if symptom_df is not None else 0
-    })
+    }
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint to verify the server is running"""
+@app.route('/')
+def home():
+    """Root endpoint that provides information about the API"""
+    return jsonify(api_info())
+
+def health_status():
+    """Body of the health check endpoint"""
+    symptom_df = kb_watcher.snapshot.df
     csv_status = "loaded successfully" if symptom_df is not None else "failed to load"
     csv_rows = len(symptom_df) if symptom_df is not None else 0
-    return jsonify({
+    return {
         'status': 'healthy',
         'csv_status': csv_status,
         'csv_rows': csv_rows,
         'csv_path': CSV_FILE_PATH,
-        'csv_columns': list(symptom_df.columns) if symptom_df is not None else []
-    })
+        'kb_source': kb_watcher.snapshot.source,
+        'csv_columns': list(symptom_df.columns) if symptom_df is not None else [],
+        'knowledge_base': kb_watcher.status(),
+        'diagnose_cache': diagnose_cache.stats()
+    }
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint to verify the server is running"""
+    return jsonify(health_status())
+
+def readiness_status():
+    """
+    Body and status code of the readiness endpoint: 200 while a knowledge base
+    is served, 503 while only sample data is. Indexes a snapshot lacks are
+    built on first use (KBSnapshot), so a published snapshot can always answer.
+    """
+    snapshot = kb_watcher.snapshot
+    ready = snapshot is not None and not snapshot.error
+    return {
+        'ready': ready,
+        'kb_version': kb_watcher.version,
+        'kb_source': snapshot.source if snapshot is not None else None,
+        'symptoms': len(snapshot.matcher) if snapshot is not None else 0,
+        'reason': None if ready else (snapshot.error if snapshot is not None else 'Knowledge base not loaded')
+    }, 200 if ready else 503
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint for load balancers (/health only says the process is alive)"""
+    body, status = readiness_status()
+    return jsonify(body), status
+
+# Maximum number of items accepted by /diagnose/batch in one request
+MAX_BATCH_SIZE = 50000
+
+# Largest N accepted by /diagnose?top_k=N
+MAX_TOP_K = 20
+
+INTERNAL_ERROR_BODY = {'success': False, 'message': 'Internal server error'}
+
+def record_diagnosis(language, hit):
+    metrics.inc('healthcare_diagnose_results_total',
+                (('language', metric_language(language)), ('result', 'hit' if hit else 'miss')))
+
+def diagnosis_result(best_match, highest_score, language):
+    """Build the diagnose() response body for a scored match"""
+    if best_match and highest_score >= MATCH_THRESHOLD:
+        return {
+            'success': True,
+            'result': best_match
+        }
+    return {
+        'success': False,
+        'message': NO_MATCH_MESSAGES.get(language, NO_MATCH_MESSAGES['english'])
+    }
+
+def ranked_result(matcher, symptom_input, top_k, language, view):
+    """Build the /diagnose?top_k=N response body: the N best candidates with their scores"""
+    matches = []
+    for symptom_id, score in matcher.top_matches(symptom_input, top_k):
+        entry = matcher.symptoms[symptom_id]
+        matches.append({
+            'score': score,
+            'above_threshold': score >= MATCH_THRESHOLD,
+            'result': project_entry(entry, language) if view == LANGUAGE_VIEW else entry
+        })
+    
+    result = {
+        'success': bool(matches) and matches[0]['above_threshold'],
+        'top_k': top_k,
+        'threshold': MATCH_THRESHOLD,
+        'matches': matches
+    }
+    if view == LANGUAGE_VIEW:
+        result['language'] = language
+    if not result['success']:
+        result['message'] = NO_MATCH_MESSAGES.get(language, NO_MATCH_MESSAGES['english'])
+    return result
+
+def multi_symptom_result(matcher, symptom_text, language, view):
+    """
+    Build the /diagnose?mode=multi response body: every symptom mentioned in
+    the text with the spans that mention it, most severe first, plus the
+    highest severity so an emergency is never hidden behind a milder complaint
+    """
+    mentions, nfc_text = matcher.find_mentions(symptom_text)
+    spans_by_symptom = {}
+    for symptom_id, start, end in mentions:
+        spans_by_symptom.setdefault(symptom_id, []).append({'start': start, 'end': end, 'text': nfc_text[start:end]})
+    
+    # dicts keep mention order, so ties in severity stay in the order they were mentioned
+    def severity_rank(symptom_id):
+        return SEVERITY_RANK.get(matcher.symptoms[symptom_id]['severity'], -1)
+    
+    ranked = sorted(spans_by_symptom, key=severity_rank, reverse=True)
+    matches = []
+    for symptom_id in ranked:
+        entry = matcher.symptoms[symptom_id]
+        matches.append({
+            'spans': spans_by_symptom[symptom_id],
+            'result': project_entry(entry, language) if view == LANGUAGE_VIEW else entry
+        })
+    
+    highest_severity = matcher.symptoms[ranked[0]]['severity'] if ranked else None
+    result = {
+        'success': bool(matches),
+        'mode': MULTI_MODE,
+        'count': len(matches),
+        'highest_severity': highest_severity,
+        'emergency': highest_severity == 'E',
+        'matches': matches
+    }
+    if view == LANGUAGE_VIEW:
+        result['language'] = language
+    if not result['success']:
+        result['message'] = NO_MATCH_MESSAGES.get(language, NO_MATCH_MESSAGES['english'])
+    return result
+
+def run_diagnosis(data, timer, view=FULL_VIEW, accept_encoding=None, top_k=None, mode=SINGLE_MODE):
+    """
+    /diagnose logic shared by the Flask and ASGI entry points.
+    Returns (body bytes, HTTP status, content encoding or None); marks the
+    normalize and score stages on timer. The language view picks a body encoded
+    (and, if the client accepts it, compressed) once per symptom and language;
+    top_k returns the N best candidates instead of a single answer, and
+    mode=multi every symptom mentioned in the text with its spans.
+    """
+    if not data or not isinstance(data, dict):
+        return json_body({'success': False, 'message': 'No data provided'}), 400, None
+    if view not in (FULL_VIEW, LANGUAGE_VIEW):
+        return json_body({'success': False, 'message': f'Unknown view: {view}'}), 400, None
+    if mode not in (SINGLE_MODE, MULTI_MODE):
+        return json_body({'success': False, 'message': f'Unknown mode: {mode}'}), 400, None
+    if mode == MULTI_MODE and top_k is not None:
+        return json_body({'success': False, 'message': 'top_k cannot be combined with mode=multi'}), 400, None
+    if top_k is not None:
+        try:
+            top_k = int(top_k)
+        except ValueError:
+            top_k = 0
+        if not 1 <= top_k <= MAX_TOP_K:
+            return json_body({'success': False, 'message': f'top_k must be between 1 and {MAX_TOP_K}'}), 400, None
+        
+    symptom = data.get('symptom', '')
+    language = data.get('language', 'english')
+    # Anything but a string is no symptom, and no language (English), as in /diagnose/batch
+    symptom_input = normalize_text(symptom) if isinstance(symptom, str) else ''
+    language = language.strip().lower() if isinstance(language, str) else 'english'
+    timer.mark('normalize')
+    
+    if not symptom_input:
+        return json_body({'success': False, 'message': 'No symptom provided'}), 400, None
+    
+    # Score against the precompiled index of the current KB snapshot,
+    # or reuse the answer of an identical earlier request
+    snapshot = kb_watcher.snapshot
+    if view == LANGUAGE_VIEW and language not in SUPPORTED_LANGUAGES:
+        language = 'english'
+    
+    if mode == MULTI_MODE:
+        # Spans are offsets into the text as sent, so the cache key is the raw text
+        symptom_text = data.get('symptom', '')
+        
+        def encode_mentions():
+            result = multi_symptom_result(snapshot.matcher, symptom_text, language, view)
+            return json_body(result), result['success']
+        
+        body, hit = diagnose_cache.get_or_compute((symptom_text, language, view, mode), encode_mentions,
+                                                  version=snapshot.kb_hash)
+        timer.mark('score')
+        record_diagnosis(language, hit)
+        return body, 200, None
+    
+    if top_k is not None:
+        def encode_ranking():
+            result = ranked_result(snapshot.matcher, symptom_input, top_k, language, view)
+            return json_body(result), result['success']
+        
+        body, hit = diagnose_cache.get_or_compute((symptom_input, language, view, top_k), encode_ranking,
+                                                  version=snapshot.kb_hash)
+        timer.mark('score')
+        record_diagnosis(language, hit)
+        return body, 200, None
+    
+    if view == LANGUAGE_VIEW:
+        def find_variants():
+            symptom_id, highest_score = snapshot.matcher.best_match_id(symptom_input)
+            if symptom_id is None or highest_score < MATCH_THRESHOLD:
+                return snapshot.diagnosis_responses[(None, language)], False
+            return snapshot.diagnosis_responses[(symptom_id, language)], True
+        
+        variants, hit = diagnose_cache.get_or_compute((symptom_input, language, view), find_variants,
+                                                      version=snapshot.kb_hash)
+        timer.mark('score')
+        record_diagnosis(language, hit)
+        encoding = choose_encoding(accept_encoding, variants)
+        return variants[encoding], 200, encoding
+    
+    def encode_diagnosis():
+        result = diagnosis_result(*snapshot.matcher.best_match(symptom_input), language)
+        return json_body(result), result['success']
+    
+    body, hit = diagnose_cache.get_or_compute((symptom_input, language), encode_diagnosis,
+                                              version=snapshot.kb_hash)
+    timer.mark('score')
+    record_diagnosis(language, hit)
+    return body, 200, None
 
 @app.route('/diagnose', methods=['POST'])
 def diagnose():
@@ -90,279 +522,184 @@ def diagnose():
     Enhanced endpoint for multilingual symptom diagnosis with stricter matching threshold
     """
     try:
+        timer = g.stage_timer = StageTimer()
         data = request.get_json()
-        if not data:
-            return jsonify({'success': False, 'message': 'No data provided'}), 400
-            
-        symptom_input = data.get('symptom', '').lower().strip()
-        language = data.get('language', 'english')
-        
-        if not symptom_input:
-            return jsonify({'success': False, 'message': 'No symptom provided'}), 400
+        timer.mark('parse')
+        body, status, encoding = run_diagnosis(data, timer, request.args.get('view', FULL_VIEW),
+                                               request.headers.get('Accept-Encoding'), request.args.get('top_k'),
+                                               request.args.get('mode', SINGLE_MODE))
         
-        # Comprehensive symptom data with multilingual patterns
-        symptoms_data = {
-            "Fever": {
-                "patterns": ["fever", "high temperature", "बुखार", "தेজبुखार", "काय्चल", "काय়च्चल्", "veppam"],
-                "name": {"english": "Fever", "hindi": "बुखार", "tamil": "காய்ச்சல்"},
-                "severity": "H",
-                "confidence": 90,
-                "advice": {
-                    "english": "Take rest and drink plenty of fluids. Use cold compress on forehead.",
-                    "hindi": "आराम करें और खूब पानी पिएं। माथे पर ठंडी पट्टी रखें।",
-                    "tamil": "ஓய்வு எடுத்து நிறைய நீர் குடிக்கவும். நெற்றியில் குளிர்ந்த ஒத்தடம் கொடுக்கவும்."
-                },
-                "first_aid": {
-                    "english": "Rest in cool place, remove excess clothing, apply wet cloth on forehead",
-                    "hindi": "ठंडी जगह आराम करें, अतिरिक्त कपड़े उतारें",
-                    "tamil": "குளிர்ந்த இடத்தில் ஓய்வு, கூடுதல் உடைகளை அகற்றவும்"
-                }
-            },
-            "Common Cold": {
-                "patterns": ["cold", "sneeze", "sneezing", "सर्दी", "छींक", "சளি", "தुमिमल्"],
-                "name": {"english": "Common Cold", "hindi": "सर्दी", "tamil": "சளி"},
-                "severity": "H",
-                "confidence": 88,
-                "advice": {
-                    "english": "Stay hydrated and rest well. Gargle with warm salt water.",
-                    "hindi": "खूब पानी पिएं और आराम करें। गर्म नमकीन पानी से गरारे करें।",
-                    "tamil": "நீர்ச்சत்துடन் இருக்கவும். வெதुவெதுப்பான உப்பு நீरில் கொப்பளிக்கவும்."
-                },
-                "first_aid": {
-                    "english": "Encourage rest and fluid intake, warm salt water gargling",
-                    "hindi": "आराम और द्रव सेवन को बढ़ावा दें",
-                    "tamil": "ஓய்வு மற்றும் நீர் உட்கொள்ளலை ஊக்குவிக்கவும்"
-                }
-            },
-            "Headache": {
-                "patterns": ["headache", "head ache", "head pain", "migraine", "सिर दर्द", "सिरदर्द", "माइग्रेन", "तलैवली", "talai vali", "தலைவலி"],
-                "name": {"english": "Headache", "hindi": "सिर दर्द", "tamil": "தலைவலி"},
-                "severity": "H",
-                "confidence": 88,
-                "advice": {
-                    "english": "Take rest in dark quiet room. Apply cold compress.",
-                    "hindi": "अंधेरे और शांत कमरे में आराम करें। ठंडी सिकाई करें।",
-                    "tamil": "இருண்ட அமைதியான அறையில் ஓய்வு எடுக்கவும். குளிர் ஒத்தடம் கொடுக்கவும்."
-                },
-                "first_aid": {
-                    "english": "Lie down in quiet dark room, apply cold compress to head",
-                    "hindi": "शांत अंधेरे कमरे में लेट जाएं",
-                    "tamil": "அமைதியான இருண்ட அறையில் படுக்கவும்"
-                }
-            },
-            "Stomach Pain": {
-                "patterns": ["stomach pain", "stomach ache", "abdominal pain", "belly pain", "पेट दर्द", "पेट में दर्द", "vayitru vali", "வயிற்றுवलि"],
-                "name": {"english": "Stomach Pain", "hindi": "पेट दर्द", "tamil": "வயிற்றுவலி"},
-                "severity": "D",
-                "confidence": 85,
-                "advice": {
-                    "english": "Avoid solid food for few hours. Take small sips of water.",
-                    "hindi": "कुछ घंटों तक ठोस भोजन न लें। थोड़ा-थोड़ा पानी पिएं।",
-                    "tamil": "சில மணி நேரம் திட உணவு தவிர்க்கவும். கொஞ்சம் கொஞ்சமாக தண்ணீர் குடிக்கவும்."
-                },
-                "first_aid": {
-                    "english": "Apply gentle heat to abdomen, avoid solid foods",
-                    "hindi": "पेट पर हल्की गर्माहट दें",
-                    "tamil": "வயிற்றில் மெதுவான சூட்டைக் கொடுக்கவும்"
-                }
-            },
-            "Chest Pain": {
-                "patterns": ["chest pain", "heart pain", "cardiac pain", "chest ache", "छाती में दर्द", "छाती दर्द", "हृदय दर्द", "nenju vali", "நेंजু वलি"],
-                "name": {"english": "Chest Pain", "hindi": "छाती में दर्द", "tamil": "நெஞ்சு வலி"},
-                "severity": "E",
-                "confidence": 92,
-                "advice": {
-                    "english": "Stop all activity. Sit down and rest. Call emergency.",
-                    "hindi": "सभी गतिविधियां बंद करें। बैठकर आराम करें। आपातकाल बुलाएं।",
-                    "tamil": "அனைத्து செயல्पাடுகளையुम् निறुत्तवुम्। उट्कारन्तु ओय्வु एडुक्कवुम्। अवसर सेवैयै अळैक्कवुम्।"
-                },
-                "first_aid": {
-                    "english": "Have person sit and rest, call emergency services",
-                    "hindi": "व्यक्ति को बिठाकर आराम दिलाएं",
-                    "tamil": "நபரை உட்காரवैत्तु ओय्वु कोडुक्कवुम्"
-                }
-            },
-            "Cough": {
-                "patterns": ["cough", "dry cough", "wet cough", "coughing", "खांसी", "खाँसी", "इरुमल्", "irumal"],
-                "name": {"english": "Cough", "hindi": "खांसी", "tamil": "இருமல்"},
-                "severity": "H",
-                "confidence": 86,
-                "advice": {
-                    "english": "Drink warm water with honey. Use steam inhalation.",
-                    "hindi": "शहद के साथ गर्म पानी पिएं। भाप लें।",
-                    "tamil": "தேनுடन् वेतुवेतुप्पान नीर कुडिक्कवुम्। नीरावि पिडिक्कवुम्।"
-                },
-                "first_aid": {
-                    "english": "Warm honey water, steam inhalation",
-                    "hindi": "गर्म शहद पानी दें, भाप दिलवाएं",
-                    "tamil": "वेतुवेतुप्पान तेन नीर, नीरावि"
-                }
-            },
-            # Add leg pain as a specific symptom
-            "Leg Pain": {
-                "patterns": ["leg pain", "leg ache", "thigh pain", "calf pain", "पैर दर्द", "पैर में दर्द", "जांघ दर्द", "काल् वलि", "kal vali", "தोडै वलि"],
-                "name": {"english": "Leg Pain", "hindi": "पैर दर्द", "tamil": "கால் வலி"},
-                "severity": "H",
-                "confidence": 87,
-                "advice": {
-                    "english": "Rest the affected leg. Apply ice if swollen, heat if muscle pain. Elevate the leg.",
-                    "hindi": "प्रभावित पैर को आराम दें। सूजन हो तो बर्फ, मांसपेशी दर्द हो तो गर्माहट लगाएं।",
-                    "tamil": "பாதிக்கப்பட்ட காலுக்கு ஓய்வு கொடுக்கவும். வீக்கம் இருந்தால் பனி, தசை வலி இருந்தால் வெப்பம் கொடுக்கவும்."
-                },
-                "first_aid": {
-                    "english": "Rest, elevation, ice for swelling or heat for muscle pain",
-                    "hindi": "आराम, पैर ऊंचा रखें, स्थिति अनुसार बर्फ या गर्माहट",
-                    "tamil": "ஓய்வு, உயர்த்தல், நிலைமைக்கு ஏற்ப பனி அல்லது வெப்பம்"
-                }
-            }
-        }
-        
-        # STRICTER MATCHING LOGIC with higher threshold
-        best_match = None
-        highest_score = 0
-        
-        for symptom_key, symptom_data in symptoms_data.items():
-            score = 0
-            patterns = symptom_data['patterns']
-            
-            # Check for exact matches (highest priority)
-            for pattern in patterns:
-                pattern_lower = pattern.lower()
-                if pattern_lower == symptom_input:  # Exact match
-                    score += 100
-                elif pattern_lower in symptom_input and len(pattern_lower) > 3:  # Pattern is substring
-                    score += len(pattern_lower) * 3
-                elif symptom_input in pattern_lower and len(symptom_input) > 3:  # Input is substring
-                    score += len(symptom_input) * 2
-                
-            # Check for word-level matches (lower priority)
-            input_words = symptom_input.split()
-            for word in input_words:
-                if len(word) > 2:  # Only consider meaningful words
-                    for pattern in patterns:
-                        pattern_words = pattern.lower().split()
-                        if word in pattern_words:
-                            score += len(word) * 1
-            
-            if score > highest_score:
-                highest_score = score
-                best_match = symptom_data
-        
-        # INCREASED THRESHOLD from 1 to 10 for stricter matching
-        if best_match and highest_score >= 90:
-            return jsonify({
-                'success': True,
-                'result': best_match
-            })
-        else:
-            messages = {
-                'english': 'No matching symptom found. Try using different words or describe more specifically.',
-                'hindi': 'कोई मैच नहीं मिला। अलग शब्दों का उपयोग करें या अधिक स्पष्ट रूप से बताएं।',
-                'tamil': 'பொருத்தமான அறிகுறி கிடைக்கவில்லை। வேறு சொற்களை முயற்சிக்கவும்।'
-            }
-            
-            return jsonify({
-                'success': False,
-                'message': messages.get(language, messages['english'])
-            })
+        response = app.response_class(body, status=status, mimetype='application/json')
+        if encoding is not None:
+            response.vary.add('Accept-Encoding')
+            if encoding != IDENTITY:
+                response.headers['Content-Encoding'] = encoding
+        timer.mark('serialize')
+        if status == 200:
+            metrics.observe_stages('healthcare_diagnose_stage_seconds', timer.stages, (('endpoint', 'diagnose'),))
+        return response
             
     except Exception as e:
         error_msg = f"Error in diagnosis: {str(e)}"
         print(error_msg)
-        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+        return jsonify(INTERNAL_ERROR_BODY), 500
+
+def run_batch_diagnosis(data, timer):
+    """
+    /diagnose/batch logic shared by the Flask and ASGI entry points.
+    Returns (json body bytes, HTTP status); marks the normalize, score and serialize stages on timer.
+    """
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return json_body({'success': False, 'message': 'Expected a JSON array of {symptom, language} items'}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return json_body({'success': False, 'message': f'Batch too large (max {MAX_BATCH_SIZE} items)'}), 413
+    
+    symptom_inputs = []
+    languages = []
+    for item in items:
+        symptom = item.get('symptom', '') if isinstance(item, dict) else ''
+        language = item.get('language', 'english') if isinstance(item, dict) else 'english'
+        symptom_inputs.append(normalize_text(symptom) if isinstance(symptom, str) else '')
+        languages.append(language.strip().lower() if isinstance(language, str) else 'english')
+    timer.mark('normalize')
+    
+    # Score every item in a single vectorized pass over the index
+    matches = kb_watcher.snapshot.matcher.best_match_batch(symptom_inputs)
+    timer.mark('score')
+    
+    results = []
+    for symptom_input, language, (best_match, highest_score) in zip(symptom_inputs, languages, matches):
+        if not symptom_input:
+            results.append({'success': False, 'message': 'No symptom provided'})
+        else:
+            result = diagnosis_result(best_match, highest_score, language)
+            record_diagnosis(language, result['success'])
+            results.append(result)
+    
+    body = json_body({
+        'success': True,
+        'count': len(results),
+        'results': results
+    })
+    timer.mark('serialize')
+    metrics.observe_stages('healthcare_diagnose_stage_seconds', timer.stages, (('endpoint', 'diagnose_batch'),))
+    return body, 200
+
+@app.route('/diagnose/batch', methods=['POST'])
+def diagnose_batch():
+    """
+    Batch diagnosis for offline re-triage of kiosk and SMS logs.
+    Accepts a JSON array of {symptom, language} items (or {"items": [...]})
+    and returns one diagnose()-shaped result per item, in the same order.
+    """
+    try:
+        timer = g.stage_timer = StageTimer()
+        data = request.get_json()
+        timer.mark('parse')
+        body, status = run_batch_diagnosis(data, timer)
+        return app.response_class(body, status=status, mimetype='application/json')
+        
+    except Exception as e:
+        error_msg = f"Error in batch diagnosis: {str(e)}"
+        print(error_msg)
+        return jsonify(INTERNAL_ERROR_BODY), 500
+
+def symptom_response(language, accept_encoding=None):
+    """Precomputed (body bytes, etag, content encoding) of /symptoms for a language"""
+    symptom_responses = kb_watcher.snapshot.symptom_responses
+    variants, etag = symptom_responses.get(language, symptom_responses['english'])
+    encoding = choose_encoding(accept_encoding, variants)
+    if encoding != IDENTITY:
+        etag = f'{etag}-{encoding}'  # each representation needs its own strong ETag
+    return variants[encoding], etag, encoding
 
 @app.route('/symptoms', methods=['GET'])
 def get_symptoms():
     """
-    Enhanced endpoint to get all symptoms with proper multilingual support
+    Enhanced endpoint to get all symptoms with proper multilingual support.
+    Serves the body precomputed at KB load time; clients sending the last
+    ETag in If-None-Match get an empty 304 while the KB is unchanged.
     """
     try:
-        language = request.args.get('language', 'english')
-        
-        # If we couldn't load the CSV, return sample data
-        if symptom_df is None:
-            sample_symptoms = [
-                {
-                    'name': {'english': 'Fever', 'hindi': 'बुखार', 'tamil': 'காய்ச்சல்'},
-                    'severity': 'H',
-                    'advice': {
-                        'english': 'Take rest and drink plenty of fluids.',
-                        'hindi': 'आराम करें और खूब पानी पिएं।',
-                        'tamil': 'ஓய்வு எடுத்து நிறைய நீர் குடிக்கவும்।'
-                    }
-                },
-                {
-                    'name': {'english': 'Cough', 'hindi': 'खांसी', 'tamil': 'இருமல்'},
-                    'severity': 'H',
-                    'advice': {
-                        'english': 'Drink warm water with honey.',
-                        'hindi': 'शहद के साथ गर्म पानी पिएं।',
-                        'tamil': 'தேனுடன் வெதுவெதुப்பான நீர் குடிக்கவும்।'
-                    }
-                },
-                {
-                    'name': {'english': 'Leg Pain', 'hindi': 'पैर दर्द', 'tamil': 'கால் வலி'},
-                    'severity': 'H',
-                    'advice': {
-                        'english': 'Rest the leg and apply appropriate treatment.',
-                        'hindi': 'पैर को आराम दें और उचित उपचार करें।',
-                        'tamil': 'காலுக்கு ஓய்வு கொடுத்து பொருத்தமான சிகிச்சை செய்யவும்।'
-                    }
-                }
-            ]
-            return jsonify({
-                'success': True,
-                'symptoms': sample_symptoms,
-                'message': 'Using sample data - CSV not loaded properly'
-            })
-        
-        symptoms_list = []
-        for index, row in symptom_df.iterrows():
-            symptom_data = {
-                'name': {
-                    'english': row.get('symptom_english', 'Unknown Symptom'),
-                    'hindi': row.get('symptom_hindi', 'अज्ञात लक्षण'),
-                    'tamil': row.get('symptom_tamil', 'தெரியாத அறிகுறி')
-                },
-                'severity': row.get('severity', 'H'),
-                'advice': {
-                    'english': row.get('advice_english', 'No advice available'),
-                    'hindi': row.get('advice_hindi', 'कोई सलाह उपलब्ध नहीं'),
-                    'tamil': row.get('advice_tamil', 'ஆலோசனை கிடைக்கவில்லை')
-                }
-            }
-            symptoms_list.append(symptom_data)
+        language = request.args.get('language', 'english').lower()
+        body, etag, encoding = symptom_response(language, request.headers.get('Accept-Encoding'))
         
-        return jsonify({
-            'success': True,
-            'symptoms': symptoms_list
-        })
+        response = app.response_class(body, mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        if encoding != IDENTITY:
+            response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'  # always revalidate, never re-download
+        return response.make_conditional(request)
         
     except Exception as e:
         error_msg = f"Error getting symptoms: {str(e)}"
         print(error_msg)
-        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+        return jsonify(INTERNAL_ERROR_BODY), 500
+
+METRICS_MIMETYPE = 'text/plain; version=0.0.4'
+
+def metrics_text():
+    """Prometheus text exposition, including gauges computed at scrape time"""
+    snapshot = kb_watcher.snapshot
+    cache_stats = diagnose_cache.stats()
+    
+    results = metrics.merged_counters('healthcare_diagnose_results_total')
+    totals = {}
+    for (_, labels), value in results.items():
+        labels = dict(labels)
+        hits, count = totals.get(labels['language'], (0, 0))
+        totals[labels['language']] = (hits + (value if labels['result'] == 'hit' else 0), count + value)
+    
+    gauges = [
+        ('healthcare_diagnose_hit_ratio', 'Share of diagnoses that found a match, by language',
+         [((('language', language),), hits / count) for language, (hits, count) in sorted(totals.items())]),
+        ('healthcare_kb_symptoms', 'Symptoms in the loaded knowledge base',
+         [((), len(snapshot.matcher))]),
+        ('healthcare_kb_version', 'Knowledge base version (increments on every hot reload)',
+         [((), kb_watcher.version)]),
+        ('healthcare_kb_last_load_seconds', 'Time taken by the last knowledge base load',
+         [((), kb_watcher.last_load_seconds or 0.0)]),
+        ('healthcare_diagnose_cache_entries', 'Responses currently held in the /diagnose cache',
+         [((), cache_stats['entries'])]),
+    ]
+    counters = [
+        ('healthcare_diagnose_cache_requests_total', 'Diagnose cache lookups by result (hit/miss/coalesced)',
+         [((('result', result),), cache_stats[key]) for result, key in
+          (('hit', 'hits'), ('miss', 'misses'), ('coalesced', 'coalesced'))]),
+        ('healthcare_diagnose_cache_evictions_total', 'Diagnose cache entries evicted by reason',
+         [((('reason', 'lru'),), cache_stats['evictions']), ((('reason', 'ttl'),), cache_stats['expirations'])]),
+        ('healthcare_diagnose_cache_invalidations_total', 'Diagnose cache flushes caused by a KB change',
+         [((), cache_stats['invalidations'])]),
+    ]
+    return metrics.render(gauges, counters)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics: request counts, match-hit ratio per language, KB size, cache and stage latencies"""
+    return app.response_class(metrics_text(), mimetype=METRICS_MIMETYPE)
+
+EMERGENCY_MESSAGES = {
+    "english": {
+        "message": "🚑 Ambulance is on the way. Please wait and stay calm.",
+        "firstAid": "Keep the patient comfortable, check breathing, and avoid giving water if unconscious."
+    },
+    "hindi": {
+        "message": "🚑 एम्बुलेंस रास्ते में है। कृपया प्रतीक्षा करें और शांत रहें।",
+        "firstAid": "रोगी को आराम से रखें, सांस की जांच करें और यदि बेहोश हो तो पानी न दें।"
+    },
+    "tamil": {
+        "message": "🚑 ஆம்புலன்ஸ் வழியில் வருகிறது. தயவு செய்து காத்திருந்து அமைதியாக இருங்கள்.",
+        "firstAid": "நோயாளியை வசதியாக வைத்திருங்கள், சுவாசத்தைச் சரிபார்க்கவும், மயக்கம் இருந்தால் தண்ணீர் கொடுக்க வேண்டாம்."
+    }
+}
 
 @app.route("/emergency", methods=["POST"])
 def emergency_alert():
     lang = request.json.get("language", "english").lower()
 
-    messages = {
-        "english": {
-            "message": "🚑 Ambulance is on the way. Please wait and stay calm.",
-            "firstAid": "Keep the patient comfortable, check breathing, and avoid giving water if unconscious."
-        },
-        "hindi": {
-            "message": "🚑 एम्बुलेंस रास्ते में है। कृपया प्रतीक्षा करें और शांत रहें।",
-            "firstAid": "रोगी को आराम से रखें, सांस की जांच करें और यदि बेहोश हो तो पानी न दें।"
-        },
-        "tamil": {
-            "message": "🚑 ஆம்புலன்ஸ் வழியில் வருகிறது. தயவு செய்து காத்திருந்து அமைதியாக இருங்கள்.",
-            "firstAid": "நோயாளியை வசதியாக வைத்திருங்கள், சுவாசத்தைச் சரிபார்க்கவும், மயக்கம் இருந்தால் தண்ணீர் கொடுக்க வேண்டாம்."
-        }
-    }
-
-    selected = messages.get(lang, messages["english"])
+    selected = EMERGENCY_MESSAGES.get(lang, EMERGENCY_MESSAGES["english"])
     return jsonify(selected)
 
 if __name__ == '__main__':
@@ -370,11 +707,12 @@ if __name__ == '__main__':
     print("Starting Healthcare AI Assistant Backend...")
     print(f"Looking for CSV file at: {os.path.abspath(CSV_FILE_PATH)}")
     
+    symptom_df = kb_watcher.snapshot.df
     if symptom_df is not None:
         print(f"CSV loaded successfully with {len(symptom_df)} rows")
         print("Available columns:", list(symptom_df.columns))
     else:
-        print(f"CSV loading failed: {error}")
+        print(f"CSV loading failed: {kb_watcher.snapshot.error}")
         print("Using sample data instead")
     
     # Run the Flask app
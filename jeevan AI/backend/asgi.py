@@ -0,0 +1,279 @@
+# asgi.py - asyncio entry point for many slow concurrent clients
+#
+#     uvicorn asgi:application --host 0.0.0.0 --port 5000
+#
+# Serves the same routes and byte-identical JSON as the Flask app in app.py
+# (both share the knowledge base, caches and metrics defined there), but slow
+# request bodies and slow reads only park a coroutine instead of pinning a
+# worker. CPU-bound scoring runs in a bounded thread pool.
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from app import (EMERGENCY_MESSAGES, FULL_VIEW, INTERNAL_ERROR_BODY, METRICS_MIMETYPE, SINGLE_MODE, api_info, app,
+                 health_status, json_body, kb_watcher, metrics, metrics_text, readiness_status, record_request,
+                 run_batch_diagnosis, run_diagnosis, symptom_response)
+from metrics import StageTimer, server_timing
+from response_encoding import IDENTITY
+
+# Threads that run matching; more than a few only adds GIL contention
+SCORING_WORKERS = int(os.environ.get('ASYNC_SCORING_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Requests allowed to wait for a scoring thread before new ones queue on the event loop
+MAX_PENDING_SCORES = int(os.environ.get('ASYNC_MAX_PENDING', '256'))
+# Seconds a client gets to send its whole request body (2G uploads are slow, not endless)
+BODY_TIMEOUT = float(os.environ.get('ASYNC_BODY_TIMEOUT', '60'))
+# Largest accepted request body (a full /diagnose/batch fits comfortably)
+MAX_BODY_BYTES = int(os.environ.get('ASYNC_MAX_BODY_BYTES', str(8 * 1024 * 1024)))
+
+CORS_ALLOW_METHODS = b'DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT'
+
+scoring_executor = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix='scoring')
+scoring_slots = asyncio.Semaphore(MAX_PENDING_SCORES)
+
+
+class BadRequest(Exception):
+    """Request body missing, too slow, too large or not JSON"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    """The parts of an ASGI HTTP request the handlers need"""
+
+    __slots__ = ('method', 'path', 'query', 'headers', 'body', 'timer')
+
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        self.headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        self.body = body
+        self.timer = None
+
+    def arg(self, name, default):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def json(self):
+        """Parse the body like Flask's request.get_json()"""
+        content_type = self.headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json' and not (content_type.startswith('application/')
+                                                         and content_type.endswith('+json')):
+            raise BadRequest(415, 'Did not attempt to load JSON data because the request '
+                                  'Content-Type was not \'application/json\'.')
+        try:
+            return app.json.loads(self.body)
+        except ValueError as e:
+            raise BadRequest(400, f'Failed to decode JSON object: {e}')
+
+
+async def offload(func, *args):
+    """Run CPU-bound work in the scoring pool, with at most MAX_PENDING_SCORES outstanding"""
+    async with scoring_slots:
+        return await asyncio.get_running_loop().run_in_executor(scoring_executor, func, *args)
+
+
+async def read_body(receive):
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionResetError('client disconnected')
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise BadRequest(413, 'Request body too large')
+        chunks.append(chunk)
+        more_body = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+def encoding_headers(encoding):
+    """Headers for a body picked from pre-compressed variants"""
+    headers = [(b'vary', b'Accept-Encoding')]
+    if encoding != IDENTITY:
+        headers.append((b'content-encoding', encoding.encode()))
+    return headers
+
+
+# Route handlers return (status, body bytes, content type, extra headers)
+
+async def home(request):
+    return 200, json_body(api_info()), 'application/json', ()
+
+
+async def health_check(request):
+    return 200, json_body(health_status()), 'application/json', ()
+
+
+async def readiness_check(request):
+    body, status = readiness_status()
+    return status, json_body(body), 'application/json', ()
+
+
+async def diagnose(request):
+    try:
+        data = request.json()
+        request.timer.mark('parse')
+        body, status, encoding = await offload(run_diagnosis, data, request.timer, request.arg('view', FULL_VIEW),
+                                               request.headers.get('accept-encoding'), request.arg('top_k', None),
+                                               request.arg('mode', SINGLE_MODE))
+        request.timer.mark('serialize')
+        if status == 200:
+            metrics.observe_stages('healthcare_diagnose_stage_seconds', request.timer.stages,
+                                   (('endpoint', 'diagnose'),))
+        return status, body, 'application/json', encoding_headers(encoding) if encoding else ()
+    except Exception as e:
+        print(f"Error in diagnosis: {str(e)}")
+        return 500, json_body(INTERNAL_ERROR_BODY), 'application/json', ()
+
+
+async def diagnose_batch(request):
+    try:
+        data = request.json()
+        request.timer.mark('parse')
+        body, status = await offload(run_batch_diagnosis, data, request.timer)
+        return status, body, 'application/json', ()
+    except Exception as e:
+        print(f"Error in batch diagnosis: {str(e)}")
+        return 500, json_body(INTERNAL_ERROR_BODY), 'application/json', ()
+
+
+async def get_symptoms(request):
+    try:
+        body, etag, encoding = symptom_response(request.arg('language', 'english').lower(),
+                                                request.headers.get('accept-encoding'))
+        quoted_etag = f'"{etag}"'
+        headers = encoding_headers(encoding) + [(b'etag', quoted_etag.encode()), (b'cache-control', b'no-cache')]
+        if_none_match = request.headers.get('if-none-match', '')
+        candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        if '*' in candidates or quoted_etag in candidates:
+            return 304, b'', None, headers
+        return 200, body, 'application/json', headers
+    except Exception as e:
+        print(f"Error getting symptoms: {str(e)}")
+        return 500, json_body(INTERNAL_ERROR_BODY), 'application/json', ()
+
+
+async def metrics_endpoint(request):
+    return 200, metrics_text().encode('utf-8'), METRICS_MIMETYPE, ()
+
+
+async def emergency_alert(request):
+    lang = request.json().get("language", "english").lower()
+    selected = EMERGENCY_MESSAGES.get(lang, EMERGENCY_MESSAGES["english"])
+    return 200, json_body(selected), 'application/json', ()
+
+
+# path -> (endpoint name as in app.py, allowed methods, handler, reads a body)
+ROUTES = {
+    '/': ('home', ('GET', 'HEAD'), home, False),
+    '/health': ('health_check', ('GET', 'HEAD'), health_check, False),
+    '/ready': ('readiness_check', ('GET', 'HEAD'), readiness_check, False),
+    '/diagnose': ('diagnose', ('POST',), diagnose, True),
+    '/diagnose/batch': ('diagnose_batch', ('POST',), diagnose_batch, True),
+    '/symptoms': ('get_symptoms', ('GET', 'HEAD'), get_symptoms, False),
+    '/metrics': ('metrics_endpoint', ('GET', 'HEAD'), metrics_endpoint, False),
+    '/emergency': ('emergency_alert', ('POST',), emergency_alert, True),
+}
+
+
+def cors_headers(request_headers):
+    """Same headers Flask-CORS adds with its default (allow every origin) settings"""
+    origin = request_headers.get('origin')
+    if origin is None:
+        return [(b'access-control-allow-origin', b'*')]
+    return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+
+
+async def send_response(send, status, body, content_type, headers, include_body=True):
+    raw_headers = list(headers)
+    if content_type:
+        raw_headers.append((b'content-type', content_type.encode('latin-1')))
+    raw_headers.append((b'content-length', str(len(body)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': body if include_body else b''})
+
+
+async def handle_http(scope, receive, send):
+    start = time.perf_counter()
+    method = scope['method']
+    route = ROUTES.get(scope['path'])
+    request_headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+    headers = cors_headers(request_headers)
+
+    if route is None:
+        await send_response(send, 404, b'Not Found', 'text/plain; charset=utf-8', headers)
+        return
+    endpoint, methods, handler, reads_body = route
+
+    if method == 'OPTIONS':
+        headers.append((b'allow', ', '.join(methods + ('OPTIONS',)).encode()))
+        if 'access-control-request-method' in request_headers:
+            headers.append((b'access-control-allow-methods', CORS_ALLOW_METHODS))
+            requested = request_headers.get('access-control-request-headers')
+            if requested:
+                headers.append((b'access-control-allow-headers', requested.encode('latin-1')))
+        await send_response(send, 200, b'', None, headers)
+        return
+    if method not in methods:
+        headers.append((b'allow', ', '.join(methods + ('OPTIONS',)).encode()))
+        await send_response(send, 405, b'Method Not Allowed', 'text/plain; charset=utf-8', headers)
+        return
+
+    try:
+        body = b''
+        if reads_body:
+            # Waiting here costs one parked coroutine, however slow the client is
+            body = await asyncio.wait_for(read_body(receive), BODY_TIMEOUT)
+        request = Request(scope, body)
+        request.timer = StageTimer()
+        status, response_body, content_type, extra_headers = await handler(request)
+    except asyncio.TimeoutError:
+        status, response_body, content_type, extra_headers = 408, b'Request Timeout', 'text/plain; charset=utf-8', ()
+        request = None
+    except BadRequest as e:
+        status, response_body, content_type, extra_headers = e.status, str(e).encode(), 'text/plain; charset=utf-8', ()
+        request = None
+    except ConnectionResetError:
+        return
+
+    elapsed = time.perf_counter() - start
+    record_request(endpoint, method, status, elapsed)
+    stages = request.timer.stages if request is not None else ()
+    headers.extend(extra_headers)
+    headers.append((b'server-timing', server_timing(stages, elapsed).encode()))
+    await send_response(send, status, response_body, content_type, headers, include_body=method != 'HEAD')
+
+
+async def handle_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            kb_watcher.stop()
+            scoring_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI 3 entry point"""
+    if scope['type'] == 'http':
+        await handle_http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await handle_lifespan(receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("Starting Healthcare AI Assistant Backend (asyncio)...")
+    uvicorn.run('asgi:application', host='0.0.0.0', port=int(os.environ.get('PORT', '5000')))
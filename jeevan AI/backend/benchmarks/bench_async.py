@@ -0,0 +1,171 @@
+"""
+Slow-client benchmark: sync gunicorn (app:app) vs the asyncio entry point (asgi:application).
+
+Opens --slow-clients connections that trickle a /diagnose body one byte at a
+time over --trickle-seconds (a 2G phone), and meanwhile measures how long
+ordinary /diagnose requests take on the same server. Run from the backend folder:
+    python benchmarks/bench_async.py
+    python benchmarks/bench_async.py --slow-clients 500 --workers 4 --trickle-seconds 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BODY = json.dumps({'symptom': 'fever', 'language': 'english'}).encode()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_commands(port, workers):
+    bind = f'127.0.0.1:{port}'
+    return {
+        # -c os.devnull: plain sync workers, not the production profile in ./gunicorn.conf.py
+        'gunicorn sync': [sys.executable, '-m', 'gunicorn', '-c', os.devnull, '--workers', str(workers),
+                          '--bind', bind, '--timeout', '120', 'app:app'],
+        'uvicorn asgi': [sys.executable, '-m', 'uvicorn', '--host', '127.0.0.1', '--port', str(port),
+                         '--log-level', 'warning', 'asgi:application'],
+    }
+
+
+def request_head(length):
+    return (f'POST /diagnose HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {length}\r\nConnection: close\r\n\r\n').encode()
+
+
+async def read_status(reader):
+    status_line = await reader.readline()
+    await reader.read()  # Connection: close, read until EOF
+    return int(status_line.split()[1]) if status_line else 0
+
+
+async def slow_client(port, trickle_seconds):
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request_head(len(BODY)))
+        delay = trickle_seconds / len(BODY)
+        for i in range(len(BODY)):
+            writer.write(BODY[i:i + 1])
+            await writer.drain()
+            await asyncio.sleep(delay)
+        status = await read_status(reader)
+        writer.close()
+        return status
+    except OSError:
+        return 0
+
+
+async def fast_client(port, count, timeout):
+    latencies = []
+    errors = 0
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+            writer.write(request_head(len(BODY)) + BODY)
+            status = await asyncio.wait_for(read_status(reader), timeout)
+            writer.close()
+            if status != 200:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        except (OSError, asyncio.TimeoutError):
+            errors += 1
+    return latencies, errors
+
+
+async def run_load(port, args):
+    slow = [asyncio.create_task(slow_client(port, args.trickle_seconds)) for _ in range(args.slow_clients)]
+    await asyncio.sleep(0.5)  # let the slow clients occupy the server first
+    start = time.perf_counter()
+    results = await asyncio.gather(*(fast_client(port, args.requests // args.concurrency, args.timeout)
+                                     for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    slow_statuses = await asyncio.gather(*slow)
+
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(error for _, error in results)
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 1) if latencies else None
+
+    return {
+        'fast_requests_ok': len(latencies),
+        'fast_errors': errors,
+        'fast_throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': percentile(50),
+        'p99_ms': percentile(99),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+        'slow_clients_ok': sum(status == 200 for status in slow_statuses),
+    }
+
+
+def wait_until_listening(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slow-clients', type=int, default=100)
+    parser.add_argument('--trickle-seconds', type=float, default=5.0, help='time each slow client takes to send its body')
+    parser.add_argument('--requests', type=int, default=200, help='ordinary requests sent while the slow clients are connected')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn sync workers')
+    parser.add_argument('--timeout', type=float, default=30.0, help='per-request timeout for the ordinary requests')
+    parser.add_argument('--json', help='write the report to this file')
+    args = parser.parse_args()
+
+    env = dict(os.environ, KB_RELOAD_INTERVAL='0')
+    report = {}
+    for name in server_commands(0, args.workers):
+        port = free_port()
+        command = server_commands(port, args.workers)[name]
+        server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not wait_until_listening(port):
+                report[name] = {'error': 'server did not start'}
+                continue
+            time.sleep(1)
+            report[name] = asyncio.run(run_load(port, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"\n{args.slow_clients} slow clients ({args.trickle_seconds}s per body), "
+          f"{args.requests} ordinary /diagnose requests, gunicorn workers={args.workers}")
+    print(f"{'server':<15} {'ok':>6} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'slow ok':>8}")
+    for name, result in report.items():
+        if 'error' in result:
+            print(f"{name:<15} {result['error']}")
+            continue
+        print(f"{name:<15} {result['fast_requests_ok']:>6} {result['fast_errors']:>7} "
+              f"{result['fast_throughput_rps']:>8} {result['p50_ms']:>9} {result['p99_ms']:>9} "
+              f"{result['slow_clients_ok']:>8}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': report}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Throughput benchmark: one /diagnose POST per item vs a single /diagnose/batch POST.
+
+Every item is a distinct text by default ("fever for 17 hours"), as in real
+kiosk and SMS logs, since /diagnose/batch scores repeated inputs only once.
+--repeated draws every item from the same 10 queries instead. Run from the
+backend folder:
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --repeated
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+
+QUERIES = [
+    ('fever', 'english'), ('बुखार', 'hindi'), ('headache', 'english'),
+    ('talai vali', 'tamil'), ('i have chest pain since morning', 'english'),
+    ('पेट में दर्द', 'hindi'), ('dry cough at night', 'english'),
+    ('irumal', 'tamil'), ('leg pain after walking', 'english'),
+    ('something unknown', 'english'),
+]
+SIZES = [1, 100, 10000]
+
+
+def make_items(count, repeated=False):
+    """count items drawn from QUERIES; each one a distinct text unless repeated"""
+    rng = random.Random(count)
+    items = []
+    for index in range(count):
+        symptom, language = rng.choice(QUERIES)
+        if not repeated:
+            symptom = f'{symptom} for {index} hours'
+        items.append({'symptom': symptom, 'language': language})
+    return items
+
+
+def bench_single(client, items):
+    start = time.perf_counter()
+    for item in items:
+        client.post('/diagnose', json=item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def bench_batch(client, items):
+    start = time.perf_counter()
+    response = client.post('/diagnose/batch', json=items)
+    elapsed = time.perf_counter() - start
+    assert response.get_json()['count'] == len(items)
+    return len(items) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeated', action='store_true', help='draw every item from the same 10 queries')
+    args = parser.parse_args()
+
+    client = app.test_client()
+    client.post('/diagnose/batch', json=make_items(10))  # warm up
+
+    print(f"{'items':>8} {'single items/s':>16} {'batch items/s':>16} {'speedup':>9}")
+    for size in SIZES:
+        items = make_items(size, args.repeated)
+        single = bench_single(client, items)
+        batch = bench_batch(client, items)
+        print(f"{size:>8} {single:>16,.0f} {batch:>16,.0f} {batch / single:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Per-worker memory of gunicorn with and without the production profile.
+
+    plain    gunicorn app:app (sync workers, each imports app.py and builds its own KB)
+    preload  gunicorn -c gunicorn.conf.py app:app (built once in the master, gc.freeze(), forked)
+
+Each profile serves a district-style knowledge base (see bench_kb_memory.py)
+from a temporary folder. Once /ready answers, the script sends --requests
+/diagnose requests spread over all workers, so refcount and collector writes
+have had their chance to copy shared pages, then reads
+/proc/<pid>/smaps_rollup of the master and every worker. USS (private pages)
+is what each extra worker costs; PSS splits shared pages among the processes
+that map them. Linux only. Run from the backend folder:
+    python benchmarks/bench_fork_memory.py
+    python benchmarks/bench_fork_memory.py --rows 25 10000 --workers 4 --json fork_memory.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from bench_kb_memory import write_kb  # noqa: E402
+from loadtest import DEFAULT_CORPUS, HTTPClient, free_port, load_corpus  # noqa: E402
+
+PROFILES = ('plain', 'preload')
+READY_TIMEOUT = 600
+
+
+def server_command(profile, port, workers):
+    command = [sys.executable, '-m', 'gunicorn', '--pythonpath', BACKEND_DIR, '--bind', f'127.0.0.1:{port}',
+               '--workers', str(workers), '--timeout', '120']
+    if profile == 'preload':
+        command += ['-c', os.path.join(BACKEND_DIR, 'gunicorn.conf.py')]
+    return command + ['app:app']
+
+
+def wait_until_ready(port, server):
+    """Poll /ready until it answers 200; False if the server exits or the timeout passes"""
+    client = HTTPClient(f'http://127.0.0.1:{port}')
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            status, _ = client.request('GET', '/ready', None)
+            if status == 200:
+                return True
+        except OSError:
+            client.close()
+        time.sleep(0.2)
+    return False
+
+
+def smaps_mb(pid):
+    """{'rss', 'pss', 'uss'} of a process in MB, from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    uss = fields['Private_Clean'] + fields['Private_Dirty']
+    return {'rss': round(fields['Rss'] / 1024, 1), 'pss': round(fields['Pss'] / 1024, 1),
+            'uss': round(uss / 1024, 1)}
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def send_requests(port, corpus, count, concurrency):
+    bodies = [json.dumps({'symptom': query['symptom'], 'language': query['language']}).encode('utf-8')
+              for query in corpus]
+
+    def client_thread(offset):
+        client = HTTPClient(f'http://127.0.0.1:{port}')
+        try:
+            for index in range(offset, count, concurrency):
+                client.request('POST', '/diagnose', bodies[index % len(bodies)])
+                if index % 50 == offset % 50:
+                    client.close()  # new connections land on other workers
+        finally:
+            client.close()
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(client_thread, range(concurrency)))
+
+
+def measure(profile, rows, workers, corpus, requests, csv_dir):
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(server_command(profile, port, workers), cwd=csv_dir,
+                              env=dict(os.environ, WEB_CONCURRENCY=str(workers)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_until_ready(port, server):
+            return {'profile': profile, 'rows': rows, 'error': 'server did not become ready'}
+        ready_s = time.perf_counter() - start
+        send_requests(port, corpus, requests, 2 * workers)
+        worker_memory = [smaps_mb(pid) for pid in children(server.pid)]
+        master = smaps_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+    def mean(key):
+        return round(sum(memory[key] for memory in worker_memory) / len(worker_memory), 1)
+
+    return {'profile': profile, 'rows': rows, 'workers': len(worker_memory), 'ready_s': round(ready_s, 2),
+            'master': master, 'worker_uss_mb': mean('uss'), 'worker_pss_mb': mean('pss'),
+            'worker_rss_mb': mean('rss'),
+            'total_pss_mb': round(master['pss'] + sum(memory['pss'] for memory in worker_memory), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[25, 10000], help='knowledge base sizes')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--profiles', default=','.join(PROFILES), help=f"comma-separated, of {', '.join(PROFILES)}")
+    parser.add_argument('--requests', type=int, default=2000, help='/diagnose requests sent before measuring')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    results = []
+    print(f"{'rows':>7} {'profile':<8} {'ready s':>8} {'master RSS':>11} {'worker USS':>11} {'worker PSS':>11} "
+          f"{'worker RSS':>11} {'total PSS':>10}  (MB)")
+    for rows in args.rows:
+        directory = tempfile.mkdtemp()
+        try:
+            write_kb(os.path.join(directory, 'healthcare_kb.csv'), rows, distinct_advice=False)
+            for profile in args.profiles.split(','):
+                result = measure(profile, rows, args.workers, corpus, args.requests, directory)
+                results.append(result)
+                if 'error' in result:
+                    print(f"{rows:>7} {profile:<8} {result['error']}")
+                    continue
+                print(f"{rows:>7} {profile:<8} {result['ready_s']:>8} {result['master']['rss']:>11} "
+                      f"{result['worker_uss_mb']:>11} {result['worker_pss_mb']:>11} {result['worker_rss_mb']:>11} "
+                      f"{result['total_pss_mb']:>10}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': {key: value for key, value in vars(args).items() if key != 'json'},
+                       'results': results}, f, indent=2)
+        print(f"Saved {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Import-time and memory report for the backend and the CLI entry modules.
+
+Runs `python -X importtime` in a fresh interpreter for each target, so the
+numbers reflect a cold gunicorn worker / kiosk launch. Run from the backend folder:
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --json imports.json --budget-ms 300
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'CLI version')
+
+TARGETS = [
+    ('backend app', BACKEND_DIR, 'import app'),
+    ('cli agent', CLI_DIR, 'import healthcare_agent'),
+]
+HEAVY_MODULES = ['pandas', 'numpy', 'pyttsx3', 'speech_recognition', 'fuzzywuzzy']
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+PROBE = """
+import resource, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print('RESULT', elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+      ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(cwd, statement):
+    env = dict(os.environ, KB_RELOAD_INTERVAL='0')
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else 'import failed')
+
+    result_line = next(line for line in proc.stdout.splitlines() if line.startswith('RESULT'))
+    _, elapsed, maxrss_kb, heavy = result_line.split(' ', 3)
+
+    # The target and its direct imports (importtime indents each nesting level by 2), heaviest first
+    top_level = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) <= 3:
+            top_level.append((match.group(4), int(match.group(2)) / 1000))
+    top_level.sort(key=lambda item: -item[1])
+
+    return {
+        'import_ms': round(float(elapsed) * 1000, 1),
+        'max_rss_mb': round(int(maxrss_kb) / 1024, 1),
+        'heavy_modules_loaded': [m for m in heavy.strip().split(',') if m],
+        'top_imports_ms': [{'module': name, 'cumulative_ms': round(ms, 1)} for name, ms in top_level[:10]]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--budget-ms', type=float, help='exit non-zero if any target imports slower than this')
+    args = parser.parse_args()
+
+    report = {}
+    for name, cwd, statement in TARGETS:
+        try:
+            report[name] = measure(cwd, statement)
+        except (RuntimeError, StopIteration) as e:
+            report[name] = {'error': str(e)}
+
+    for name, result in report.items():
+        print(f"\n== {name} ==")
+        if 'error' in result:
+            print(f"  failed: {result['error']}")
+            continue
+        print(f"  import time : {result['import_ms']:.1f} ms")
+        print(f"  max RSS     : {result['max_rss_mb']:.1f} MB")
+        print(f"  heavy mods  : {', '.join(result['heavy_modules_loaded']) or 'none'}")
+        for item in result['top_imports_ms']:
+            print(f"    {item['cumulative_ms']:8.1f} ms  {item['module']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.budget_ms is not None:
+        slow = [name for name, result in report.items()
+                if 'error' in result or result['import_ms'] > args.budget_ms]
+        if slow:
+            print(f"\nOver budget ({args.budget_ms} ms): {', '.join(slow)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Knowledge base memory benchmark: heap and RSS of the ways a KB can be held,
+on district-style knowledge bases grown from the real rows.
+
+    dataframe  pandas.read_csv, then a SymptomMatcher keeping a dict per row
+               (what the CLI does without the backend modules)
+    dicts      csv.DictReader rows, then a SymptomMatcher keeping a dict per row
+    columnar   read_kb_csv(): interned UTF-8 blob, uint32 cell ids, uint8
+               severity, entries built on access (what the backend and CLI do)
+    snapshot   the memory-mapped compiled snapshot (python kb_snapshot.py)
+
+Every synthetic row is a real symptom renamed for a made-up district
+("Fever (Kamiro)"), with the real advice and first aid, as when district
+KBs are merged. --distinct-advice makes every advice text unique too, the
+worst case for interning. --native-script writes the district in each
+column's own script ("बुखार (कारोमि)"), which gives the Hindi and Tamil
+columns their real alphabet sizes. Each layout is measured in a fresh
+process: tracemalloc heap after loading the table and after building the
+matcher, then current and peak RSS (Linux).
+
+--cli-candidates also builds the CLI's MatchCandidates (the fuzzy name
+index of each language) and reports its character count table: alphabet
+size, non-zero counts, what a dense alphabet x names table would take and
+what is actually stored. Run from the backend folder:
+    python benchmarks/bench_kb_memory.py
+    python benchmarks/bench_kb_memory.py --rows 1000 100000 500000 --json kb_memory.json
+    python benchmarks/bench_kb_memory.py --rows 1000000 --layouts columnar --native-script --cli-candidates
+"""
+
+import argparse
+import csv
+import gc
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'CLI version')
+sys.path.insert(0, BACKEND_DIR)
+
+from kb_snapshot import compile_kb, load_snapshot, read_kb_csv  # noqa: E402
+from matcher import SymptomMatcher  # noqa: E402
+
+KB_PATH = os.path.join(BACKEND_DIR, 'healthcare_kb.csv')
+LAYOUTS = ('dataframe', 'dicts', 'columnar', 'snapshot')
+SYLLABLES = ['ka', 'ro', 'mi', 'su', 'te', 'na', 'pu', 'li', 'go', 'da', 've', 'shi', 'tha', 'mor', 'bel', 'kri']
+# The same syllables in each script, for --native-script
+NATIVE_SYLLABLES = {
+    'hindi': ['का', 'रो', 'मि', 'सु', 'ते', 'ना', 'पु', 'ली', 'गो', 'दा', 'वे', 'शि', 'था', 'मोर', 'बेल', 'क्रि'],
+    'tamil': ['கா', 'ரோ', 'மி', 'சு', 'தே', 'நா', 'பு', 'லி', 'கோ', 'டா', 'வே', 'ஷி', 'தா', 'மோர்', 'பெல்', 'க்ரி'],
+}
+CLI_COLUMNS = ('symptom_english', 'symptom_hindi', 'symptom_tamil')
+
+
+def write_kb(path, rows, distinct_advice, seed=0, native_script=False):
+    """Write a KB of `rows` rows: the real ones, then real symptoms renamed for made-up districts"""
+    with open(KB_PATH, encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        columns = reader.fieldnames
+        real = list(reader)
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, columns)
+        writer.writeheader()
+        for index in range(rows):
+            row = dict(real[index % len(real)])
+            if index >= len(real):
+                syllables = [rng.randrange(len(SYLLABLES)) for _ in range(rng.randint(2, 4))]
+                district = ''.join(SYLLABLES[syllable] for syllable in syllables).title()
+                for language in ('english', 'hindi', 'tamil'):
+                    name = district
+                    if native_script and language in NATIVE_SYLLABLES:
+                        name = ''.join(NATIVE_SYLLABLES[language][syllable] for syllable in syllables)
+                    row[f'symptom_{language}'] = f"{row[f'symptom_{language}']} ({name})"
+                    if distinct_advice:
+                        row[f'advice_{language}'] = f"{row[f'advice_{language}']} ({name})"
+                row['patterns'] = f"{district.lower()} {row['symptom_english'].split(' (')[0].lower()}"
+            writer.writerow(row)
+
+
+def load(layout, csv_path):
+    """(table, matcher) of one layout"""
+    if layout == 'dataframe':
+        import pandas as pd
+        table = pd.read_csv(csv_path)
+        return table, lambda: SymptomMatcher.from_dataframe(table)
+    if layout == 'dicts':
+        with open(csv_path, encoding='utf-8') as f:
+            table = list(csv.DictReader(f))
+        return table, lambda: SymptomMatcher(table)
+    if layout == 'columnar':
+        table, _ = read_kb_csv(csv_path)
+        return table, lambda: SymptomMatcher.from_dataframe(table)
+    table, reason = load_snapshot(csv_path)
+    if table is None:
+        raise RuntimeError(reason)
+    return table, table.build_matcher
+
+
+def heap_mb():
+    gc.collect()
+    return round(tracemalloc.get_traced_memory()[0] / 2**20, 1)
+
+
+def rss_mb():
+    """(current, peak) RSS of this process in MB; None where /proc is missing"""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return None, None
+    return tuple(round(int(fields[key].split()[0]) / 1024, 1) for key in ('VmRSS', 'VmHWM'))
+
+
+def measure(layout, csv_path, use_tracemalloc, connection):
+    """Worker process: load one layout and send its memory figures"""
+    if layout == 'dataframe':
+        import pandas  # noqa: F401  (the library itself is not part of the table's heap)
+    if use_tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    table, build_matcher = load(layout, csv_path)
+    load_s = time.perf_counter() - start
+    table_mb = heap_mb() if use_tracemalloc else None
+    matcher = build_matcher()
+    matcher_mb = heap_mb() if use_tracemalloc else None
+    matcher.best_match('fever')  # touch the entries the way a request does
+    # VmHWM, unlike ru_maxrss, is not inherited from the parent across exec
+    rss, peak_rss = rss_mb()
+    connection.send({'layout': layout, 'load_s': round(load_s, 3), 'table_heap_mb': table_mb,
+                     'total_heap_mb': matcher_mb, 'rss_mb': rss, 'peak_rss_mb': peak_rss})
+    connection.close()
+
+
+def run_isolated(layout, csv_path, use_tracemalloc):
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=measure, args=(layout, csv_path, use_tracemalloc, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {'layout': layout, 'error': f'worker exited with code {process.exitcode}'}
+    process.join()
+    return result
+
+
+def measure_candidates(csv_path, connection):
+    """Worker process: build the CLI's MatchCandidates of every symptom column and send their table sizes"""
+    import numpy as np
+    sys.path.insert(0, CLI_DIR)
+    from healthcare_agent import MatchCandidates
+    table, _ = read_kb_csv(csv_path)
+    results = []
+    for column in CLI_COLUMNS:
+        start = time.perf_counter()
+        candidates = MatchCandidates(table.column(column))
+        build_s = time.perf_counter() - start
+        itemsize = np.dtype(candidates.count_dtype).itemsize
+        results.append({'column': column, 'alphabet': len(candidates.alphabet), 'build_s': round(build_s, 2),
+                        'nonzero': candidates.nonzero,
+                        'dense_mb': round(len(candidates.alphabet) * len(candidates) * itemsize / 2**20, 1),
+                        'stored_mb': round(candidates.counts_nbytes / 2**20, 1)})
+    connection.send(results)
+    connection.close()
+
+
+def run_candidates(csv_path):
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=measure_candidates, args=(csv_path, sender))
+    process.start()
+    sender.close()
+    try:
+        results = receiver.recv()
+    except EOFError:
+        results = [{'column': column, 'error': f'worker exited with code {process.exitcode}'}
+                   for column in CLI_COLUMNS]
+    process.join()
+    return results
+
+
+def cell(value):
+    return '-' if value is None else value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--layouts', default=','.join(LAYOUTS), help=f"comma-separated, of {', '.join(LAYOUTS)}")
+    parser.add_argument('--distinct-advice', action='store_true', help='make every advice text unique')
+    parser.add_argument('--no-tracemalloc', action='store_true', help='only measure RSS (much faster on large KBs)')
+    parser.add_argument('--native-script', action='store_true',
+                        help='write district names in the Hindi and Tamil scripts in those columns')
+    parser.add_argument('--cli-candidates', action='store_true',
+                        help="also measure the character count tables of the CLI's fuzzy name index")
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>9} {'layout':<10} {'load s':>7} {'table MB':>9} {'+matcher MB':>12} {'RSS MB':>8} "
+          f"{'peak RSS MB':>12}")
+    for rows in args.rows:
+        directory = tempfile.mkdtemp()
+        try:
+            csv_path = os.path.join(directory, 'healthcare_kb.csv')
+            write_kb(csv_path, rows, args.distinct_advice, native_script=args.native_script)
+            if 'snapshot' in args.layouts:
+                compile_kb(csv_path)
+            for layout in args.layouts.split(','):
+                result = dict(run_isolated(layout, csv_path, not args.no_tracemalloc), rows=rows,
+                              csv_mb=round(os.path.getsize(csv_path) / 2**20, 1))
+                results.append(result)
+                if 'error' in result:
+                    print(f"{rows:>9} {layout:<10} {result['error']}")
+                    continue
+                print(f"{rows:>9} {layout:<10} {result['load_s']:>7} {cell(result['table_heap_mb']):>9} "
+                      f"{cell(result['total_heap_mb']):>12} {cell(result['rss_mb']):>8} {cell(result['peak_rss_mb']):>12}")
+            if args.cli_candidates:
+                for result in run_candidates(csv_path):
+                    results.append(dict(result, rows=rows, layout='cli-candidates'))
+                    if 'error' in result:
+                        print(f"{rows:>9} {result['column']:<16} {result['error']}")
+                        continue
+                    print(f"{rows:>9} {result['column']:<16} alphabet {result['alphabet']:>4}  "
+                          f"non-zero {result['nonzero']:>11,}  dense {result['dense_mb']:>7} MB  "
+                          f"stored {result['stored_mb']:>7} MB  build {result['build_s']} s")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': {key: value for key, value in vars(args).items() if key != 'json'},
+                       'results': results}, f, indent=2)
+        print(f"Saved {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Semantic matcher benchmark: index build time, memory and query latency of
+the character n-gram index (semantic.py), float32 vs int8, on the real
+knowledge base grown with synthetic symptoms.
+
+Run from the backend folder:
+    python benchmarks/bench_semantic.py
+    python benchmarks/bench_semantic.py --sizes 25 1000 10000 100000
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matcher import SymptomMatcher, normalize_text  # noqa: E402
+from semantic import SemanticIndex  # noqa: E402
+from spelling import romanize  # noqa: E402
+
+KB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'healthcare_kb.csv')
+QUERIES = [
+    'my head is hurting badly', 'burning in chest', 'my stomach hurts', 'feeling dizzy',
+    'bleeding from nose', 'vomiting since morning', 'runny nose and sneezing', 'pet mein dard hai',
+    'bahut khansi ho rahi hai', 'tooth pain', 'feeling tired', 'what is the weather',
+]
+BATCH_SIZE = 256
+REPEATS = 20
+SYLLABLES = ['ka', 'ro', 'mi', 'su', 'te', 'na', 'pu', 'li', 'go', 'da', 've', 'shi', 'tha', 'mor', 'bel', 'kri']
+PARTS = ['arm', 'ear', 'neck', 'knee', 'wrist', 'skin', 'eye', 'lung', 'liver', 'joint', 'gum', 'hip']
+KINDS = ['pain', 'ache', 'swelling', 'rash', 'itching', 'cramp', 'infection', 'stiffness']
+
+
+def real_texts():
+    """Texts of each real symptom, as SymptomMatcher indexes them"""
+    rows = list(csv.DictReader(open(KB_PATH, encoding='utf-8')))
+    texts_by_symptom = []
+    for entry in SymptomMatcher(rows).symptoms:
+        texts = {}
+        for text in list(entry['patterns']) + [name for name in entry['name'].values() if name]:
+            text = normalize_text(text)
+            for variant in (text, romanize(text)):
+                if variant:
+                    texts[variant] = None
+        texts_by_symptom.append(list(texts))
+    return texts_by_symptom
+
+
+def synthetic_texts(count, seed=0):
+    """Made-up symptoms with three names each: 'kamiro knee swelling', 'kamiro knee', 'kamiro sujan'"""
+    rng = random.Random(seed)
+    texts_by_symptom = []
+    for _ in range(count):
+        word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        part, kind = rng.choice(PARTS), rng.choice(KINDS)
+        texts_by_symptom.append([f'{word} {part} {kind}', f'{word} {part}', f'{word} {kind}'])
+    return texts_by_symptom
+
+
+def per_query_ms(function, queries, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function(queries)
+    return (time.perf_counter() - start) / (repeats * len(queries)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[25, 1000, 10000, 100000],
+                        help='symptoms in the knowledge base (the real ones, then synthetic ones)')
+    args = parser.parse_args()
+
+    real = real_texts()
+    queries = [normalize_text(query) for query in QUERIES]
+    batch = [queries[i % len(queries)] for i in range(BATCH_SIZE)]
+
+    print(f"{'symptoms':>9} {'rows':>8} {'dtype':>7} {'build s':>8} {'MB':>8} "
+          f"{'query ms':>9} {'batched ms':>11} {'top-1 = float32':>16}")
+    for size in args.sizes:
+        texts = (real + synthetic_texts(max(0, size - len(real))))[:size]
+        reference = None
+        for quantize in ('off', 'on'):
+            start = time.perf_counter()
+            index = SemanticIndex(texts, quantize=quantize)
+            build = time.perf_counter() - start
+
+            repeats = max(1, REPEATS * 1000 // size)
+            single = per_query_ms(lambda q: [index.top(text, 10) for text in q], queries, repeats)
+            batched = per_query_ms(lambda q: index.top_batch(q, 10), batch, max(1, repeats // 10))
+
+            top = np.argmax(index.similarities(queries), axis=1)
+            if reference is None:
+                reference = top
+            agreement = f"{np.mean(top == reference):.0%}"
+            print(f"{size:>9,} {index.matrix.shape[0]:>8,} {index.matrix.dtype.name:>7} {build:>8.2f} "
+                  f"{index.nbytes / 2**20:>8.1f} {single:>9.3f} {batched:>11.3f} {agreement:>16}")
+            del index
+
+
+if __name__ == '__main__':
+    main()
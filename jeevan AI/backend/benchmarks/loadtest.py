@@ -0,0 +1,327 @@
+"""
+Load test for the backend with a multilingual query corpus.
+
+Replays a weighted mix of English, Hindi, Tamil and romanized queries
+(benchmarks/query_corpus.json) against /diagnose, /symptoms and /emergency
+from concurrent client threads, then reports throughput, p50/p95/p99 latency,
+error rates and answers that differ from the corpus' expected symptom.
+
+Targets (run from the backend folder):
+    python benchmarks/loadtest.py                               # in-process Flask app
+    python benchmarks/loadtest.py --server gunicorn --workers 4 # starts a local gunicorn
+    python benchmarks/loadtest.py --server asgi                 # starts uvicorn asgi:application
+    python benchmarks/loadtest.py --url http://127.0.0.1:5000   # an already running server
+Add --json result.json to save the report, e.g. to compare before/after a change.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_async import free_port, server_commands, wait_until_listening  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(BENCH_DIR, 'query_corpus.json')
+DEFAULT_MIX = 'diagnose=85,symptoms=10,emergency=5'
+LANGUAGES = ('english', 'hindi', 'tamil')
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+def load_corpus(path, languages=None):
+    """[{symptom, language, weight, expect}], optionally limited to some languages"""
+    with open(path, encoding='utf-8') as f:
+        corpus = json.load(f)
+    if languages:
+        corpus = [query for query in corpus if query['language'] in languages]
+    if not corpus:
+        raise ValueError(f"No queries in {path} for languages {languages}")
+    return corpus
+
+
+def parse_mix(text):
+    """'diagnose=85,symptoms=10,emergency=5' -> {'diagnose': 85.0, ...}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ('diagnose', 'symptoms', 'emergency'):
+            raise ValueError(f"Unknown endpoint in --mix: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def build_plan(corpus, mix, count, seed):
+    """Pre-generate (endpoint, method, path, body, expect) so the timed loop only sends requests"""
+    rng = random.Random(seed)
+    endpoints = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    queries = rng.choices(corpus, weights=[query.get('weight', 1) for query in corpus], k=count)
+    plan = []
+    for endpoint, query in zip(endpoints, queries):
+        language = query['language']
+        if endpoint == 'diagnose':
+            body = json.dumps({'symptom': query['symptom'], 'language': language}).encode('utf-8')
+            plan.append(('diagnose', 'POST', '/diagnose', body, query.get('expect')))
+        elif endpoint == 'symptoms':
+            plan.append(('symptoms', 'GET', f'/symptoms?language={language}', None, None))
+        else:
+            body = json.dumps({'language': language}).encode('utf-8')
+            plan.append(('emergency', 'POST', '/emergency', body, None))
+    return plan
+
+
+class InProcessClient:
+    """Calls the Flask app directly through its test client (no sockets)"""
+
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+
+    def request(self, method, path, body):
+        response = self.client.open(path, method=method, data=body, headers=JSON_HEADERS if body else None)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+
+class HTTPClient:
+    """One keep-alive connection per client thread; reconnects when the server closes it"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.connection = None
+
+    def request(self, method, path, body):
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.connection.request(method, path, body=body, headers=JSON_HEADERS if body else {})
+                response = self.connection.getresponse()
+                data = response.read()
+                if response.will_close:
+                    self.close()
+                return response.status, data
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()  # stale keep-alive connection, retry once on a new one
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class EndpointStats:
+    __slots__ = ('latencies', 'errors', 'mismatches')
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.mismatches = 0
+
+
+def diagnosed_symptom(body):
+    """English name of the diagnosed symptom in a /diagnose response, or None for no match"""
+    data = json.loads(body)
+    return data['result']['name']['english'] if data.get('success') else None
+
+
+def worker(make_client, plan, offset, step, deadline, check_answers, stats):
+    client = make_client()
+    index = offset
+    try:
+        while True:
+            if deadline is None:
+                if index >= len(plan):
+                    break
+            elif time.perf_counter() >= deadline:
+                break
+            endpoint, method, path, body, expect = plan[index % len(plan)]
+            index += step
+
+            endpoint_stats = stats.setdefault(endpoint, EndpointStats())
+            start = time.perf_counter()
+            try:
+                status, data = client.request(method, path, body)
+            except Exception:
+                endpoint_stats.errors += 1
+                continue
+            elapsed = time.perf_counter() - start
+
+            # 400 is a valid answer for some corpus entries; only 5xx and transport failures are errors
+            if status >= 500:
+                endpoint_stats.errors += 1
+                continue
+            endpoint_stats.latencies.append(elapsed)
+            if check_answers and endpoint == 'diagnose' and status == 200 and diagnosed_symptom(data) != expect:
+                endpoint_stats.mismatches += 1
+    finally:
+        client.close()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def summarize(latencies, errors, mismatches, elapsed):
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        'requests': total,
+        'ok': len(latencies),
+        'errors': errors,
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'answer_mismatches': mismatches,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': ms(percentile(latencies, 50)),
+        'p95_ms': ms(percentile(latencies, 95)),
+        'p99_ms': ms(percentile(latencies, 99)),
+        'max_ms': ms(latencies[-1] if latencies else None),
+    }
+
+
+def run(make_client, plan, concurrency, duration, check_answers):
+    """Run the plan on `concurrency` threads; returns (per-thread stats dicts, elapsed seconds)"""
+    thread_stats = [{} for _ in range(concurrency)]
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+    threads = [threading.Thread(target=worker, args=(make_client, plan, i, concurrency, deadline,
+                                                     check_answers, thread_stats[i]))
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return thread_stats, time.perf_counter() - start
+
+
+def build_report(thread_stats, elapsed):
+    endpoints = {}
+    for stats in thread_stats:
+        for endpoint, endpoint_stats in stats.items():
+            merged = endpoints.setdefault(endpoint, EndpointStats())
+            merged.latencies.extend(endpoint_stats.latencies)
+            merged.errors += endpoint_stats.errors
+            merged.mismatches += endpoint_stats.mismatches
+
+    report = {name: summarize(s.latencies, s.errors, s.mismatches, elapsed) for name, s in sorted(endpoints.items())}
+    report['total'] = summarize([latency for s in endpoints.values() for latency in s.latencies],
+                                sum(s.errors for s in endpoints.values()),
+                                sum(s.mismatches for s in endpoints.values()), elapsed)
+    return report
+
+
+def print_report(target, report, elapsed):
+    print(f"\nTarget: {target}  ({elapsed:.1f} s)")
+    print(f"{'endpoint':<10} {'requests':>9} {'req/s':>9} {'err %':>7} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9} {'mismatch':>9}")
+    for name, row in report.items():
+        print(f"{name:<10} {row['requests']:>9} {row['throughput_rps'] or 0:>9} {row['error_rate'] * 100:>7.2f} "
+              f"{row['p50_ms'] or 0:>9} {row['p95_ms'] or 0:>9} {row['p99_ms'] or 0:>9} {row['max_ms'] or 0:>9} "
+              f"{row['answer_mismatches']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help='base URL of an already running server')
+    target.add_argument('--server', choices=['gunicorn', 'asgi'], help='start a local server of this kind')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers for --server gunicorn')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='JSON list of {symptom, language, weight, expect}')
+    parser.add_argument('--languages', help='comma-separated subset of english,hindi,tamil')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'endpoint weights (default {DEFAULT_MIX})')
+    parser.add_argument('--requests', type=int, default=5000, help='requests to send (ignored with --duration)')
+    parser.add_argument('--duration', type=float, help='run for this many seconds instead of a fixed count')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--warmup', type=int, default=100, help='untimed requests sent first')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-check', action='store_true', help='do not compare /diagnose answers with the corpus')
+    parser.add_argument('--json', help='write the report to this file')
+    args = parser.parse_args()
+
+    languages = [language.strip() for language in args.languages.split(',')] if args.languages else None
+    corpus = load_corpus(args.corpus, languages)
+    mix = parse_mix(args.mix)
+    plan = build_plan(corpus, mix, max(args.requests, 1000), args.seed)
+
+    server = None
+    if args.server:
+        port = free_port()
+        command = server_commands(port, args.workers)['gunicorn sync' if args.server == 'gunicorn' else 'uvicorn asgi']
+        server = subprocess.Popen(command, cwd=BACKEND_DIR, env=dict(os.environ, KB_RELOAD_INTERVAL='0'),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if not wait_until_listening(port):
+            server.terminate()
+            sys.exit(f"{args.server} did not start")
+        url = f'http://127.0.0.1:{port}'
+    else:
+        url = args.url
+
+    try:
+        if url:
+            target_name = f"{args.server or 'server'} at {url}"
+
+            def make_client():
+                return HTTPClient(url)
+        else:
+            os.environ.setdefault('KB_RELOAD_INTERVAL', '0')
+            os.chdir(BACKEND_DIR)  # app.py opens the knowledge base by relative path
+            from app import app as flask_app
+            target_name = 'in-process Flask app'
+
+            def make_client():
+                return InProcessClient(flask_app)
+
+        warm = make_client()
+        for _, method, path, body, _ in plan[:args.warmup]:
+            warm.request(method, path, body)
+        warm.close()
+
+        timed_plan = plan if args.duration else plan[:args.requests]
+        thread_stats, elapsed = run(make_client, timed_plan, args.concurrency, args.duration, not args.no_check)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = build_report(thread_stats, elapsed)
+    print_report(target_name, report, elapsed)
+
+    if args.json:
+        result = {
+            'target': target_name,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'config': {key: value for key, value in vars(args).items() if key != 'json'},
+            'elapsed_seconds': round(elapsed, 3),
+            'results': report,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nSaved {args.json}")
+
+    if report['total']['errors']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
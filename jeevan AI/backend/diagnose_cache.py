@@ -0,0 +1,129 @@
+# diagnose_cache.py - Bounded LRU/TTL cache with single-flight coalescing for /diagnose
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers for the same key wait on"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class DiagnosisCache:
+    """
+    LRU cache of diagnose results keyed on (canonical input, language).
+
+    - At most max_entries results are kept; the least recently used is evicted.
+    - Entries older than ttl seconds are recomputed (ttl <= 0 disables the cache).
+    - Concurrent misses for the same key are coalesced: one caller computes,
+      the others wait for its result instead of scoring the same input again.
+    - Every entry belongs to one KB version; the first lookup with a new
+      version drops everything cached for the previous one.
+    """
+
+    def __init__(self, max_entries=4096, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}            # key -> _Flight
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get_or_compute(self, key, compute, version=None):
+        """Return the cached value for key, calling compute() at most once per miss"""
+        if not self.enabled:
+            return compute()
+
+        key = (version, key)
+        with self._lock:
+            if version != self.version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.version = version
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = compute()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+            raise
+
+        flight.value = value
+        with self._lock:
+            del self._inflight[key]
+            # A reload may have happened while computing; never cache into the new version
+            if version == self.version:
+                self._entries[key] = (self.clock() + self.ttl, value)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        flight.done.set()
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters for /health and /metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_ratio': round((self.hits + self.coalesced) / lookups, 4) if lookups else None
+            }
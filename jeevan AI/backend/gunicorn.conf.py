@@ -0,0 +1,58 @@
+# gunicorn.conf.py - Production server profile: preload once, fork, share
+#
+#     gunicorn -c gunicorn.conf.py app:app
+#
+# The master imports app.py and builds the matcher's indexes, so they exist
+# once, before any worker exists. Workers are forked from it and share those
+# pages copy-on-write. gc.freeze() moves everything built so far out of the
+# collector's reach: a collection in a worker would otherwise write to the
+# header of every object and copy the pages anyway.
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Matching is pure Python and holds the GIL, so throughput comes from one
+# process per core. A second thread per worker covers requests waiting on
+# the network, not on the CPU.
+workers = int(os.environ.get('WEB_CONCURRENCY', str(multiprocessing.cpu_count())))
+threads = int(os.environ.get('GUNICORN_THREADS', '2'))
+worker_class = 'gthread'
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+# Nothing is freed while the app is preloaded, so no holes open up in the
+# pages the workers are going to share. when_ready turns the collector back on.
+gc.disable()
+
+
+def when_ready(server):
+    if preload_app:
+        # The indexes and /symptoms bodies are otherwise built by each
+        # worker on its first requests
+        from app import kb_watcher
+        snapshot = kb_watcher.snapshot
+        snapshot.matcher.build_indexes()
+        snapshot.symptom_responses
+    # Everything the preloaded app built becomes permanent: collections in
+    # the workers skip it, so its pages stay shared
+    gc.freeze()
+    # The master and the workers forked from it collect as usual from here;
+    # only the frozen objects stay out of reach
+    gc.enable()
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Threads do not survive a fork, and one stopped halfway through a
+        # reload would leave its lock held in the child. Each worker polls
+        # the knowledge base itself (see post_fork).
+        from app import kb_watcher
+        kb_watcher.stop(wait=True)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import kb_watcher
+        kb_watcher.start()
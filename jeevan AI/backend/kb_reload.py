@@ -0,0 +1,131 @@
+# kb_reload.py - Hot reload of the knowledge base with atomic snapshot swap
+import os
+import threading
+import time
+import traceback
+
+
+def file_signature(path):
+    """Return (mtime_ns, inode, size) for path, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+def files_signature(paths):
+    """Combined signature of several files (e.g. the CSV and its compiled snapshot)"""
+    return tuple(file_signature(path) for path in paths)
+
+
+class KBWatcher:
+    """
+    Polls the knowledge base files (mtime/inode/size) and rebuilds a snapshot
+    in the background when any of them changes.
+
+    build_snapshot() must return a new, fully built snapshot object; it is
+    published with a single reference assignment, so a request that already
+    read `watcher.snapshot` keeps using the old one until it finishes.
+    A snapshot whose `error` attribute is set never replaces a healthy one
+    (e.g. while an editor is halfway through rewriting the CSV).
+
+    When build_snapshot() raises on the initial load, fallback_snapshot(error)
+    is published instead (e.g. sample data), so `watcher.snapshot` is never None.
+    """
+
+    def __init__(self, paths, build_snapshot, interval=2.0, fallback_snapshot=None):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.build_snapshot = build_snapshot
+        self.fallback_snapshot = fallback_snapshot
+        self.interval = interval
+        self.version = 0
+        self.reload_count = 0
+        self.failed_reloads = 0
+        self.last_load_seconds = None
+        self.last_loaded_at = None
+        self.last_checked_at = None
+        self.last_error = None
+        self.snapshot = None
+        self._signature = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload(force=True)
+
+    def reload(self, force=False):
+        """Build a new snapshot and publish it. Returns True if it was published."""
+        with self._reload_lock:
+            signature = files_signature(self.paths)
+            start = time.perf_counter()
+            # Remember the signature even on failure so we do not retry in a loop
+            self._signature = signature
+            try:
+                snapshot = self.build_snapshot()
+            except Exception as e:
+                self.failed_reloads += 1
+                self.last_error = f"Error reloading knowledge base: {str(e)}"
+                print(self.last_error)
+                traceback.print_exc()
+                if self.snapshot is not None or self.fallback_snapshot is None:
+                    return False
+                snapshot = self.fallback_snapshot(self.last_error)
+            elapsed = time.perf_counter() - start
+            healthy = not getattr(snapshot, 'error', None)
+            if not force and not healthy and self.snapshot is not None and not getattr(self.snapshot, 'error', None):
+                self.failed_reloads += 1
+                self.last_error = snapshot.error
+                print(f"Warning: knowledge base reload failed, keeping version {self.version}: {snapshot.error}")
+                return False
+
+            self.version += 1
+            if not force:
+                self.reload_count += 1
+            self.last_load_seconds = elapsed
+            self.last_loaded_at = time.time()
+            self.last_error = None if healthy else snapshot.error
+            self.snapshot = snapshot  # atomic publish
+            return True
+
+    def check(self):
+        """Reload if the file changed since the last load. Returns True if reloaded."""
+        self.last_checked_at = time.time()
+        if files_signature(self.paths) == self._signature:
+            return False
+        return self.reload()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error checking knowledge base: {str(e)}")
+
+    def start(self):
+        """Start the background polling thread (no-op if interval <= 0)"""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='kb-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=False):
+        """Stop polling; with wait, also let a reload in progress finish (e.g. before a fork)"""
+        self._stop.set()
+        if wait and self._thread and self._thread.is_alive():
+            self._thread.join()
+
+    def status(self):
+        """Reload statistics for /health"""
+        return {
+            'kb_version': self.version,
+            'kb_hash': getattr(self.snapshot, 'kb_hash', None),
+            'reload_count': self.reload_count,
+            'failed_reloads': self.failed_reloads,
+            'last_load_ms': round(self.last_load_seconds * 1000, 2) if self.last_load_seconds is not None else None,
+            'last_loaded_at': self.last_loaded_at,
+            'last_checked_at': self.last_checked_at,
+            'last_error': self.last_error,
+            'watching': bool(self._thread and self._thread.is_alive()),
+            'poll_interval_seconds': self.interval
+        }
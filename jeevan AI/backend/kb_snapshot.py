@@ -0,0 +1,544 @@
+# kb_snapshot.py - Compiled binary knowledge base snapshots with memory-mapped loading
+"""
+Compile healthcare_kb.csv into a versioned binary snapshot that the backend
+and the CLI memory-map at startup instead of parsing the CSV.
+
+Usage:
+    python kb_snapshot.py healthcare_kb.csv              # writes healthcare_kb.kbsnap
+    python kb_snapshot.py healthcare_kb.csv -o kb.kbsnap
+
+Layout (little-endian, sections 8-byte aligned):
+    header      magic, format version, section count, rows, columns,
+                source CSV size / mtime / SHA-256
+    directory   (name, offset, length) for every section
+    str.*       string table: UTF-8 blob + uint32 offsets (every string interned once)
+    columns     uint32 string ids of the column names
+    cells       uint32 string id per (row, column), 0xFFFFFFFF for empty cells
+    severity    uint8 code per row (H=0, D=1, E=2, 255=other)
+    exact.*     sorted pattern keys -> symptom ids            (SymptomMatcher._exact)
+    words.*     sorted word keys -> symptom ids + counts      (SymptomMatcher._words)
+    grams.*     sorted trigram keys -> substring key ids      (SymptomMatcher._grams)
+    keys, keysym.*  substring keys and their symptom ids
+    ac.*        Aho-Corasick automaton: CSR transitions, fail links, outputs
+    meta        uint32 [max pattern length]
+
+All readers work directly on memoryviews of the mapping, so nothing is parsed
+or copied at load time and forked workers share the same page-cache pages.
+CSVTable offers the same read API on top of the stdlib csv module, so the
+serving path never needs pandas even without a snapshot. It keeps the rows
+in the same columnar form as the str.*, cells and severity sections, so a
+large knowledge base costs a few bytes per cell instead of a Python string.
+"""
+
+import argparse
+import array
+import csv
+import hashlib
+import io
+import mmap
+import os
+import struct
+import sys
+
+from matcher import SymptomMatcher, TableEntries
+
+MAGIC = b'JKBSNAP\0'
+FORMAT_VERSION = 2
+SNAPSHOT_SUFFIX = '.kbsnap'
+EMPTY_CELL = 0xFFFFFFFF
+SEVERITY_CODES = {'H': 0, 'D': 1, 'E': 2}
+UNKNOWN_SEVERITY = 255
+
+# Columns every knowledge base must provide (also checked by app.load_symptom_data)
+REQUIRED_COLUMNS = [
+    'symptom_english', 'symptom_hindi', 'symptom_tamil',
+    'severity', 'advice_english', 'advice_hindi', 'advice_tamil',
+    'first_aid_english', 'first_aid_hindi', 'first_aid_tamil'
+]
+
+HEADER = struct.Struct('<8sIIIIQQ32s')
+SECTION = struct.Struct('<16sQQ')
+ALIGNMENT = 8
+
+
+def snapshot_path(csv_path):
+    """Path of the compiled snapshot that belongs to csv_path"""
+    return os.path.splitext(csv_path)[0] + SNAPSHOT_SUFFIX
+
+
+def _u32(values=()):
+    return array.array('I', values)
+
+
+class _StringTableBuilder:
+    """Interns strings into one UTF-8 blob with an offsets array"""
+
+    def __init__(self):
+        self.ids = {}
+        self.blob = bytearray()
+        self.offsets = _u32([0])
+
+    def add(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = len(self.ids)
+            self.ids[text] = string_id
+            self.blob += text.encode('utf-8')
+            self.offsets.append(len(self.blob))
+        return string_id
+
+
+def _severity_code(value):
+    return SEVERITY_CODES.get((value or '').strip(), UNKNOWN_SEVERITY)
+
+
+def _sorted_index(strings, mapping):
+    """Serialize {key: postings} as (sorted key ids, CSR offsets, flat postings)"""
+    keys, offsets, values = _u32(), _u32([0]), []
+    for key in sorted(mapping, key=lambda k: k.encode('utf-8')):
+        keys.append(strings.add(key))
+        values.append(mapping[key])
+        offsets.append(offsets[-1] + len(mapping[key]))
+    return keys, offsets, values
+
+
+def compile_kb(csv_path, out_path=None):
+    """
+    Validate csv_path and write its binary snapshot atomically.
+    Returns the snapshot path. Raises ValueError for an invalid knowledge base.
+    """
+    out_path = out_path or snapshot_path(csv_path)
+    st = os.stat(csv_path)
+    table, raw = read_kb_csv(csv_path)
+    columns = table.columns
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {missing_columns}")
+    if table.empty:
+        raise ValueError("CSV file is empty")
+    rows = table.to_dict('records')
+
+    matcher = SymptomMatcher(rows)
+    strings = _StringTableBuilder()
+    sections = {}
+
+    sections['columns'] = _u32(strings.add(col) for col in columns)
+    cells = _u32()
+    for row in rows:
+        for col in columns:
+            value = row.get(col)
+            cells.append(strings.add(value) if value else EMPTY_CELL)
+    sections['cells'] = cells
+    sections['severity'] = bytes(_severity_code(row.get('severity')) for row in rows)
+
+    keys, offsets, values = _sorted_index(strings, matcher._exact)
+    sections['exact.keys'], sections['exact.offsets'] = keys, offsets
+    sections['exact.values'] = _u32(sid for posting in values for sid in posting)
+
+    keys, offsets, values = _sorted_index(strings, matcher._words)
+    sections['words.keys'], sections['words.offsets'] = keys, offsets
+    sections['words.values'] = _u32(sid for posting in values for sid in sorted(posting))
+    sections['words.counts'] = _u32(posting[sid] for posting in values for sid in sorted(posting))
+
+    keys, offsets, values = _sorted_index(strings, matcher._grams)
+    sections['grams.keys'], sections['grams.offsets'] = keys, offsets
+    sections['grams.values'] = _u32(key_id for posting in values for key_id in sorted(posting))
+
+    sections['keys'] = _u32(strings.add(key) for key in matcher._keys)
+    sections['keysym.offsets'] = _u32([0])
+    sections['keysym.values'] = _u32()
+    for symptom_ids in matcher._key_symptoms:
+        sections['keysym.values'].extend(symptom_ids)
+        sections['keysym.offsets'].append(len(sections['keysym.values']))
+
+    automaton = matcher._automaton
+    trans_offsets, trans_chars, trans_targets = _u32([0]), _u32(), _u32()
+    out_offsets, out_values = _u32([0]), _u32()
+    for goto, output in zip(automaton._goto, automaton._output):
+        for char in sorted(goto, key=ord):
+            trans_chars.append(ord(char))
+            trans_targets.append(goto[char])
+        trans_offsets.append(len(trans_chars))
+        out_values.extend(output)
+        out_offsets.append(len(out_values))
+    sections['ac.trans_offsets'], sections['ac.trans_chars'] = trans_offsets, trans_chars
+    sections['ac.trans_targets'], sections['ac.fail'] = trans_targets, _u32(automaton._fail)
+    sections['ac.out_offsets'], sections['ac.out_values'] = out_offsets, out_values
+    sections['meta'] = _u32([matcher._max_pattern_length])
+
+    sections['str.blob'] = bytes(strings.blob)
+    sections['str.offsets'] = strings.offsets
+
+    # Lay out header, directory and aligned sections
+    payloads = []
+    for name, data in sections.items():
+        if isinstance(data, array.array):
+            if sys.byteorder != 'little':
+                data = array.array(data.typecode, data)
+                data.byteswap()
+            data = data.tobytes()
+        payloads.append((name, data))
+
+    position = HEADER.size + SECTION.size * len(payloads)
+    directory = []
+    for name, data in payloads:
+        position += -position % ALIGNMENT
+        directory.append((name, position, len(data)))
+        position += len(data)
+
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(payloads), len(rows), len(columns),
+                            st.st_size, st.st_mtime_ns, hashlib.sha256(raw).digest()))
+        for name, offset, length in directory:
+            f.write(SECTION.pack(name.encode('ascii'), offset, length))
+        for (name, data), (_, offset, _) in zip(payloads, directory):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, out_path)  # readers of the old file keep their mapping
+    return out_path
+
+
+class KBRow:
+    """Row view over the snapshot; cells are decoded on access (None when empty)"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, column):
+        return self._table.cell(self._index, self._table.column_index(column))
+
+    def __contains__(self, column):
+        return column in self._table.column_positions
+
+    def get(self, column, default=None):
+        if column not in self._table.column_positions:
+            return default
+        return self[column]
+
+    def keys(self):
+        return list(self._table.columns)
+
+    def to_dict(self):
+        return {column: self[column] for column in self._table.columns}
+
+
+class _CountedPostings:
+    __slots__ = ('_ids', '_counts')
+
+    def __init__(self, ids, counts):
+        self._ids = ids
+        self._counts = counts
+
+    def items(self):
+        return zip(self._ids, self._counts)
+
+
+class _SortedKeyIndex:
+    """Read-only {string key: postings} mapping, binary-searched over the string table"""
+
+    def __init__(self, table, keys, offsets, values, counts=None):
+        self._table = table
+        self._keys = keys
+        self._offsets = offsets
+        self._values = values
+        self._counts = counts
+
+    def get(self, key, default=None):
+        target = key.encode('utf-8')
+        lo, hi = 0, len(self._keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate = self._table.string_bytes(self._keys[mid])
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                start, end = self._offsets[mid], self._offsets[mid + 1]
+                if self._counts is None:
+                    return self._values[start:end]
+                return _CountedPostings(self._values[start:end], self._counts[start:end])
+        return default
+
+
+class _StringList:
+    __slots__ = ('_table', '_ids')
+
+    def __init__(self, table, ids):
+        self._table = table
+        self._ids = ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        return self._table.string(self._ids[index])
+
+
+class _CSRList:
+    __slots__ = ('_offsets', '_values')
+
+    def __init__(self, offsets, values):
+        self._offsets = offsets
+        self._values = values
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return self._values[self._offsets[index]:self._offsets[index + 1]]
+
+
+class _ArrayAhoCorasick:
+    """Aho-Corasick automaton stored as CSR arrays (transitions sorted by code point)"""
+
+    def __init__(self, trans_offsets, trans_chars, trans_targets, fail, out_offsets, out_values):
+        self._trans_offsets = trans_offsets
+        self._trans_chars = trans_chars
+        self._trans_targets = trans_targets
+        self._fail = fail
+        self._out_offsets = out_offsets
+        self._out_values = out_values
+
+    def _next(self, state, code):
+        lo, hi = self._trans_offsets[state], self._trans_offsets[state + 1]
+        chars = self._trans_chars
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if chars[mid] < code:
+                lo = mid + 1
+            elif chars[mid] > code:
+                hi = mid
+            else:
+                return self._trans_targets[mid]
+        return None
+
+    def find_all(self, text):
+        """Return the set of key ids occurring anywhere in text"""
+        found = set()
+        state = 0
+        for char in text:
+            code = ord(char)
+            next_state = self._next(state, code)
+            while next_state is None and state:
+                state = self._fail[state]
+                next_state = self._next(state, code)
+            state = next_state or 0
+            found.update(self._out_values[self._out_offsets[state]:self._out_offsets[state + 1]])
+        return found
+
+
+class _TableBase:
+    """
+    Read API shared by CSVTable and KBTable. It covers the small part of the
+    DataFrame API the app uses (columns, empty, len(), iterrows(),
+    to_dict('records')), plus row(i) and column(name). Subclasses provide
+    row_count, columns, column_positions and cell(row, column_position).
+    """
+
+    def column_index(self, column):
+        try:
+            return self.column_positions[column]
+        except KeyError:
+            raise KeyError(column) from None
+
+    def __len__(self):
+        return self.row_count
+
+    @property
+    def empty(self):
+        return self.row_count == 0
+
+    def row(self, index):
+        if not 0 <= index < self.row_count:
+            raise IndexError(index)
+        return KBRow(self, index)
+
+    def column(self, column):
+        position = self.column_index(column)
+        return [self.cell(row, position) for row in range(self.row_count)]
+
+    def iterrows(self):
+        for index in range(self.row_count):
+            yield index, KBRow(self, index)
+
+    def to_dict(self, orient='records'):
+        if orient != 'records':
+            raise ValueError(f"{type(self).__name__} only supports orient='records'")
+        return [KBRow(self, index).to_dict() for index in range(self.row_count)]
+
+
+class _InternedTable(_TableBase):
+    """
+    Cells stored as in a snapshot: every distinct string once in a UTF-8
+    blob with uint32 offsets, and a uint32 string id per (row, column).
+    Subclasses set _blob, _string_offsets, _cells and column_count.
+    """
+
+    def string(self, string_id):
+        return str(self._blob[self._string_offsets[string_id]:self._string_offsets[string_id + 1]], 'utf-8')
+
+    def string_bytes(self, string_id):
+        return self._blob[self._string_offsets[string_id]:self._string_offsets[string_id + 1]].tobytes()
+
+    def cell(self, row, column_position):
+        string_id = self._cells[row * self.column_count + column_position]
+        return None if string_id == EMPTY_CELL else self.string(string_id)
+
+
+class CSVTable(_InternedTable):
+    """
+    Knowledge base parsed with the stdlib csv module (no pandas); empty cells are None.
+    Rows are interned into one UTF-8 blob, uint32 cell ids and uint8
+    severity codes while they are read, so advice repeated across rows is
+    stored once and no Python string is kept per cell.
+    """
+
+    def __init__(self, columns, records):
+        self.columns = list(columns)
+        self.column_positions = {column: i for i, column in enumerate(self.columns)}
+        self.column_count = len(self.columns)
+        severity_position = self.column_positions.get('severity')
+        strings = _StringTableBuilder()
+        cells = _u32()
+        severity = bytearray()
+        for record in records:
+            record = (list(record) + [''] * self.column_count)[:self.column_count]
+            for value in record:
+                cells.append(strings.add(value) if value else EMPTY_CELL)
+            severity.append(_severity_code(record[severity_position] if severity_position is not None else None))
+        self.row_count = len(severity)
+        self._blob = memoryview(strings.blob)
+        self._string_offsets = strings.offsets
+        self._cells = cells
+        self.severity_codes = bytes(severity)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the blob and the offset, cell and severity arrays"""
+        return (len(self._blob) + len(self.severity_codes) + self._string_offsets.itemsize * len(self._string_offsets)
+                + self._cells.itemsize * len(self._cells))
+
+
+def read_kb_csv(csv_path):
+    """Parse a knowledge base CSV into a CSVTable. Returns (table, raw file bytes)."""
+    with open(csv_path, 'rb') as f:
+        raw = f.read()
+    reader = csv.reader(io.StringIO(raw.decode('utf-8-sig')))
+    columns = next(reader, [])
+    return CSVTable(columns, (record for record in reader if record)), raw
+
+
+class KBTable(_InternedTable):
+    """Memory-mapped knowledge base snapshot (same read API as CSVTable)"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mm)
+        if len(self._buffer) < HEADER.size:
+            raise ValueError("snapshot is truncated")
+        (magic, version, section_count, self.row_count, self.column_count,
+         self.source_size, self.source_mtime_ns, digest) = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not a knowledge base snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version} (expected {FORMAT_VERSION})")
+        if sys.byteorder != 'little':
+            raise ValueError("memory-mapped snapshots require a little-endian host")
+        self.source_sha256 = digest.hex()
+
+        self._sections = {}
+        for i in range(section_count):
+            name, offset, length = SECTION.unpack_from(self._buffer, HEADER.size + i * SECTION.size)
+            name = name.rstrip(b'\0').decode('ascii')
+            if offset + length > len(self._buffer):
+                raise ValueError(f"snapshot is truncated (section {name} ends past the file)")
+            self._sections[name] = (offset, length)
+        if len(self._u32('cells')) != self.row_count * self.column_count:
+            raise ValueError("snapshot cells do not match its row and column counts")
+        if len(self._u32('str.offsets')) == 0 or self._u32('str.offsets')[-1] != len(self._section('str.blob')):
+            raise ValueError("snapshot string table is inconsistent")
+
+        self._blob = self._section('str.blob')
+        self._string_offsets = self._u32('str.offsets')
+        self._cells = self._u32('cells')
+        self.severity_codes = self._section('severity')
+        self.columns = [self.string(i) for i in self._u32('columns')]
+        self.column_positions = {column: i for i, column in enumerate(self.columns)}
+
+    def _section(self, name):
+        offset, length = self._sections[name]
+        return self._buffer[offset:offset + length]
+
+    def _u32(self, name):
+        return self._section(name).cast('I')
+
+    def build_matcher(self):
+        """SymptomMatcher running directly on the prebuilt index in the mapping"""
+        return SymptomMatcher.from_index(
+            symptoms=TableEntries(self),
+            exact=_SortedKeyIndex(self, self._u32('exact.keys'), self._u32('exact.offsets'),
+                                  self._u32('exact.values')),
+            words=_SortedKeyIndex(self, self._u32('words.keys'), self._u32('words.offsets'),
+                                  self._u32('words.values'), self._u32('words.counts')),
+            grams=_SortedKeyIndex(self, self._u32('grams.keys'), self._u32('grams.offsets'),
+                                  self._u32('grams.values')),
+            keys=_StringList(self, self._u32('keys')),
+            key_symptoms=_CSRList(self._u32('keysym.offsets'), self._u32('keysym.values')),
+            automaton=_ArrayAhoCorasick(self._u32('ac.trans_offsets'), self._u32('ac.trans_chars'),
+                                        self._u32('ac.trans_targets'), self._u32('ac.fail'),
+                                        self._u32('ac.out_offsets'), self._u32('ac.out_values')),
+            max_pattern_length=self._u32('meta')[0]
+        )
+
+
+def load_snapshot(csv_path):
+    """
+    Memory-map the compiled snapshot for csv_path.
+    Returns (KBTable, None), or (None, reason) when there is no usable snapshot
+    (missing, corrupt, or compiled from a different version of the CSV).
+    """
+    path = snapshot_path(csv_path)
+    if not os.path.exists(path):
+        return None, f"No snapshot at {path}"
+    try:
+        table = KBTable(path)
+    except (OSError, ValueError, KeyError, TypeError, IndexError, struct.error) as e:
+        return None, f"Unusable snapshot {path}: {str(e)}"
+
+    # Stale check: same size and mtime, or (after a copy/checkout) same content
+    try:
+        st = os.stat(csv_path)
+    except OSError:
+        return table, None
+    if st.st_size != table.source_size:
+        return None, f"Snapshot {path} is out of date with {csv_path}"
+    if st.st_mtime_ns != table.source_mtime_ns:
+        with open(csv_path, 'rb') as f:
+            if hashlib.sha256(f.read()).hexdigest() != table.source_sha256:
+                return None, f"Snapshot {path} is out of date with {csv_path}"
+    return table, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile healthcare_kb.csv into a memory-mappable snapshot')
+    parser.add_argument('csv_path', nargs='?', default='healthcare_kb.csv')
+    parser.add_argument('-o', '--output', help='snapshot path (default: <csv name>.kbsnap)')
+    args = parser.parse_args()
+    try:
+        path = compile_kb(args.csv_path, args.output)
+    except (OSError, ValueError) as e:
+        print(f"Error compiling knowledge base: {e}")
+        sys.exit(1)
+    table = KBTable(path)
+    print(f"Compiled {len(table)} symptoms into {path} ({os.path.getsize(path):,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,621 @@
+# matcher.py - Precompiled symptom matching engine for the healthcare backend
+import functools
+import heapq
+import unicodedata
+from collections import defaultdict, deque
+
+from semantic import SemanticIndex
+from spelling import SpellingIndex, romanize
+
+LANGUAGES = ('english', 'hindi', 'tamil')
+
+# Scoring rules (kept identical to the original diagnose() loop)
+EXACT_MATCH_SCORE = 100        # pattern == input
+PATTERN_IN_INPUT_WEIGHT = 3    # pattern is a substring of the input
+INPUT_IN_PATTERN_WEIGHT = 2    # input is a substring of the pattern
+WORD_MATCH_WEIGHT = 1          # input word is a word of the pattern
+MIN_SUBSTRING_LENGTH = 4       # substring rules only apply above 3 characters
+MIN_WORD_LENGTH = 3            # word rule only applies above 2 characters
+MATCH_THRESHOLD = 90           # minimum score for a confident diagnosis
+
+SPELLING_EDIT_PENALTY = 5      # points off an exact match per edit of a misspelled symptom name
+MAX_PHRASE_WORDS = 3           # longest run of input words looked up as one misspelled name
+SEMANTIC_MAX_POINTS = MATCH_THRESHOLD - 1  # n-gram similarity ranks candidates, it never confirms a diagnosis
+SEMANTIC_CANDIDATES = 10       # most similar symptoms scored for an unmatched input
+
+DEFAULT_CONFIDENCE = 85
+PATTERN_SEPARATOR = '|'
+GRAM_SIZE = 3
+
+# Entries of a table-backed matcher (TableEntries) kept built at a time
+ENTRY_CACHE_SIZE = 4096
+
+# Severity order for multi-symptom answers: emergency > doctor visit > home care
+SEVERITY_RANK = {'H': 0, 'D': 1, 'E': 2}
+
+
+def normalize_text(text):
+    """Canonical form of symptom text: Unicode NFC, case folded, whitespace collapsed"""
+    return ' '.join(unicodedata.normalize('NFC', text).casefold().split())
+
+
+def normalize_with_offsets(text):
+    """
+    normalize_text() that also maps every output character back to its
+    position in the NFC form of text. Returns (normalized, offsets, nfc_text).
+    """
+    nfc_text = unicodedata.normalize('NFC', text)
+    chars = []
+    offsets = []
+    pending_space = None
+    for position, char in enumerate(nfc_text):
+        if char.isspace():
+            if chars and pending_space is None:
+                pending_space = position
+            continue
+        if pending_space is not None:
+            chars.append(' ')
+            offsets.append(pending_space)
+            pending_space = None
+        for folded in char.casefold():
+            chars.append(folded)
+            offsets.append(position)
+    return ''.join(chars), offsets, nfc_text
+
+
+def _is_word_char(char):
+    """Letters, combining marks (Devanagari/Tamil vowel signs) and digits"""
+    return unicodedata.category(char)[0] in 'LMN'
+
+
+def _cell(row, column):
+    """Return a CSV cell as a stripped string, treating missing/NaN as empty"""
+    value = row.get(column)
+    if value is None or value != value:  # NaN from pandas
+        return ''
+    return str(value).strip()
+
+
+def semantic_points(similarity):
+    """Score of a cosine similarity: proportional, SEMANTIC_MAX_POINTS at identical vectors"""
+    return round(SEMANTIC_MAX_POINTS * min(similarity, 1.0))
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring automaton.
+    Finds every key occurring in a text with a single left-to-right scan.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for key_id, key in enumerate(self.keys):
+            state = 0
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = self._output[state] + (key_id,)
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text):
+        """Yield (end_position, key_id) for every key occurrence in text"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for key_id in output[state]:
+                yield position + 1, key_id
+
+    def find_all(self, text):
+        """Return the set of key ids occurring anywhere in text"""
+        return {key_id for _, key_id in self.iter_matches(text)}
+
+
+class TableEntries:
+    """
+    diagnose() result objects of a table's rows (CSVTable or KBTable), built
+    from the row view on access. Only the ENTRY_CACHE_SIZE most recently
+    used are kept, so a large knowledge base never holds a dict per row.
+    """
+
+    def __init__(self, table, cache_size=ENTRY_CACHE_SIZE):
+        self._table = table
+        self._entry = functools.lru_cache(maxsize=cache_size)(self._build)
+
+    def _build(self, index):
+        return SymptomMatcher.build_entry(self._table.row(index))
+
+    def __len__(self):
+        return len(self._table)
+
+    def __getitem__(self, index):
+        return self._entry(index)
+
+    def __iter__(self):
+        for index in range(len(self._table)):
+            yield self._entry(index)
+
+
+class SymptomMatcher:
+    """
+    Symptom matcher built once from the knowledge base rows.
+
+    Each symptom is matched through its patterns (the 'patterns' column,
+    '|' separated, or the three symptom names when that column is empty).
+    Scoring follows the original rules:
+      - exact pattern match                 -> +100
+      - pattern found inside the input      -> +3 per pattern character
+      - input found inside a pattern        -> +2 per input character
+      - input word equal to a pattern word  -> +1 per word character
+    Only symptoms that share a pattern, substring or word with the input
+    are ever touched, so a request costs roughly O(len(input)).
+
+    When no symptom reaches MATCH_THRESHOLD this way, the input is looked up
+    in a spelling index of every name and pattern, as written and
+    romanized, allowing up to two typos, fewer in words shorter than nine
+    letters and none below six (see spelling.py):
+      - whole input is a misspelled name      -> 100 - 5 per edit
+      - a run of input words is one           -> +3 per name character
+
+    When even that finds no confident match, top_matches() scores the
+    SEMANTIC_CANDIDATES symptoms whose texts are most similar by character
+    n-grams (see semantic.py) in proportion to their similarity, up to
+    SEMANTIC_MAX_POINTS. That ranks candidates but never reaches
+    MATCH_THRESHOLD: an n-gram overlap ("cold drink", "feet") is not
+    evidence enough for a diagnosis, so best_match() never pays for it.
+
+    entries, when given, already holds the result objects of rows (e.g. a
+    TableEntries) and the ones built while indexing are not kept.
+    """
+
+    def __init__(self, rows, entries=None):
+        self.symptoms = [] if entries is None else entries
+        self._exact = defaultdict(list)   # pattern -> [symptom ids]
+        self._words = {}                  # word -> {symptom id: pattern count}
+        self._grams = defaultdict(set)    # character trigram -> {substring key ids}
+        substring_keys = {}               # pattern -> key id
+        self._key_symptoms = []           # key id -> [symptom ids]
+        self._max_pattern_length = 0
+
+        for symptom_id, row in enumerate(rows):
+            entry = self.build_entry(row)
+            if entries is None:
+                self.symptoms.append(entry)
+
+            for pattern in entry['patterns']:
+                pattern_lower = normalize_text(pattern)
+                if not pattern_lower:
+                    continue
+                self._exact[pattern_lower].append(symptom_id)
+
+                if len(pattern_lower) >= MIN_SUBSTRING_LENGTH:
+                    key_id = substring_keys.get(pattern_lower)
+                    if key_id is None:
+                        key_id = len(self._key_symptoms)
+                        substring_keys[pattern_lower] = key_id
+                        self._key_symptoms.append([])
+                        for gram in self._iter_grams(pattern_lower):
+                            self._grams[gram].add(key_id)
+                    self._key_symptoms[key_id].append(symptom_id)
+                    self._max_pattern_length = max(self._max_pattern_length, len(pattern_lower))
+
+                # A word scores once per pattern, however often the pattern repeats it
+                for word in set(pattern_lower.split()):
+                    counts = self._words.setdefault(word, {})
+                    counts[symptom_id] = counts.get(symptom_id, 0) + 1
+
+        self._keys = list(substring_keys)
+        self._automaton = AhoCorasick(self._keys)
+        self._mention_index = None
+        self._spelling_index = None
+        self._semantic_index = None
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Build a matcher from the table returned by load_symptom_data()"""
+        if df is None:
+            return cls([])
+        if hasattr(df, 'row'):  # CSVTable or KBTable: index the row views, build entries on access
+            return cls((df.row(index) for index in range(len(df))), entries=TableEntries(df))
+        return cls(df.to_dict('records'))
+
+    @classmethod
+    def from_index(cls, symptoms, exact, words, grams, keys, key_symptoms, automaton, max_pattern_length):
+        """
+        Wrap prebuilt index structures without rebuilding them, e.g. the
+        memory-mapped views of a compiled KB snapshot (see kb_snapshot.py).
+        """
+        matcher = cls.__new__(cls)
+        matcher.symptoms = symptoms
+        matcher._exact = exact
+        matcher._words = words
+        matcher._grams = grams
+        matcher._keys = keys
+        matcher._key_symptoms = key_symptoms
+        matcher._automaton = automaton
+        matcher._max_pattern_length = max_pattern_length
+        matcher._mention_index = None
+        matcher._spelling_index = None
+        matcher._semantic_index = None
+        return matcher
+
+    @staticmethod
+    def build_entry(row):
+        """Convert one knowledge base row into the diagnose() result object"""
+        patterns = [p.strip() for p in _cell(row, 'patterns').split(PATTERN_SEPARATOR) if p.strip()]
+        if not patterns:
+            patterns = [_cell(row, f'symptom_{lang}') for lang in LANGUAGES if _cell(row, f'symptom_{lang}')]
+
+        confidence = _cell(row, 'confidence')
+        try:
+            confidence = int(float(confidence))
+        except ValueError:
+            confidence = DEFAULT_CONFIDENCE
+
+        return {
+            'patterns': patterns,
+            'name': {lang: _cell(row, f'symptom_{lang}') for lang in LANGUAGES},
+            'severity': _cell(row, 'severity') or 'H',
+            'confidence': confidence,
+            'advice': {lang: _cell(row, f'advice_{lang}') for lang in LANGUAGES},
+            'first_aid': {lang: _cell(row, f'first_aid_{lang}') for lang in LANGUAGES}
+        }
+
+    @staticmethod
+    def _iter_grams(text):
+        for start in range(len(text) - GRAM_SIZE + 1):
+            yield text[start:start + GRAM_SIZE]
+
+    def __len__(self):
+        return len(self.symptoms)
+
+    def _contributions(self, symptom_input):
+        """
+        Yield (symptom id, points) for every rule that fires on an already
+        lower-cased, stripped input. Only symptoms sharing a pattern,
+        substring or word with the input are ever produced.
+        """
+        if not symptom_input:
+            return
+
+        # Exact matches
+        for symptom_id in self._exact.get(symptom_input, ()):
+            yield symptom_id, EXACT_MATCH_SCORE
+
+        # Patterns contained in the input (one automaton pass)
+        for key_id in self._automaton.find_all(symptom_input):
+            key = self._keys[key_id]
+            if key == symptom_input:
+                continue
+            for symptom_id in self._key_symptoms[key_id]:
+                yield symptom_id, len(key) * PATTERN_IN_INPUT_WEIGHT
+
+        # Input contained in a pattern (candidates from the rarest trigram)
+        input_length = len(symptom_input)
+        if MIN_SUBSTRING_LENGTH <= input_length <= self._max_pattern_length:
+            candidates = None
+            for gram in self._iter_grams(symptom_input):
+                posting = self._grams.get(gram)
+                if not posting:
+                    candidates = None
+                    break
+                if candidates is None or len(posting) < len(candidates):
+                    candidates = posting
+            for key_id in candidates or ():
+                key = self._keys[key_id]
+                if key != symptom_input and symptom_input in key:
+                    for symptom_id in self._key_symptoms[key_id]:
+                        yield symptom_id, input_length * INPUT_IN_PATTERN_WEIGHT
+
+        # Word-level matches
+        for word in symptom_input.split():
+            if len(word) >= MIN_WORD_LENGTH:
+                for symptom_id, count in self._words.get(word, {}).items():
+                    yield symptom_id, len(word) * WORD_MATCH_WEIGHT * count
+
+    def score(self, symptom_input):
+        """
+        Score every candidate symptom for an already lower-cased, stripped input.
+        Returns {symptom id: score} containing only symptoms with a non-zero score.
+        Spelling correction only runs while no rule reaches MATCH_THRESHOLD.
+        """
+        scores = defaultdict(int)
+        for symptom_id, points in self._contributions(symptom_input):
+            scores[symptom_id] += points
+        self._correct_spelling(scores, symptom_input)
+        return scores
+
+    def _correct_spelling(self, scores, symptom_input):
+        """Merge spelling contributions into rule scores (a defaultdict) where none reaches MATCH_THRESHOLD"""
+        if max(scores.values(), default=0) < MATCH_THRESHOLD:
+            self._merge(scores, self._spelling_contributions(symptom_input))
+
+    @staticmethod
+    def _merge(scores, contributions):
+        """Raise scores to each (symptom id, points) contribution that beats them"""
+        for symptom_id, points in contributions:
+            if points > scores[symptom_id]:
+                scores[symptom_id] = points
+
+    def _build_spelling_index(self):
+        """Spelling index over every name and pattern, as written and romanized -> symptom ids, built on first use"""
+        key_symptoms = {}
+        for symptom_id, entry in enumerate(self.symptoms):
+            texts = list(entry['patterns']) + [name for name in entry['name'].values() if name]
+            for text in texts:
+                text = normalize_text(text)
+                for key in {text.replace(' ', ''), romanize(text).replace(' ', '')}:
+                    if key:
+                        ids = key_symptoms.setdefault(key, [])
+                        if symptom_id not in ids:
+                            ids.append(symptom_id)
+        keys = list(key_symptoms)
+        self._spelling_index = (SpellingIndex(keys), [key_symptoms[key] for key in keys])
+        return self._spelling_index
+
+    def _spelling_contributions(self, symptom_input):
+        """
+        Yield (symptom id, points) for misspelled names in an already
+        normalized input: the whole input, or else each longest run of up to
+        MAX_PHRASE_WORDS words, compared with spaces removed ("talai vali"
+        finds தலைவலி through its romanization "talaivali").
+        """
+        words = symptom_input.split()
+        if not words:
+            return
+        index, key_symptoms = self._spelling_index or self._build_spelling_index()
+
+        distance, key_ids = index.lookup(''.join(words))
+        if key_ids:
+            for key_id in key_ids:
+                for symptom_id in key_symptoms[key_id]:
+                    yield symptom_id, EXACT_MATCH_SCORE - SPELLING_EDIT_PENALTY * distance
+            return
+
+        position = 0
+        while position < len(words):
+            for length in range(min(MAX_PHRASE_WORDS, len(words) - position), 0, -1):
+                phrase = ''.join(words[position:position + length])
+                _, key_ids = index.lookup(phrase)
+                if key_ids:
+                    for key_id in key_ids:
+                        for symptom_id in key_symptoms[key_id]:
+                            yield symptom_id, len(index.keys[key_id]) * PATTERN_IN_INPUT_WEIGHT
+                    position += length
+                    break
+            else:
+                position += 1
+
+    def spelling_match(self, symptom_input):
+        """
+        (symptom id, score) of the best misspelled-name match for an already
+        normalized input, with best_match()'s tie-break, or (None, 0).
+        """
+        scores = defaultdict(int)
+        for symptom_id, points in self._spelling_contributions(symptom_input):
+            scores[symptom_id] = max(scores[symptom_id], points)
+        if not scores:
+            return None, 0
+        symptom_id = min(scores, key=lambda sid: (-scores[sid], sid))
+        return symptom_id, scores[symptom_id]
+
+    def build_semantic_index(self):
+        """
+        Character n-gram vectors of every name and pattern, as written and
+        romanized. Built on first use unless called earlier, e.g. at KB load.
+        """
+        texts_by_symptom = []
+        for entry in self.symptoms:
+            texts = {}  # ordered set
+            for text in list(entry['patterns']) + [name for name in entry['name'].values() if name]:
+                text = normalize_text(text)
+                for variant in (text, romanize(text)):
+                    if variant:
+                        texts[variant] = None
+            texts_by_symptom.append(list(texts))
+        self._semantic_index = SemanticIndex(texts_by_symptom)
+        return self._semantic_index
+
+    def build_indexes(self):
+        """
+        Build every index that is otherwise built on first use (spelling,
+        mentions, similarity vectors), so that no request pays for one and
+        a server can build them before it forks its workers.
+        """
+        self._build_spelling_index()
+        self._build_mention_index()
+        self.build_semantic_index()
+
+    def semantic_candidates(self, symptom_inputs):
+        """
+        For each already normalized input, the SEMANTIC_CANDIDATES most
+        similar symptoms as (symptom id, points), all inputs scored with one
+        matrix multiply.
+        """
+        index = self._semantic_index or self.build_semantic_index()
+        results = []
+        for candidates in index.top_batch(list(symptom_inputs), SEMANTIC_CANDIDATES):
+            results.append([(symptom_id, semantic_points(similarity)) for symptom_id, similarity in candidates
+                            if similarity > 0])
+        return results
+
+    def best_match_id(self, symptom_input):
+        """
+        Return (symptom id, score) for the highest scoring symptom.
+        Ties go to the symptom listed first in the knowledge base.
+        Returns (None, 0) when nothing scores.
+        """
+        scores = self.score(symptom_input)
+        if not scores:
+            return None, 0
+        symptom_id = min(scores, key=lambda sid: (-scores[sid], sid))
+        return symptom_id, scores[symptom_id]
+
+    def top_matches(self, symptom_input, k):
+        """
+        Return up to k (symptom id, score) pairs, best first, with the same
+        tie-break as best_match(). Only symptoms with a non-zero score are
+        candidates, and a k-sized heap ranks them without sorting them all.
+        Semantic similarity adds candidates while no symptom reaches
+        MATCH_THRESHOLD.
+        """
+        scores = self.score(symptom_input)
+        if max(scores.values(), default=0) < MATCH_THRESHOLD:
+            self._merge(scores, self.semantic_candidates([symptom_input])[0])
+        return [(symptom_id, scores[symptom_id])
+                for symptom_id in heapq.nsmallest(k, scores, key=lambda sid: (-scores[sid], sid))]
+
+    def _build_mention_index(self):
+        """Automaton over every pattern (short ones included) -> symptom ids, built on first use"""
+        pattern_symptoms = {}
+        for symptom_id in range(len(self.symptoms)):
+            for pattern in self.symptoms[symptom_id]['patterns']:
+                pattern = normalize_text(pattern)
+                if pattern:
+                    ids = pattern_symptoms.setdefault(pattern, [])
+                    if symptom_id not in ids:
+                        ids.append(symptom_id)
+        patterns = list(pattern_symptoms)
+        self._mention_index = (AhoCorasick(patterns), patterns, [pattern_symptoms[p] for p in patterns])
+        return self._mention_index
+
+    def find_mentions(self, text):
+        """
+        Find every symptom mentioned in free text in a single automaton pass.
+
+        At each position the longest pattern wins and spans never overlap
+        ("high fever" is one mention, not "high fever" plus "fever"). A mention
+        must start at a word boundary; patterns shorter than MIN_SUBSTRING_LENGTH
+        must also end at one. Runs in O(len(text) + matches) however many
+        patterns the knowledge base has.
+
+        Returns (mentions, nfc_text): mentions is a list of
+        (symptom id, start, end) in text order, with offsets into nfc_text
+        (the NFC form of text, i.e. text itself for ordinary input).
+        """
+        automaton, patterns, pattern_symptoms = self._mention_index or self._build_mention_index()
+        normalized, offsets, nfc_text = normalize_with_offsets(text)
+        length = len(normalized)
+
+        # Longest boundary-respecting match starting at each position
+        best_end = [0] * (length + 1)
+        best_pattern = [0] * (length + 1)
+        for end, pattern_id in automaton.iter_matches(normalized):
+            pattern_length = len(patterns[pattern_id])
+            start = end - pattern_length
+            if start > 0 and _is_word_char(normalized[start - 1]):
+                continue
+            if (pattern_length < MIN_SUBSTRING_LENGTH and end < length
+                    and _is_word_char(normalized[end])):
+                continue
+            if end > best_end[start]:
+                best_end[start] = end
+                best_pattern[start] = pattern_id
+
+        # Leftmost-longest, non-overlapping
+        mentions = []
+        position = 0
+        while position < length:
+            end = best_end[position]
+            if end:
+                for symptom_id in pattern_symptoms[best_pattern[position]]:
+                    mentions.append((symptom_id, offsets[position], offsets[end - 1] + 1))
+                position = end
+            else:
+                position += 1
+        return mentions, nfc_text
+
+    def best_match(self, symptom_input):
+        """Return (symptom entry, score) for the highest scoring symptom, or (None, 0)"""
+        symptom_id, score = self.best_match_id(symptom_input)
+        if symptom_id is None:
+            return None, 0
+        return self.symptoms[symptom_id], score
+
+    def best_match_batch(self, symptom_inputs):
+        """
+        Vectorized best_match() over many inputs.
+
+        Rule contributions for all distinct inputs are gathered into flat
+        NumPy arrays and reduced in one pass: scores are summed per
+        (input, symptom) pair, then the winner per input is picked with the
+        same tie-break as best_match(). Repeated inputs are scored once.
+        Returns a list of (symptom entry, score) in input order.
+        """
+        import numpy as np  # only the batch path needs NumPy
+
+        unique_inputs = {}
+        positions = [unique_inputs.setdefault(text, len(unique_inputs)) for text in symptom_inputs]
+
+        rows, symptom_ids, points = [], [], []
+        for row, text in enumerate(unique_inputs):
+            for symptom_id, value in self._contributions(text):
+                rows.append(row)
+                symptom_ids.append(symptom_id)
+                points.append(value)
+
+        best = [(None, 0)] * len(unique_inputs)
+        weak_scores = {}  # input row -> {symptom id: rule score} of the inputs no rule matched confidently
+        if rows:
+            rows = np.asarray(rows, dtype=np.int64)
+            symptom_ids = np.asarray(symptom_ids, dtype=np.int64)
+            points = np.asarray(points, dtype=np.int64)
+
+            # Sum points per (input, symptom) pair
+            pair_keys = rows * len(self.symptoms) + symptom_ids
+            unique_keys, inverse = np.unique(pair_keys, return_inverse=True)
+            totals = np.bincount(inverse, weights=points).astype(np.int64)
+            pair_rows = unique_keys // len(self.symptoms)
+            pair_symptoms = unique_keys % len(self.symptoms)
+
+            # Highest score first, then lowest symptom id, grouped by input
+            order = np.lexsort((pair_symptoms, -totals, pair_rows))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = pair_rows[order][1:] != pair_rows[order][:-1]
+            winners = order[first]
+
+            for row, symptom_id, total in zip(pair_rows[winners].tolist(),
+                                              pair_symptoms[winners].tolist(),
+                                              totals[winners].tolist()):
+                best[row] = (self.symptoms[symptom_id], total)
+
+            # Keep the summed scores of the inputs below MATCH_THRESHOLD for the stages below
+            weak = np.isin(pair_rows, [row for row, (_, total) in enumerate(best) if total < MATCH_THRESHOLD])
+            for row, symptom_id, total in zip(pair_rows[weak].tolist(), pair_symptoms[weak].tolist(),
+                                              totals[weak].tolist()):
+                weak_scores.setdefault(row, {})[symptom_id] = total
+
+        # Spelling correction for the inputs no rule matched confidently, as in score()
+        for row, text in enumerate(unique_inputs):
+            if best[row][1] < MATCH_THRESHOLD:
+                scores = defaultdict(int, weak_scores.get(row, ()))
+                self._correct_spelling(scores, text)
+                if scores:
+                    symptom_id = min(scores, key=lambda sid: (-scores[sid], sid))
+                    best[row] = (self.symptoms[symptom_id], scores[symptom_id])
+
+        return [best[position] for position in positions]
@@ -0,0 +1,196 @@
+# metrics.py - Low-overhead Prometheus metrics for the healthcare backend
+import bisect
+import itertools
+import threading
+import time
+import weakref
+
+# Latency buckets in seconds (10us .. 1s)
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class StageTimer:
+    """Records the duration of consecutive request stages (parse, normalize, ...)"""
+
+    __slots__ = ('stages', '_last')
+
+    def __init__(self):
+        self.stages = []
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+
+class _ShardOwner:
+    """Thread-local marker of a thread's shard: it is dropped, and finalized, when the thread exits"""
+
+    __slots__ = ('__weakref__',)
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms kept in per-thread shards.
+
+    Recording only touches the calling thread's own dicts (no locks), so the
+    hot path costs a couple of dict operations. Shards are merged when
+    /metrics is scraped. When a thread exits, its shard is folded into one
+    shard of retired totals, so the number of shards follows the number of
+    live threads, not every thread the server ever started.
+    """
+
+    def __init__(self):
+        self._families = {}  # name -> (type, help, buckets)
+        self._local = threading.local()
+        self._shards = {}  # token -> (counters, histograms) of a live thread
+        self._retired = ({}, {})  # totals of the threads that exited
+        self._tokens = itertools.count()
+        self._shards_lock = threading.Lock()
+
+    def counter(self, name, help_text):
+        self._families[name] = ('counter', help_text, None)
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self._families[name] = ('histogram', help_text, tuple(buckets))
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = ({}, {})
+            with self._shards_lock:  # once per thread
+                token = next(self._tokens)
+                self._shards[token] = shard
+            # Thread-local values are released when their thread exits
+            self._local.owner = _ShardOwner()
+            weakref.finalize(self._local.owner, self._retire, token)
+        return shard
+
+    def _retire(self, token):
+        """Fold the shard of an exited thread into the retired totals"""
+        with self._shards_lock:
+            counters, histograms = self._shards.pop(token)
+            retired_counters, retired_histograms = self._retired
+            for key, value in counters.items():
+                retired_counters[key] = retired_counters.get(key, 0) + value
+            for key, (buckets, total, count) in histograms.items():
+                target = retired_histograms.get(key)
+                if target is None:
+                    target = retired_histograms[key] = [[0] * len(buckets), 0.0, 0]
+                for i, bucket_count in enumerate(buckets):
+                    target[0][i] += bucket_count
+                target[1] += total
+                target[2] += count
+
+    def inc(self, name, labels=(), value=1):
+        counters = self._shard()[0]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        histograms = self._shard()[1]
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            buckets = self._families[name][2]
+            histogram = histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(self._families[name][2], value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def observe_stages(self, name, stages, labels=()):
+        """Observe every (stage, seconds) pair of a StageTimer"""
+        for stage, seconds in stages:
+            self.observe(name, seconds, labels + (('stage', stage),))
+
+    def merged_counters(self, name=None):
+        """{(name, labels): value} summed over all thread shards"""
+        merged = {}
+        # Held while merging, so a shard is never counted both live and retired
+        with self._shards_lock:
+            for counters, _ in list(self._shards.values()) + [self._retired]:
+                for key, value in list(counters.items()):
+                    if name is None or key[0] == name:
+                        merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def _merged_histograms(self):
+        merged = {}
+        with self._shards_lock:
+            for _, histograms in list(self._shards.values()) + [self._retired]:
+                for key, (buckets, total, count) in list(histograms.items()):
+                    target = merged.get(key)
+                    if target is None:
+                        target = merged[key] = [[0] * len(buckets), 0.0, 0]
+                    for i, bucket_count in enumerate(list(buckets)):
+                        target[0][i] += bucket_count
+                    target[1] += total
+                    target[2] += count
+        return merged
+
+    def render(self, gauges=(), counters=()):
+        """
+        Prometheus text exposition of all metrics.
+        gauges / counters: iterables of (name, help, [(labels, value), ...]) computed at
+        scrape time (e.g. statistics another component already keeps).
+        """
+        lines = []
+        counter_values = self.merged_counters()
+        histograms = self._merged_histograms()
+
+        for name, (kind, help_text, bounds) in sorted(self._families.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counter_values.items()):
+                    if metric == name:
+                        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            else:
+                for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(bounds + (float('inf'),), buckets):
+                        cumulative += bucket_count
+                        le = _format_labels(labels, (('le', _format_value(float(bound))),))
+                        lines.append(f'{name}_bucket{le} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        for kind, families in (('counter', counters), ('gauge', gauges)):
+            for name, help_text, samples in families:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def server_timing(stages, total=None):
+    """Format (stage, seconds) pairs as a Server-Timing header value (milliseconds)"""
+    parts = [f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in stages]
+    if total is not None:
+        parts.append(f'total;dur={total * 1000:.3f}')
+    return ', '.join(parts)
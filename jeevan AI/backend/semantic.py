@@ -0,0 +1,202 @@
+# semantic.py - Offline similarity matcher over character n-gram vectors
+#
+# Descriptions such as "my head is hurting badly" or "burning in chest" match
+# no pattern, but they share character n-grams ("hea", "head", "ches") with
+# a symptom's names. Every name and pattern of every symptom, as written and
+# romanized, becomes one row of a contiguous matrix of signed-hashed,
+# L2-normalized TF-IDF vectors, the rows of a symptom next to each other.
+# A query, or a whole batch of them, is scored with one matrix multiply, and
+# np.maximum.reduceat keeps the best row of each symptom. The matrix is
+# stored column by column, so a single query only reads the few dozen
+# columns its n-grams hash to, and large knowledge bases store it as int8,
+# a quarter of the float32 size.
+import os
+import zlib
+from array import array
+
+NGRAM_SIZES = (3, 4)
+# Hashed feature columns: 512 keeps unrelated texts below 0.3 similarity on
+# the real KB, where 256 already lets collisions through
+DIMENSIONS = int(os.environ.get('SEMANTIC_DIMENSIONS', '512'))
+# 'auto' stores int8 from QUANTIZE_MIN_ROWS rows on; 'on' and 'off' force it
+QUANTIZE = os.environ.get('SEMANTIC_QUANTIZE', 'auto')
+QUANTIZE_MIN_ROWS = 20000
+# Rows multiplied at a time, which bounds the float32 copy of an int8 block
+BLOCK_ROWS = 16384
+# Queries multiplied at a time, which bounds the rows x queries score block
+BLOCK_QUERIES = 64
+
+
+def char_ngrams(text):
+    """Character n-grams of each word of an already normalized text, words padded with spaces"""
+    grams = []
+    for word in text.split():
+        word = f' {word} '
+        for size in NGRAM_SIZES:
+            grams.extend(word[start:start + size] for start in range(len(word) - size + 1))
+    return grams
+
+
+class SemanticIndex:
+    """
+    Hashed character n-gram TF-IDF vectors of the texts of every symptom.
+    texts_by_symptom[symptom id] lists that symptom's normalized texts.
+    top() and top_batch() return the symptoms most similar (cosine) to queries.
+    """
+
+    def __init__(self, texts_by_symptom, dimensions=DIMENSIONS, quantize=QUANTIZE):
+        import numpy as np  # loaded with the first index, not when the app starts
+
+        self.dimensions = dimensions
+        self._features_of = {}  # n-gram -> hashed feature
+
+        features = array('i')
+        row_ends = array('q')
+        row_starts = []
+        word_features = {}
+        for texts in texts_by_symptom:
+            row_starts.append(len(row_ends))
+            # A symptom without texts keeps an empty row, so every symptom owns at least one
+            for text in texts or ('',):
+                features.extend(self._features(text, word_features))
+                row_ends.append(len(features))
+        del word_features
+        self.row_starts = np.asarray(row_starts, dtype=np.int64)
+        features = np.frombuffer(features, dtype=np.int32) if features else np.zeros(0, dtype=np.int32)
+        row_ends = np.frombuffer(row_ends, dtype=np.int64) if row_ends else np.zeros(0, dtype=np.int64)
+        rows = len(row_ends)
+
+        # Two passes over blocks of BLOCK_ROWS rows, so only one block's pairs
+        # and one float32 block exist at a time: document frequencies for the
+        # IDF first, then the TF-IDF rows (sublinear tf).
+        blocks = [(start, min(start + BLOCK_ROWS, rows)) for start in range(0, rows, BLOCK_ROWS)]
+        document_frequency = np.zeros(2 * dimensions, dtype=np.int64)
+        for start, stop in blocks:
+            pair_rows, pair_features, _ = self._block_pairs(features, row_ends, start, stop)
+            document_frequency += np.bincount(pair_features, minlength=2 * dimensions)
+        self.idf = (np.log((1 + rows) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        # Signed hashing: n-grams sharing a column add with a random sign, so
+        # collisions cancel out on average instead of adding up
+        self.quantized = quantize == 'on' or (quantize == 'auto' and rows >= QUANTIZE_MIN_ROWS)
+        self.matrix = np.zeros((rows, dimensions), dtype=np.int8 if self.quantized else np.float32, order='F')
+        self.row_scale = np.ones(rows, dtype=np.float32) if self.quantized else None
+        for start, stop in blocks:
+            pair_rows, pair_features, counts = self._block_pairs(features, row_ends, start, stop)
+            weights = (1 + np.log(counts)) * self.idf[pair_features]
+            cells = pair_rows * dimensions + pair_features // 2
+            dense = np.bincount(cells, weights=np.where(pair_features % 2, -weights, weights),
+                                minlength=(stop - start) * dimensions).reshape(stop - start, dimensions)
+            norms = np.linalg.norm(dense, axis=1)
+            norms[norms == 0] = 1
+            dense /= norms[:, None]
+            if self.quantized:
+                # Per-row scale: each row's largest weight becomes 127
+                row_max = np.abs(dense).max(axis=1)
+                row_max[row_max == 0] = 1
+                self.row_scale[start:stop] = row_max / 127
+                dense = np.round(dense / (row_max / 127)[:, None])
+            self.matrix[start:stop] = dense
+
+    def _block_pairs(self, features, row_ends, start, stop):
+        """(row within the block, feature, count) of each distinct feature of rows start..stop"""
+        import numpy as np
+
+        first = row_ends[start - 1] if start else 0
+        lengths = np.diff(row_ends[start:stop], prepend=first)
+        row_ids = np.repeat(np.arange(stop - start, dtype=np.int64), lengths)
+        features_per_row = 2 * self.dimensions
+        pairs, counts = np.unique(row_ids * features_per_row + features[first:row_ends[stop - 1]], return_counts=True)
+        return pairs // features_per_row, pairs % features_per_row, counts
+
+    def __len__(self):
+        return len(self.row_starts)
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes
+
+    def _features(self, text, word_features=None):
+        """
+        Hashed n-gram features of a text: column * 2 + sign bit. While
+        building, word_features caches them per word, as words repeat far
+        more than texts.
+        """
+        if word_features is None:
+            return self._gram_features(text)
+        features = []
+        for word in text.split():
+            cached = word_features.get(word)
+            if cached is None:
+                cached = word_features[word] = self._gram_features(word)
+            features.extend(cached)
+        return features
+
+    def _gram_features(self, text):
+        features = []
+        for gram in char_ngrams(text):
+            feature = self._features_of.get(gram)
+            if feature is None:
+                digest = zlib.crc32(gram.encode('utf-8'))
+                feature = digest % self.dimensions * 2 + (digest >> 31)
+                self._features_of[gram] = feature
+            features.append(feature)
+        return features
+
+    def vectors(self, texts):
+        """(len(texts), dimensions) float32 TF-IDF query vectors, L2-normalized"""
+        import numpy as np
+
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for position, text in enumerate(texts):
+            features = self._features(text)
+            if features:
+                counts = np.bincount(features, minlength=2 * self.dimensions).astype(np.float32)
+                present = counts > 0
+                counts[present] = (1 + np.log(counts[present])) * self.idf[present]
+                vector = counts[0::2] - counts[1::2]
+                norm = np.linalg.norm(vector)
+                if norm:
+                    vectors[position] = vector / norm
+        return vectors
+
+    def similarities(self, texts):
+        """(len(texts), symptoms) float32 cosine similarity of each text to each symptom's closest row"""
+        import numpy as np
+
+        queries = self.vectors(texts)
+        result = np.empty((len(texts), len(self.row_starts)), dtype=np.float32)
+        row_scores = np.empty((self.matrix.shape[0], min(len(texts), BLOCK_QUERIES)), dtype=np.float32)
+        for first in range(0, len(texts), BLOCK_QUERIES):
+            block_queries = queries[first:first + BLOCK_QUERIES]
+            # A few queries only use a few dozen columns: multiply just those
+            columns = np.flatnonzero(block_queries.any(axis=0))
+            if 2 * len(columns) > self.dimensions:
+                columns = slice(None)
+            block_queries = block_queries[:, columns].T
+            scores = row_scores[:, :block_queries.shape[1]]
+            for start in range(0, self.matrix.shape[0], BLOCK_ROWS):
+                np.matmul(self.matrix[start:start + BLOCK_ROWS, columns], block_queries,
+                          out=scores[start:start + BLOCK_ROWS])
+            if self.quantized:
+                scores *= self.row_scale[:, None]
+            result[first:first + block_queries.shape[1]] = np.maximum.reduceat(scores, self.row_starts, axis=0).T
+        return result
+
+    def top_batch(self, texts, k):
+        """For each text, up to k (symptom id, similarity) pairs, most similar first, ties to the lower id"""
+        import numpy as np
+
+        if not texts or not len(self.row_starts):
+            return [[] for _ in texts]
+        similarities = self.similarities(texts)
+        k = min(k, similarities.shape[1])
+        results = []
+        for row in similarities:
+            candidates = np.argpartition(-row, k - 1)[:k] if k < len(row) else np.arange(len(row))
+            candidates = candidates[np.lexsort((candidates, -row[candidates]))]
+            results.append([(int(symptom_id), float(row[symptom_id])) for symptom_id in candidates])
+        return results
+
+    def top(self, text, k):
+        return self.top_batch([text], k)[0]
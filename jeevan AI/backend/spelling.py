@@ -0,0 +1,217 @@
+# spelling.py - Typo-tolerant lookup of symptom names in any script or romanized
+#
+# Users type Hindi and Tamil in Latin letters ("bukhar", "talai vali",
+# "irumal"), usually with a letter or two off. Every KB name and pattern is
+# indexed as written and as romanize() spells it, and SpellingIndex finds the
+# keys within edit distance 2 of a typed word (fewer for short words) with a
+# symmetric-delete index (as in SymSpell): the deletions of every key are precomputed, so a lookup
+# only generates the few deletions of the query and checks the keys that
+# share one, however many keys there are.
+
+MAX_EDIT_DISTANCE = 2
+# Deletions are generated for the first PREFIX_LENGTH characters only, which
+# bounds the index to a few dozen entries per key (SymSpell's prefix trick)
+PREFIX_LENGTH = 7
+
+_DEVANAGARI_VOWELS = {
+    'अ': 'a', 'आ': 'a', 'इ': 'i', 'ई': 'i', 'उ': 'u', 'ऊ': 'u', 'ऋ': 'ri',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au', 'ऑ': 'o',
+}
+_DEVANAGARI_SIGNS = {
+    'ा': 'a', 'ि': 'i', 'ी': 'i', 'ु': 'u', 'ू': 'u', 'ृ': 'ri',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au', 'ॅ': 'e', 'ॉ': 'o',
+}
+_DEVANAGARI_CONSONANTS = {
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'n',
+    'च': 'ch', 'छ': 'chh', 'ज': 'j', 'झ': 'jh', 'ञ': 'n',
+    'ट': 't', 'ठ': 'th', 'ड': 'd', 'ढ': 'dh', 'ण': 'n',
+    'त': 't', 'थ': 'th', 'द': 'd', 'ध': 'dh', 'न': 'n',
+    'प': 'p', 'फ': 'ph', 'ब': 'b', 'भ': 'bh', 'म': 'm',
+    'य': 'y', 'र': 'r', 'ल': 'l', 'व': 'v', 'श': 'sh', 'ष': 'sh', 'स': 's', 'ह': 'h',
+}
+# Consonant + nukta (NFC keeps these decomposed)
+_DEVANAGARI_NUKTA = {'क': 'q', 'ख': 'kh', 'ग': 'g', 'ज': 'z', 'ड': 'r', 'ढ': 'rh', 'फ': 'f', 'य': 'y'}
+_DEVANAGARI_MARKS = {'ं': 'n', 'ँ': 'n', 'ः': 'h'}
+_DEVANAGARI_VIRAMA = '्'
+_DEVANAGARI_NUKTA_SIGN = '़'
+
+_TAMIL_VOWELS = {
+    'அ': 'a', 'ஆ': 'a', 'இ': 'i', 'ஈ': 'i', 'உ': 'u', 'ஊ': 'u',
+    'எ': 'e', 'ஏ': 'e', 'ஐ': 'ai', 'ஒ': 'o', 'ஓ': 'o', 'ஔ': 'au',
+}
+_TAMIL_SIGNS = {
+    'ா': 'a', 'ி': 'i', 'ீ': 'i', 'ு': 'u', 'ூ': 'u',
+    'ெ': 'e', 'ே': 'e', 'ை': 'ai', 'ொ': 'o', 'ோ': 'o', 'ௌ': 'au',
+}
+_TAMIL_CONSONANTS = {
+    'க': 'k', 'ங': 'n', 'ச': 'ch', 'ஞ': 'n', 'ட': 't', 'ண': 'n',
+    'த': 't', 'ந': 'n', 'ப': 'p', 'ம': 'm', 'ய': 'y', 'ர': 'r',
+    'ல': 'l', 'வ': 'v', 'ழ': 'zh', 'ள': 'l', 'ற': 'r', 'ன': 'n',
+    'ஜ': 'j', 'ஷ': 'sh', 'ஸ': 's', 'ஹ': 'h',
+}
+_TAMIL_PULLI = '்'
+# Doubled consonants typed as one sound: பச்சை "pachai", வயிற்று "vayitru"
+_TAMIL_GEMINATES = {'ச': 'ch', 'ற': 'tr'}
+
+
+def romanize(text):
+    """
+    Spell Devanagari and Tamil the way users type them in Latin letters:
+    long vowels as short ones ("bukhar" for बुखार), no final inherent 'a' in
+    Hindi, 's' for Tamil ச at the start of a word ("sali" for சளி).
+    Other characters are kept. The result only needs to be within a couple
+    of edits of what people type, not a standard transliteration.
+    """
+    out = []
+    length = len(text)
+    position = 0
+    while position < length:
+        char = text[position]
+        following = text[position + 1] if position + 1 < length else ''
+        if char in _DEVANAGARI_CONSONANTS:
+            if following == _DEVANAGARI_NUKTA_SIGN:
+                out.append(_DEVANAGARI_NUKTA.get(char, _DEVANAGARI_CONSONANTS[char]))
+                position += 1
+                following = text[position + 1] if position + 1 < length else ''
+            else:
+                out.append(_DEVANAGARI_CONSONANTS[char])
+            if following in _DEVANAGARI_SIGNS:
+                out.append(_DEVANAGARI_SIGNS[following])
+                position += 1
+            elif following == _DEVANAGARI_VIRAMA:
+                position += 1
+            elif following and (following in _DEVANAGARI_CONSONANTS or following in _DEVANAGARI_VOWELS
+                                or following in _DEVANAGARI_MARKS):
+                out.append('a')  # inherent vowel, dropped at the end of a word
+        elif char in _DEVANAGARI_VOWELS:
+            out.append(_DEVANAGARI_VOWELS[char])
+        elif char in _DEVANAGARI_MARKS:
+            out.append(_DEVANAGARI_MARKS[char])
+        elif char in _TAMIL_CONSONANTS:
+            if char in _TAMIL_GEMINATES and text[position + 1:position + 3] == _TAMIL_PULLI + char:
+                out.append(_TAMIL_GEMINATES[char])
+                position += 2
+                following = text[position + 1] if position + 1 < length else ''
+            elif char == 'ச' and (not out or not out[-1][-1:].isalpha()):
+                out.append('s')  # சளி "sali"
+            else:
+                out.append(_TAMIL_CONSONANTS[char])
+            if following in _TAMIL_SIGNS:
+                out.append(_TAMIL_SIGNS[following])
+                position += 1
+            elif following == _TAMIL_PULLI:
+                position += 1
+            else:
+                out.append('a')
+        elif char in _TAMIL_VOWELS:
+            out.append(_TAMIL_VOWELS[char])
+        elif char in (_DEVANAGARI_VIRAMA, _DEVANAGARI_NUKTA_SIGN, _TAMIL_PULLI, '‌', '‍'):
+            pass
+        else:
+            out.append(char)
+        position += 1
+    return ''.join(out)
+
+
+def max_edit_distance(length):
+    """
+    Edits allowed between a query and a key whose shorter one has this
+    length. None below 6 characters: one letter there already makes another
+    everyday word ("gold" for cold, "never" for fever, "rain" for sprain).
+    """
+    if length < 6:
+        return 0
+    if length < 9:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+
+def _deletes(text, distance):
+    """text and every string made by deleting up to `distance` characters from it"""
+    variants = {text}
+    frontier = {text}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier if len(variant) > 1
+                    for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """Damerau (optimal string alignment) distance of a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Typos are local: only the part between the common prefix and suffix needs the table
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[max(start - 1, 0):end_a], b[max(start - 1, 0):end_b]  # one shared character keeps transpositions
+    if not a or not b:
+        return len(a) or len(b)
+
+    # Only cells within `limit` of the diagonal can stay within limit
+    beyond = limit + 1
+    previous_previous = None
+    previous = [j if j <= limit else beyond for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [beyond] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        row_minimum = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous_previous is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_minimum:
+                row_minimum = value
+        if row_minimum > limit:
+            return beyond
+        previous_previous, previous = previous, current
+    return min(previous[-1], beyond)
+
+
+class SpellingIndex:
+    """
+    Symmetric-delete index of keys (space-free, normalized symptom names).
+    lookup() returns the keys closest to a query within max_edit_distance()
+    of the shorter of the two, checking only keys that share a deletion
+    with it.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self._deletes = {}  # deletion of a key prefix -> [key ids]
+        for key_id, key in enumerate(self.keys):
+            for variant in _deletes(key[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self._deletes.setdefault(variant, []).append(key_id)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, query):
+        """(distance, [key ids]) of the closest keys, or (None, []) when none is close enough"""
+        limit = max_edit_distance(len(query))
+        best_distance = None
+        best = []
+        seen = set()
+        for variant in _deletes(query[:PREFIX_LENGTH], limit):
+            for key_id in self._deletes.get(variant, ()):
+                if key_id in seen:
+                    continue
+                seen.add(key_id)
+                key = self.keys[key_id]
+                key_limit = min(limit, max_edit_distance(len(key)))
+                distance = edit_distance(query, key, key_limit)
+                if distance > key_limit or (best_distance is not None and distance > best_distance):
+                    continue
+                if best_distance is None or distance < best_distance:
+                    best_distance = distance
+                    best = []
+                best.append(key_id)
+        return best_distance, sorted(best)
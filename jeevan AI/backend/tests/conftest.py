@@ -0,0 +1,48 @@
+# conftest.py - Shared fixtures: the backend modules import each other by plain name
+import csv
+import os
+import shutil
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KB_PATH = os.path.join(BACKEND_DIR, 'healthcare_kb.csv')
+sys.path.insert(0, BACKEND_DIR)
+# Tests reload explicitly; no watcher thread
+os.environ['KB_RELOAD_INTERVAL'] = '0'
+
+
+@pytest.fixture
+def kb_copy(tmp_path):
+    """A copy of the real knowledge base in a temporary folder"""
+    path = tmp_path / 'healthcare_kb.csv'
+    shutil.copy(KB_PATH, path)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def matcher():
+    """SymptomMatcher over the rows of the real knowledge base"""
+    from matcher import SymptomMatcher
+    with open(KB_PATH, encoding='utf-8') as f:
+        return SymptomMatcher(list(csv.DictReader(f)))
+
+
+@pytest.fixture
+def app_module():
+    """app.py, imported with the real knowledge base"""
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)  # app.py opens the knowledge base by relative path
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    """Flask test client of app.py, run from the backend folder"""
+    monkeypatch.chdir(BACKEND_DIR)
+    return app_module.app.test_client()
@@ -0,0 +1,63 @@
+# test_asgi.py - The ASGI entry point answers byte for byte like the Flask app
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def asgi_module(app_module):
+    import asgi
+    return asgi
+
+
+def call(asgi_module, method, path, body=b'', headers=()):
+    """(status, headers, body) of one request sent straight to the ASGI application"""
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+             'headers': [(name.lower().encode(), value.encode()) for name, value in headers]}
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_module.application(scope, receive, send))
+    start = next(message for message in sent if message['type'] == 'http.response.start')
+    response_headers = {name.decode(): value.decode() for name, value in start['headers']}
+    return start['status'], response_headers, b''.join(message.get('body', b'') for message in sent
+                                                       if message['type'] == 'http.response.body')
+
+
+@pytest.mark.parametrize('path, payload', [
+    ('/diagnose', {'symptom': 'fever', 'language': 'hindi'}),
+    ('/diagnose?view=language', {'symptom': 'தலைவலி', 'language': 'tamil'}),
+    ('/diagnose?top_k=3', {'symptom': 'my stomach hurts'}),
+    ('/diagnose?mode=multi', {'symptom': 'fever and chest pain'}),
+    ('/diagnose', {'symptom': 'xyzzy', 'language': None}),
+    ('/diagnose', {'language': 'hindi'}),
+    ('/diagnose/batch', [{'symptom': 'fever'}, {'symptom': 'cough', 'language': 'tamil'}]),
+])
+def test_post_matches_flask(asgi_module, client, path, payload):
+    status, headers, body = call(asgi_module, 'POST', path, json.dumps(payload).encode(),
+                                 [('Content-Type', 'application/json')])
+    expected = client.post(path, json=payload)
+    assert (status, body) == (expected.status_code, expected.data)
+    assert 'total;dur=' in headers['server-timing']
+
+
+def test_symptoms_revalidate_like_flask(asgi_module, client):
+    status, headers, body = call(asgi_module, 'GET', '/symptoms?language=hindi')
+    expected = client.get('/symptoms?language=hindi')
+    assert (status, body, headers['etag']) == (200, expected.data, expected.headers['ETag'])
+    status, _, body = call(asgi_module, 'GET', '/symptoms?language=hindi', headers=[('If-None-Match', headers['etag'])])
+    assert (status, body) == (304, b'')
+
+
+def test_invalid_json_fails_like_flask(asgi_module, client):
+    status, _, body = call(asgi_module, 'POST', '/diagnose', b'{not json', [('Content-Type', 'application/json')])
+    expected = client.post('/diagnose', data=b'{not json', content_type='application/json')
+    assert (status, json.loads(body)) == (expected.status_code, expected.get_json())
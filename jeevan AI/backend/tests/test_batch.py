@@ -0,0 +1,60 @@
+# test_batch.py - best_match_batch() and POST /diagnose/batch agree with one-at-a-time diagnosis
+import pytest
+
+from tests.test_matcher import parity_inputs
+
+
+def test_batch_matches_single(matcher):
+    texts = parity_inputs(matcher)
+    batch = matcher.best_match_batch(texts)
+    for text, (entry, score) in zip(texts, batch):
+        assert (entry, score) == matcher.best_match(text), text
+
+
+def test_batch_collects_rule_contributions_once_per_input(matcher, monkeypatch):
+    texts = ['fever', 'fever', 'pain', 'bukhaar', 'my stomach hurts', 'xyzzy']
+    calls = []
+    contributions = matcher._contributions
+
+    def counted(text):
+        calls.append(text)
+        return contributions(text)
+
+    monkeypatch.setattr(matcher, '_contributions', counted)
+    matcher.best_match_batch(texts)
+    assert sorted(calls) == sorted(set(texts))
+
+
+ITEMS = [{'symptom': 'fever'}, {'symptom': 'खांसी', 'language': 'hindi'}, {'symptom': 'xyzzy', 'language': 'tamil'},
+         {'symptom': None}, {'symptom': 'headache', 'language': None}, 'fever']
+
+
+def test_batch_endpoint_answers_like_diagnose(client):
+    response = client.post('/diagnose/batch', json=ITEMS)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] and body['count'] == len(ITEMS)
+    for item, result in zip(ITEMS, body['results']):
+        symptom = item.get('symptom') if isinstance(item, dict) else None
+        if not isinstance(symptom, str):
+            assert result == {'success': False, 'message': 'No symptom provided'}
+            continue
+        single = client.post('/diagnose', json=item).get_json()
+        assert result == single, item
+
+
+def test_batch_endpoint_accepts_an_items_object(client):
+    response = client.post('/diagnose/batch', json={'items': ITEMS[:2]})
+    assert response.status_code == 200 and response.get_json()['count'] == 2
+
+
+@pytest.mark.parametrize('payload', [{'symptom': 'fever'}, 'fever', {'items': 'fever'}])
+def test_batch_endpoint_rejects_anything_but_a_list(client, payload):
+    response = client.post('/diagnose/batch', json=payload)
+    assert response.status_code == 400 and not response.get_json()['success']
+
+
+def test_batch_endpoint_limits_the_batch_size(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_BATCH_SIZE', 2)
+    response = client.post('/diagnose/batch', json=ITEMS[:3])
+    assert response.status_code == 413
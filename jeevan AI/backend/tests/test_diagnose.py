@@ -0,0 +1,26 @@
+# test_diagnose.py - POST /diagnose through the Flask test client
+import pytest
+
+
+@pytest.mark.parametrize('symptom, language', [('fever', 'english'), ('बुखार', 'hindi'), ('  FEVER ', 'tamil'),
+                                               ('Fever', 'english')])
+def test_diagnose_finds_the_symptom(client, symptom, language):
+    response = client.post('/diagnose', json={'symptom': symptom, 'language': language})
+    assert response.status_code == 200 and response.mimetype == 'application/json'
+    body = response.get_json()
+    assert body['success']
+    assert body['result']['name']['english'] == 'Fever'
+    assert set(body['result']['advice']) == {'english', 'hindi', 'tamil'}
+
+
+def test_diagnose_answers_no_match_in_the_requested_language(client, app_module):
+    response = client.post('/diagnose', json={'symptom': 'xyzzy', 'language': 'hindi'})
+    assert response.status_code == 200
+    assert response.get_json() == {'success': False, 'message': app_module.NO_MATCH_MESSAGES['hindi']}
+
+
+@pytest.mark.parametrize('payload', [{'symptom': '   '}, {'language': 'hindi'}])
+def test_diagnose_rejects_an_empty_symptom(client, payload):
+    response = client.post('/diagnose', json=payload)
+    assert response.status_code == 400 and not response.get_json()['success']
+
@@ -0,0 +1,110 @@
+# test_diagnose_cache.py - LRU/TTL bookkeeping, single-flight coalescing, version invalidation
+import threading
+
+import pytest
+
+from diagnose_cache import DiagnosisCache
+
+
+def test_hit_after_miss():
+    cache = DiagnosisCache(max_entries=2, ttl=60)
+    assert cache.get_or_compute('fever', lambda: 1) == 1
+    assert cache.get_or_compute('fever', lambda: 2) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction_and_ttl():
+    now = [0.0]
+    cache = DiagnosisCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    for key in ('a', 'b', 'c'):
+        cache.get_or_compute(key, lambda: key)
+    assert len(cache) == 2 and cache.evictions == 1
+    now[0] = 11
+    assert cache.get_or_compute('c', lambda: 'new') == 'new'
+    assert cache.expirations == 1
+
+
+def test_concurrent_misses_compute_once():
+    cache = DiagnosisCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute('fever', compute)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(cache.get_or_compute('fever', compute)))
+                 for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    while cache.coalesced < 4:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    assert results == ['result'] * 5 and len(calls) == 1 and cache.coalesced == 4
+
+
+def test_error_is_raised_and_not_cached():
+    cache = DiagnosisCache(ttl=60)
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute('fever', fail)
+    assert cache.get_or_compute('fever', lambda: 'ok') == 'ok'
+
+
+def test_new_version_drops_old_entries():
+    cache = DiagnosisCache(ttl=60)
+    cache.get_or_compute('fever', lambda: 'v1', version=1)
+    assert cache.get_or_compute('fever', lambda: 'v2', version=2) == 'v2'
+    assert cache.invalidations == 1 and len(cache) == 1
+
+
+def test_result_computed_across_a_reload_is_not_cached():
+    cache = DiagnosisCache(ttl=60)
+
+    def compute():
+        cache.get_or_compute('other', lambda: None, version=2)  # a reload lands meanwhile
+        return 'stale'
+
+    assert cache.get_or_compute('fever', compute, version=1) == 'stale'
+    assert cache.get_or_compute('fever', lambda: 'fresh', version=2) == 'fresh'
+
+
+def test_disabled_cache_always_computes():
+    cache = DiagnosisCache(ttl=0)
+    assert cache.get_or_compute('fever', lambda: 1) == 1
+    assert cache.get_or_compute('fever', lambda: 2) == 2
+
+
+@pytest.mark.parametrize('language', [None, 7, ['hindi'], {'name': 'tamil'}])
+def test_diagnose_answers_in_english_for_a_non_string_language(client, language):
+    response = client.post('/diagnose', json={'symptom': 'fever', 'language': language})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] and body['result']['name']['english'] == 'Fever'
+
+
+@pytest.mark.parametrize('payload', [{'symptom': None}, {'symptom': 12}, ['fever'], {}])
+def test_diagnose_rejects_a_missing_or_non_string_symptom(client, payload):
+    response = client.post('/diagnose', json=payload)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_diagnose_reuses_the_answer_of_an_equivalent_input(client, app_module):
+    app_module.diagnose_cache.clear()
+    first = client.post('/diagnose', json={'symptom': 'Headache', 'language': 'hindi'})
+    hits = app_module.diagnose_cache.hits
+    second = client.post('/diagnose', json={'symptom': '  HEADACHE ', 'language': 'Hindi '})
+    assert second.data == first.data
+    assert app_module.diagnose_cache.hits == hits + 1
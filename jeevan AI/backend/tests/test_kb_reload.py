@@ -0,0 +1,97 @@
+# test_kb_reload.py - KBWatcher publishing and failure paths
+import os
+
+from kb_reload import KBWatcher
+
+
+class Snapshot:
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+
+
+def touch(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.utime(path, ns=(0, len(text) * 10**9))
+
+
+def test_reload_publishes_new_snapshot(tmp_path):
+    path = str(tmp_path / 'kb.csv')
+    touch(path, 'a')
+    builds = iter([Snapshot('v1'), Snapshot('v2')])
+    watcher = KBWatcher(path, lambda: next(builds), interval=0)
+    assert watcher.snapshot.name == 'v1' and watcher.version == 1
+    assert not watcher.check()
+    touch(path, 'ab')
+    assert watcher.check()
+    assert watcher.snapshot.name == 'v2' and watcher.version == 2 and watcher.reload_count == 1
+
+
+def test_broken_reload_keeps_healthy_snapshot(tmp_path):
+    path = str(tmp_path / 'kb.csv')
+    touch(path, 'a')
+    builds = iter([Snapshot('v1'), Snapshot('broken', error='Missing required columns')])
+    watcher = KBWatcher(path, lambda: next(builds), interval=0)
+    touch(path, 'ab')
+    assert not watcher.check()
+    assert watcher.snapshot.name == 'v1'
+    assert watcher.failed_reloads == 1 and watcher.last_error == 'Missing required columns'
+    assert not watcher.check()  # not retried until the file changes again
+
+
+def test_failed_initial_load_publishes_fallback(tmp_path):
+    def build():
+        raise OSError('disk error')
+
+    watcher = KBWatcher(str(tmp_path / 'kb.csv'), build, interval=0,
+                        fallback_snapshot=lambda error: Snapshot('sample', error=error))
+    assert watcher.snapshot.name == 'sample'
+    assert 'disk error' in watcher.snapshot.error and watcher.version == 1
+
+
+def test_build_exception_is_not_retried_until_the_file_changes(tmp_path):
+    path = str(tmp_path / 'kb.csv')
+    touch(path, 'a')
+    calls = []
+
+    def build():
+        calls.append(1)
+        if len(calls) > 1:
+            raise ValueError('bad row')
+        return Snapshot('v1')
+
+    watcher = KBWatcher(path, build, interval=0)
+    touch(path, 'ab')
+    assert not watcher.check()
+    assert not watcher.check() and not watcher.check()
+    assert len(calls) == 2 and watcher.snapshot.name == 'v1' and watcher.failed_reloads == 1
+    touch(path, 'abc')
+    assert not watcher.check()
+    assert len(calls) == 3
+
+
+def test_app_serves_sample_data_when_the_first_load_raises(app_module, monkeypatch):
+    def build():
+        raise OSError('permission denied')
+
+    watcher = KBWatcher('missing.csv', build, interval=0,
+                        fallback_snapshot=lambda error: app_module.KBSnapshot(None, error, 'sample'))
+    assert watcher.snapshot.df is None and 'permission denied' in watcher.snapshot.error
+    assert len(watcher.snapshot.matcher) == 0
+
+
+def test_diagnose_serves_an_edited_knowledge_base_after_a_reload(client, app_module, kb_copy, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(kb_copy))
+    watcher = KBWatcher(kb_copy, app_module.build_kb_snapshot, interval=0)
+    monkeypatch.setattr(app_module, 'kb_watcher', watcher)
+    payload = {'symptom': 'itchy eyes'}
+    assert not client.post('/diagnose', json=payload).get_json()['success']
+
+    with open(kb_copy, 'a', encoding='utf-8') as f:
+        f.write('Eye Allergy,आँखों की एलर्जी,கண் ஒவ்வாமை,H,Rinse with clean water.,साफ पानी से धोएं।,'
+                'சுத்தமான நீரில் கழுவவும்.,Do not rub the eyes,आँखें न मलें,கண்களைத் தேய்க்க வேண்டாம்,itchy eyes,90\n')
+    os.utime(kb_copy, ns=(0, 10**9))
+    assert watcher.check()
+    body = client.post('/diagnose', json=payload).get_json()
+    assert body['success'] and body['result']['name']['english'] == 'Eye Allergy'
@@ -0,0 +1,86 @@
+# test_kb_snapshot.py - Compiled snapshots give the same table and matches as the CSV
+import os
+
+import pytest
+
+from kb_snapshot import KBTable, compile_kb, load_snapshot, read_kb_csv, snapshot_path
+from matcher import SymptomMatcher
+
+QUERIES = ['fever', 'बुखार', 'தலைவலி', 'pain in chest', 'bukhaar', 'cough and chest pain', 'xyzzy']
+
+
+def test_round_trip_table(kb_copy):
+    table, _ = read_kb_csv(kb_copy)
+    snapshot = KBTable(compile_kb(kb_copy))
+    assert snapshot.columns == table.columns
+    assert snapshot.to_dict('records') == table.to_dict('records')
+    assert bytes(snapshot.severity_codes) == bytes(table.severity_codes)
+
+
+def test_round_trip_matcher(kb_copy):
+    table, _ = read_kb_csv(kb_copy)
+    from_csv = SymptomMatcher.from_dataframe(table)
+    from_snapshot = KBTable(compile_kb(kb_copy)).build_matcher()
+    for query in QUERIES:
+        assert from_snapshot.top_matches(query, 5) == from_csv.top_matches(query, 5), query
+        assert from_snapshot.find_mentions(query) == from_csv.find_mentions(query), query
+
+
+def test_stale_snapshot_is_ignored(kb_copy):
+    compile_kb(kb_copy)
+    with open(kb_copy, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    table, reason = load_snapshot(kb_copy)
+    assert table is None and 'out of date' in reason
+
+
+def test_missing_snapshot(kb_copy):
+    table, reason = load_snapshot(kb_copy)
+    assert table is None and reason.startswith('No snapshot')
+    assert not os.path.exists(snapshot_path(kb_copy))
+
+
+def truncate(path, keep):
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:keep(len(data))])
+
+
+@pytest.mark.parametrize('keep', [lambda size: size // 2, lambda size: size - 3, lambda size: 100,
+                                  lambda size: 0])
+def test_truncated_snapshot_is_unusable(kb_copy, keep):
+    truncate(compile_kb(kb_copy), keep)
+    table, reason = load_snapshot(kb_copy)
+    assert table is None and reason.startswith('Unusable snapshot')
+
+
+def test_app_falls_back_to_csv_on_truncated_snapshot(app_module, kb_copy, monkeypatch):
+    truncate(compile_kb(kb_copy), lambda size: size - 3)
+    monkeypatch.chdir(os.path.dirname(kb_copy))
+    snapshot = app_module.build_kb_snapshot()
+    assert snapshot.source == 'csv' and snapshot.error is None
+    assert snapshot.matcher.best_match('fever')[0]['name']['english'] == 'Fever'
+
+
+
+def test_app_loads_a_snapshot_without_reading_rows(app_module, kb_copy, monkeypatch):
+    compile_kb(kb_copy)
+    monkeypatch.chdir(os.path.dirname(kb_copy))
+    cells = []
+    cell = KBTable.cell
+    monkeypatch.setattr(KBTable, 'cell', lambda self, row, position: cells.append(row) or cell(self, row, position))
+    snapshot = app_module.build_kb_snapshot()
+    assert snapshot.source == 'snapshot' and cells == []
+    # Indexes are built on first use instead
+    assert snapshot.matcher.best_match('bukhaar')[0]['name']['english'] == 'Fever'
+    assert cells
+
+
+def test_health_reports_the_snapshot(client, app_module, kb_copy, monkeypatch):
+    compile_kb(kb_copy)
+    monkeypatch.chdir(os.path.dirname(kb_copy))
+    monkeypatch.setattr(app_module.kb_watcher, 'snapshot', app_module.build_kb_snapshot())
+    assert client.get('/health').get_json()['kb_source'] == 'snapshot'
+    body = client.post('/diagnose', json={'symptom': 'தலைவலி', 'language': 'tamil'}).get_json()
+    assert body['success'] and body['result']['name']['english'] == 'Headache'
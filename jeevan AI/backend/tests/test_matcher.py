@@ -0,0 +1,75 @@
+# test_matcher.py - SymptomMatcher against the scoring loop it replaced
+import json
+import os
+
+from matcher import MATCH_THRESHOLD, SymptomMatcher, normalize_text
+from tests.conftest import BACKEND_DIR
+
+
+def baseline_scores(entries, symptom_input):
+    """The original diagnose() loop of app.py: {symptom id: score} for every symptom"""
+    scores = {}
+    for symptom_id, entry in enumerate(entries):
+        score = 0
+        patterns = entry['patterns']
+        for pattern in patterns:
+            pattern_lower = normalize_text(pattern)
+            if pattern_lower == symptom_input:
+                score += 100
+            elif pattern_lower in symptom_input and len(pattern_lower) > 3:
+                score += len(pattern_lower) * 3
+            elif symptom_input in pattern_lower and len(symptom_input) > 3:
+                score += len(symptom_input) * 2
+        for word in symptom_input.split():
+            if len(word) > 2:
+                for pattern in patterns:
+                    if word in normalize_text(pattern).split():
+                        score += len(word)
+        scores[symptom_id] = score
+    return scores
+
+
+def parity_inputs(matcher):
+    """Every pattern, its halves and words, plus the labeled benchmark queries"""
+    inputs = set()
+    for entry in matcher.symptoms:
+        for pattern in entry['patterns']:
+            pattern = normalize_text(pattern)
+            inputs.update([pattern, pattern[:len(pattern) // 2], pattern[len(pattern) // 2:]])
+            inputs.update(pattern.split())
+            inputs.add(f'i have {pattern} since morning')
+    with open(os.path.join(BACKEND_DIR, 'benchmarks', 'labeled_queries.json'), encoding='utf-8') as f:
+        inputs.update(normalize_text(item['query']) for item in json.load(f))
+    return sorted(text for text in inputs if text)
+
+
+def test_rule_scores_match_baseline_loop(matcher):
+    for text in parity_inputs(matcher):
+        expected = {sid: score for sid, score in baseline_scores(matcher.symptoms, text).items() if score}
+        actual = {}
+        for symptom_id, points in matcher._contributions(text):
+            actual[symptom_id] = actual.get(symptom_id, 0) + points
+        assert actual == expected, text
+
+
+def test_repeated_pattern_words_match_baseline_loop():
+    rows = [{'symptom_english': 'Chest Pain', 'patterns': 'pain pain in chest|chest pain|pain'},
+            {'symptom_english': 'Leg Pain', 'patterns': 'leg leg pain'}]
+    matcher = SymptomMatcher(rows)
+    for text in ['pain', 'pain pain', 'leg', 'chest pain in leg', 'leg leg pain']:
+        expected = {sid: score for sid, score in baseline_scores(matcher.symptoms, text).items() if score}
+        actual = {}
+        for symptom_id, points in matcher._contributions(text):
+            actual[symptom_id] = actual.get(symptom_id, 0) + points
+        assert actual == expected, text
+
+
+def test_confident_rule_match_is_baseline_winner(matcher):
+    for text in parity_inputs(matcher):
+        scores = baseline_scores(matcher.symptoms, text)
+        best = max(scores.values())
+        if best < MATCH_THRESHOLD:
+            continue
+        # The baseline kept the first symptom reaching the highest score
+        expected = next(sid for sid, score in scores.items() if score == best)
+        assert matcher.best_match_id(text) == (expected, best), text
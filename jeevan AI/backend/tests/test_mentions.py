@@ -0,0 +1,41 @@
+# test_mentions.py - find_mentions() and POST /diagnose?mode=multi
+import pytest
+
+
+def names(matcher, mentions):
+    return [matcher.symptoms[symptom_id]['name']['english'] for symptom_id, _, _ in mentions]
+
+
+def test_longest_mention_wins_and_spans_never_overlap(matcher):
+    mentions, text = matcher.find_mentions('high fever and a headache')
+    assert names(matcher, mentions)[1] == 'Headache'
+    assert text[mentions[0][1]:mentions[0][2]] == 'high fever'
+    assert all(end <= start for (_, _, end), (_, start, _) in zip(mentions, mentions[1:]))
+
+
+def test_mentions_start_at_a_word_boundary(matcher):
+    mentions, _ = matcher.find_mentions('antifever tablets')
+    assert mentions == []
+
+
+def test_multi_mode_lists_every_symptom_most_severe_first(client):
+    text = 'I have Fever, a headache and chest pain'
+    body = client.post('/diagnose?mode=multi&view=language', json={'symptom': text, 'language': 'hindi'}).get_json()
+    assert body['success'] and body['mode'] == 'multi' and body['count'] == 3
+    assert body['highest_severity'] == 'E' and body['emergency']
+    assert [match['result']['name'] for match in body['matches']] == ['छाती में दर्द', 'बुखार', 'सिर दर्द']
+    for match in body['matches']:
+        for span in match['spans']:
+            assert text[span['start']:span['end']] == span['text']
+
+
+def test_multi_mode_without_a_mention_is_no_match(client, app_module):
+    body = client.post('/diagnose?mode=multi', json={'symptom': 'xyzzy', 'language': 'tamil'}).get_json()
+    assert body == {'success': False, 'mode': 'multi', 'count': 0, 'highest_severity': None, 'emergency': False,
+                    'matches': [], 'message': app_module.NO_MATCH_MESSAGES['tamil']}
+
+
+@pytest.mark.parametrize('query', ['mode=multi&top_k=3', 'mode=every'])
+def test_invalid_mode_requests_are_rejected(client, query):
+    response = client.post(f'/diagnose?{query}', json={'symptom': 'fever'})
+    assert response.status_code == 400
@@ -0,0 +1,55 @@
+# test_metrics.py - Per-thread metric shards under thread churn, /metrics and Server-Timing
+import threading
+
+from metrics import MetricsRegistry
+
+
+def record_in_threads(metrics, count):
+    def record():
+        metrics.inc('requests_total', (('endpoint', 'diagnose'),))
+        metrics.observe('latency_seconds', 0.002)
+
+    for _ in range(count):
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+
+
+def test_exited_threads_are_folded_into_retired_totals():
+    metrics = MetricsRegistry()
+    metrics.counter('requests_total', 'Requests')
+    metrics.histogram('latency_seconds', 'Latency')
+    record_in_threads(metrics, 200)
+
+    assert len(metrics._shards) == 0
+    assert metrics.merged_counters() == {('requests_total', (('endpoint', 'diagnose'),)): 200}
+    assert 'latency_seconds_count 200' in metrics.render()
+
+
+def test_live_and_retired_shards_are_merged():
+    metrics = MetricsRegistry()
+    metrics.counter('requests_total', 'Requests')
+    metrics.histogram('latency_seconds', 'Latency')
+    metrics.inc('requests_total', (('endpoint', 'diagnose'),), 5)
+    record_in_threads(metrics, 3)
+
+    assert len(metrics._shards) == 1  # this thread's
+    assert metrics.merged_counters('requests_total') == {('requests_total', (('endpoint', 'diagnose'),)): 8}
+    assert 'latency_seconds_count 3' in metrics.render()
+
+
+def test_diagnose_reports_its_stages(client):
+    timing = client.post('/diagnose', json={'symptom': 'headache'}).headers['Server-Timing']
+    for stage in ('parse', 'normalize', 'score', 'serialize', 'total'):
+        assert f'{stage};dur=' in timing
+
+
+def test_metrics_endpoint_counts_requests(client):
+    client.post('/diagnose', json={'symptom': 'fever', 'language': 'tamil'})
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert 'healthcare_http_requests_total{' in text and 'endpoint="diagnose"' in text
+    assert 'healthcare_diagnose_hit_ratio{language="tamil"}' in text
+    assert 'healthcare_diagnose_stage_seconds_bucket{' in text
+    assert 'healthcare_kb_symptoms ' in text
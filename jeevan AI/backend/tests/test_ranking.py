@@ -0,0 +1,33 @@
+# test_ranking.py - top_matches() and POST /diagnose?top_k=N
+import pytest
+
+from matcher import MATCH_THRESHOLD
+
+
+def test_top_matches_starts_with_a_confident_best_match(matcher):
+    for text in ['fever', 'chest pain', 'बुखार', 'bukhaar']:
+        ranked = matcher.top_matches(text, 5)
+        assert ranked[0] == matcher.best_match_id(text) and ranked[0][1] >= MATCH_THRESHOLD, text
+        assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+
+
+def test_top_k_lists_candidates_best_first(client):
+    body = client.post('/diagnose?top_k=3', json={'symptom': 'chest pain', 'language': 'hindi'}).get_json()
+    assert body['success'] and body['top_k'] == 3 and body['threshold'] == MATCH_THRESHOLD
+    assert 1 <= len(body['matches']) <= 3
+    scores = [match['score'] for match in body['matches']]
+    assert scores == sorted(scores, reverse=True)
+    assert body['matches'][0]['above_threshold'] and body['matches'][0]['result']['name']['english'] == 'Chest Pain'
+
+
+def test_top_k_below_the_threshold_is_no_match(client, app_module):
+    body = client.post('/diagnose?top_k=2&view=language', json={'symptom': 'pain', 'language': 'tamil'}).get_json()
+    assert not body['success'] and body['message'] == app_module.NO_MATCH_MESSAGES['tamil']
+    assert body['matches'] and not any(match['above_threshold'] for match in body['matches'])
+    assert isinstance(body['matches'][0]['result']['name'], str)
+
+
+@pytest.mark.parametrize('top_k', ['0', '21', 'three', '-1'])
+def test_top_k_out_of_range_is_rejected(client, top_k):
+    response = client.post(f'/diagnose?top_k={top_k}', json={'symptom': 'fever'})
+    assert response.status_code == 400 and 'top_k' in response.get_json()['message']
@@ -0,0 +1,97 @@
+# test_response_encoding.py - Accept-Encoding negotiation over pre-compressed variants, and /diagnose?view=language
+import gzip
+import json
+
+import pytest
+
+from response_encoding import IDENTITY, choose_encoding, compress_variants
+from tests.conftest import BACKEND_DIR
+
+BODY = b'{"advice": "Take rest and drink plenty of fluids."}' * 20
+
+
+@pytest.fixture
+def variants():
+    return {IDENTITY: BODY, 'gzip': b'g', 'br': b'b'}
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, IDENTITY),
+    ('', IDENTITY),
+    ('gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('GZIP;Q=0.9', 'gzip'),
+    ('*', 'br'),
+    ('*;q=0, identity', IDENTITY),
+    ('gzip;q=0, br;q=0', IDENTITY),
+    ('identity;q=0, gzip;q=0', IDENTITY),
+    ('deflate', IDENTITY),
+    ('gzip;q=abc, br;q=0.1', 'br'),
+])
+def test_choose_encoding(variants, header, expected):
+    assert choose_encoding(header, variants) == expected
+
+
+def test_missing_variant_is_never_chosen():
+    assert choose_encoding('br', {IDENTITY: BODY, 'gzip': b'g'}) == IDENTITY
+
+
+def test_compress_variants_round_trip():
+    variants = compress_variants(BODY)
+    assert variants[IDENTITY] == BODY
+    assert gzip.decompress(variants['gzip']) == BODY
+    assert compress_variants(BODY)['gzip'] == variants['gzip']  # reproducible bytes
+
+
+def test_incompressible_body_is_identity_only():
+    assert set(compress_variants(b'{}')) == {IDENTITY}
+
+
+def test_diagnosis_responses_are_encoded_on_first_use(app_module, monkeypatch):
+    monkeypatch.chdir(BACKEND_DIR)
+    snapshot = app_module.build_kb_snapshot()
+    responses = snapshot.diagnosis_responses
+    assert responses._encoded.cache_info().currsize == 0
+    no_match = json.loads(responses[(None, 'hindi')][IDENTITY])
+    assert no_match == {'success': False, 'message': app_module.NO_MATCH_MESSAGES['hindi']}
+
+    symptom_id, _ = snapshot.matcher.best_match_id('fever')
+    variants = responses[(symptom_id, 'tamil')]
+    assert responses[(symptom_id, 'tamil')] is variants
+    assert responses._encoded.cache_info().currsize == 1
+    body = json.loads(variants[IDENTITY])
+    assert body['language'] == 'tamil'
+    assert body['result']['name'] == snapshot.matcher.symptoms[symptom_id]['name']['tamil']
+
+
+def test_diagnosis_responses_keep_only_the_most_recent(app_module, monkeypatch):
+    monkeypatch.chdir(BACKEND_DIR)
+    snapshot = app_module.build_kb_snapshot()
+    responses = app_module.DiagnosisResponses(snapshot.matcher, cache_size=2)
+    for symptom_id in range(3):
+        responses[(symptom_id, 'english')]
+    assert responses._encoded.cache_info().currsize == 2
+
+
+def test_language_view_answers_in_one_language(client):
+    body = client.post('/diagnose?view=language', json={'symptom': 'fever', 'language': 'tamil'}).get_json()
+    assert body['success'] and body['language'] == 'tamil'
+    assert body['result']['name'] == 'காய்ச்சல்'
+    assert set(body['result']) == {'name', 'severity', 'confidence', 'advice', 'first_aid'}
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br'])
+def test_language_view_is_served_compressed(client, encoding):
+    decompress = gzip.decompress if encoding == 'gzip' else pytest.importorskip('brotli').decompress
+    payload = {'symptom': 'bukhar', 'language': 'hindi'}
+    plain = client.post('/diagnose?view=language', json=payload)
+    response = client.post('/diagnose?view=language', json=payload, headers={'Accept-Encoding': encoding})
+    assert response.headers['Content-Encoding'] == encoding and 'Accept-Encoding' in response.headers['Vary']
+    assert 'Content-Encoding' not in plain.headers
+    assert decompress(response.data) == plain.data
+
+
+def test_unknown_view_is_rejected(client):
+    response = client.post('/diagnose?view=compact', json={'symptom': 'fever'})
+    assert response.status_code == 400
@@ -0,0 +1,57 @@
+# test_semantic.py - Character n-gram similarity ranks top_k candidates and never diagnoses
+import pytest
+
+from matcher import MATCH_THRESHOLD
+from semantic import SemanticIndex
+
+TEXTS = [['fever', 'high temperature'], ['headache', 'head pain'], ['stomach pain', 'stomach ache'], []]
+
+
+@pytest.mark.parametrize('quantize', ['on', 'off'])
+def test_index_ranks_the_closest_symptom_first(quantize):
+    index = SemanticIndex(TEXTS, quantize=quantize)
+    assert len(index) == 4 and index.quantized == (quantize == 'on')
+    (symptom_id, similarity), *_ = index.top('my stomach is paining', 2)
+    assert symptom_id == 2 and 0 < similarity <= 1
+    assert [symptom_id for symptom_id, _ in index.top('head is paining', 4)][0] == 1
+
+
+def test_batch_scores_like_single_queries():
+    index = SemanticIndex(TEXTS)
+    queries = ['fevers', 'my head hurts', 'xyzzy', '']
+    for query, ranked in zip(queries, index.top_batch(queries, 3)):
+        assert ranked == index.top(query, 3)
+
+
+@pytest.mark.parametrize('text', ['cold drink', 'leg', 'burning in chest', 'feet', 'my stomach hurts',
+                                  'gold', 'bold', 'hold', 'told', 'never', 'fewer', 'rough', 'tough',
+                                  'born', 'turn', 'rain'])
+def test_near_misses_are_not_diagnosed(matcher, text):
+    _, score = matcher.best_match_id(text)
+    assert score < MATCH_THRESHOLD
+
+
+def test_semantic_similarity_still_ranks_candidates(matcher):
+    (symptom_id, score), *_ = matcher.top_matches('my stomach hurts', 3)
+    assert matcher.symptoms[symptom_id]['name']['english'] == 'Stomach Pain'
+    assert 0 < score < MATCH_THRESHOLD
+
+
+def test_best_match_never_runs_the_semantic_pass(matcher, monkeypatch):
+    def unexpected(symptom_inputs):
+        raise AssertionError('semantic pass without top_k')
+
+    monkeypatch.setattr(matcher, 'semantic_candidates', unexpected)
+    texts = ['my stomach hurts', 'burning in chest', 'xyzzy', 'fever']
+    for text in texts:
+        matcher.best_match_id(text)
+    matcher.best_match_batch(texts)
+
+
+def test_top_k_lists_similar_symptoms_without_a_diagnosis(client, app_module):
+    body = client.post('/diagnose?top_k=3', json={'symptom': 'my stomach hurts', 'language': 'hindi'}).get_json()
+    assert not body['success'] and body['message'] == app_module.NO_MATCH_MESSAGES['hindi']
+    assert body['matches'][0]['result']['name']['english'] == 'Stomach Pain'
+    assert not body['matches'][0]['above_threshold']
+    plain = client.post('/diagnose', json={'symptom': 'my stomach hurts', 'language': 'hindi'}).get_json()
+    assert plain == {'success': False, 'message': app_module.NO_MATCH_MESSAGES['hindi']}
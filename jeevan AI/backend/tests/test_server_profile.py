@@ -0,0 +1,43 @@
+# test_server_profile.py - /ready, and what gunicorn.conf.py leaves behind before the first fork
+import os
+import subprocess
+import sys
+
+from kb_reload import KBWatcher
+from tests.conftest import BACKEND_DIR
+
+
+def test_ready_with_a_knowledge_base(client):
+    response = client.get('/ready')
+    body = response.get_json()
+    assert response.status_code == 200 and body['ready'] and body['symptoms'] > 0 and body['reason'] is None
+
+
+def test_not_ready_while_sample_data_is_served(client, app_module, monkeypatch):
+    def build():
+        raise OSError('permission denied')
+
+    watcher = KBWatcher('missing.csv', build, interval=0,
+                        fallback_snapshot=lambda error: app_module.KBSnapshot(None, error, 'sample'))
+    monkeypatch.setattr(app_module, 'kb_watcher', watcher)
+    response = client.get('/ready')
+    body = response.get_json()
+    assert response.status_code == 503 and not body['ready'] and 'permission denied' in body['reason']
+    assert client.get('/health').status_code == 200
+
+
+def test_when_ready_builds_the_indexes_and_collects_again():
+    # A fresh process: loading the profile turns the collector off
+    code = '\n'.join([
+        "import gc, runpy",
+        "profile = runpy.run_path('gunicorn.conf.py')",
+        "assert not gc.isenabled()",
+        "profile['when_ready'](None)",
+        "from app import kb_watcher",
+        "matcher = kb_watcher.snapshot.matcher",
+        "assert matcher._spelling_index and matcher._mention_index and matcher._semantic_index",
+        "assert gc.isenabled() and gc.get_freeze_count() > 0",
+    ])
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True,
+                            env=dict(os.environ, KB_RELOAD_INTERVAL='0', GUNICORN_PRELOAD='1'))
+    assert result.returncode == 0, result.stderr.decode()
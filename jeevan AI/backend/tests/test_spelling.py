@@ -0,0 +1,47 @@
+# test_spelling.py - Misspelled and romanized symptom names, from SpellingIndex to POST /diagnose
+import pytest
+
+from spelling import SpellingIndex, edit_distance, romanize
+
+
+@pytest.mark.parametrize('a, b, distance', [('headache', 'headache', 0), ('headache', 'headahce', 1),
+                                            ('stomachache', 'stomachace', 1), ('cough', 'rough', 1),
+                                            ('thalaivali', 'talaivali', 1), ('abcdef', 'uvwxyz', 3)])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b, 2) == min(distance, 3)
+
+
+def test_romanize():
+    assert romanize('தலைவலி') == 'talaivali' and romanize('बुखार') == 'bukhar'
+
+
+def test_lookup_returns_the_closest_keys():
+    index = SpellingIndex(['headache', 'backache', 'stomachache', 'fever'])
+    assert index.lookup('headach') == (1, [0])
+    assert index.lookup('stomacheache') == (1, [2])
+    assert index.lookup('fevar') == (None, [])  # below six letters only exact keys match
+
+
+@pytest.mark.parametrize('word', ['gold', 'bold', 'hold', 'told', 'never', 'fewer', 'rough', 'tough',
+                                  'born', 'turn', 'rain'])
+def test_everyday_words_are_not_misspelled_symptoms(matcher, word):
+    assert matcher.spelling_match(word) == (None, 0)
+
+
+@pytest.mark.parametrize('text, english', [('bukhaar', 'Fever'), ('irummal', 'Cough'),
+                                           ('thalaivali', 'Headache'), ('headach', 'Headache')])
+def test_long_misspellings_are_corrected(matcher, text, english):
+    symptom_id, score = matcher.spelling_match(text)
+    assert symptom_id is not None and score == 95
+    assert matcher.symptoms[symptom_id]['name']['english'] == english
+
+
+@pytest.mark.parametrize('text, language, english', [('bukhaar', 'hindi', 'Fever'), ('thalai vali', 'tamil', 'Headache'),
+                                                     ('irummal', 'tamil', 'Cough')])
+def test_diagnose_corrects_romanized_and_misspelled_names(client, text, language, english):
+    body = client.post('/diagnose', json={'symptom': text, 'language': language}).get_json()
+    assert body['success'] and body['result']['name']['english'] == english
+
+
+def test_diagnose_does_not_correct_short_everyday_words(client):
+    assert not client.post('/diagnose', json={'symptom': 'gold'}).get_json()['success']
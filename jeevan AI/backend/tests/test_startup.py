@@ -0,0 +1,25 @@
+# test_startup.py - What a fresh server process imports (the test session has loaded everything already)
+import os
+import subprocess
+import sys
+
+from tests.conftest import BACKEND_DIR
+
+
+def run_fresh(code):
+    """Run code in a new interpreter from the backend folder, as a worker would start"""
+    return subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True,
+                          env=dict(os.environ, KB_RELOAD_INTERVAL='0'))
+
+
+def test_diagnose_runs_without_pandas():
+    result = run_fresh("import sys, app\n"
+                       "response = app.app.test_client().post('/diagnose', json={'symptom': 'fever'})\n"
+                       "assert response.get_json()['success']\n"
+                       "sys.exit('pandas' in sys.modules)")
+    assert result.returncode == 0, result.stderr.decode()
+
+
+def test_app_starts_without_numpy():
+    result = run_fresh("import sys, app; sys.exit('numpy' in sys.modules)")
+    assert result.returncode == 0, result.stderr.decode()
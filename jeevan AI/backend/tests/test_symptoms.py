@@ -0,0 +1,54 @@
+# test_symptoms.py - GET /symptoms: precomputed bodies, ETags and 304 revalidation
+import gzip
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize('language', ['english', 'hindi', 'tamil'])
+def test_symptoms_lists_the_knowledge_base(client, app_module, language):
+    response = client.get(f'/symptoms?language={language}')
+    assert response.status_code == 200 and response.headers['Cache-Control'] == 'no-cache'
+    body = response.get_json()
+    assert body['success'] and body['language'] == language
+    assert len(body['symptoms']) == len(app_module.kb_watcher.snapshot.df)
+
+
+def test_unknown_language_gets_the_english_list(client):
+    english = client.get('/symptoms?language=english')
+    other = client.get('/symptoms?language=klingon')
+    assert other.headers['ETag'] == english.headers['ETag'] and other.data == english.data
+
+
+def test_matching_etag_gets_an_empty_304(client):
+    etag = client.get('/symptoms?language=hindi').headers['ETag']
+    response = client.get('/symptoms?language=hindi', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_etag_differs_per_language(client):
+    etags = {client.get(f'/symptoms?language={language}').headers['ETag'] for language in ('english', 'hindi', 'tamil')}
+    assert len(etags) == 3
+    hindi = client.get('/symptoms?language=hindi').headers['ETag']
+    assert client.get('/symptoms?language=tamil', headers={'If-None-Match': hindi}).status_code == 200
+
+
+def decompressor(encoding):
+    if encoding == 'gzip':
+        return gzip.decompress
+    return pytest.importorskip('brotli').decompress  # br variants need the optional brotli module
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br'])
+def test_compressed_variants_have_their_own_etag(client, encoding):
+    decompress = decompressor(encoding)
+    plain = client.get('/symptoms?language=tamil')
+    response = client.get('/symptoms?language=tamil', headers={'Accept-Encoding': encoding})
+    assert response.status_code == 200 and response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(decompress(response.data)) == plain.get_json()
+    assert response.headers['ETag'] != plain.headers['ETag']
+    revalidated = client.get('/symptoms?language=tamil', headers={'Accept-Encoding': encoding,
+                                                                 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304